@@ -0,0 +1,35 @@
+"""Product search indexes: pg_trgm GIN on name/article_number, generated tsvector column.
+
+Replaces sequential scans for catalog ILIKE '%term%' searches (see app.services.product_search).
+
+Revision ID: 024
+Revises: 023
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "024"
+down_revision: Union[str, None] = "023"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(
+        "ALTER TABLE products ADD COLUMN search_vector tsvector "
+        "GENERATED ALWAYS AS (to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(article_number, ''))) STORED"
+    )
+    op.execute("CREATE INDEX ix_products_search_vector ON products USING gin (search_vector)")
+    op.execute("CREATE INDEX ix_products_name_trgm ON products USING gin (name gin_trgm_ops)")
+    op.execute("CREATE INDEX ix_products_article_number_trgm ON products USING gin (article_number gin_trgm_ops)")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_products_article_number_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_products_name_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_products_search_vector")
+    op.drop_column("products", "search_vector")
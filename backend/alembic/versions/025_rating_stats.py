@@ -0,0 +1,48 @@
+"""Denormalized rating aggregates: product_rating_stats, vendor_rating_stats (backfilled from product_reviews).
+
+Revision ID: 025
+Revises: 024
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "025"
+down_revision: Union[str, None] = "024"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "product_rating_stats",
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column("reviews_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("rating_sum", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.ForeignKeyConstraint(["product_id"], ["products.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("product_id"),
+    )
+    op.create_table(
+        "vendor_rating_stats",
+        sa.Column("vendor_id", sa.Integer(), nullable=False),
+        sa.Column("reviews_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("rating_sum", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.ForeignKeyConstraint(["vendor_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("vendor_id"),
+    )
+    op.execute(
+        "INSERT INTO product_rating_stats (product_id, reviews_count, rating_sum) "
+        "SELECT product_id, count(*), sum(rating) FROM product_reviews GROUP BY product_id"
+    )
+    op.execute(
+        "INSERT INTO vendor_rating_stats (vendor_id, reviews_count, rating_sum) "
+        "SELECT p.vendor_id, count(*), sum(r.rating) FROM product_reviews r "
+        "JOIN products p ON p.id = r.product_id GROUP BY p.vendor_id"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("vendor_rating_stats")
+    op.drop_table("product_rating_stats")
@@ -0,0 +1,37 @@
+"""Normalized article number key on products (uppercase, separators stripped) with a btree index.
+
+Backs the exact-match fast path for pasted part numbers (see app.services.product_search).
+
+Revision ID: 026
+Revises: 025
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils import normalize_article_number
+
+revision: str = "026"
+down_revision: Union[str, None] = "025"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH = 1000
+
+
+def upgrade() -> None:
+    op.add_column("products", sa.Column("article_key", sa.String(length=128), nullable=True))
+    # Backfill with the same Python normalization the app uses on write
+    conn = op.get_bind()
+    rows = conn.execute(sa.text("SELECT id, article_number FROM products")).all()
+    update = sa.text("UPDATE products SET article_key = :key WHERE id = :id")
+    for i in range(0, len(rows), BACKFILL_BATCH):
+        conn.execute(update, [{"id": pid, "key": normalize_article_number(article)} for pid, article in rows[i : i + BACKFILL_BATCH]])
+    op.create_index("ix_products_article_key", "products", ["article_key"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_products_article_key", table_name="products")
+    op.drop_column("products", "article_key")
@@ -0,0 +1,37 @@
+"""Normalized product name for search (folded, transliterated, stemmed) with a trigram index.
+
+See app.utils.search_text; queries are normalized the same way in app.services.product_search.
+
+Revision ID: 027
+Revises: 026
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.search_text import normalize_search_text
+
+revision: str = "027"
+down_revision: Union[str, None] = "026"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH = 1000
+
+
+def upgrade() -> None:
+    op.add_column("products", sa.Column("name_normalized", sa.Text(), nullable=True))
+    # Backfill with the same Python pipeline the app uses on write (scripts/backfill_search_keys.py re-runs it)
+    conn = op.get_bind()
+    rows = conn.execute(sa.text("SELECT id, name FROM products")).all()
+    update = sa.text("UPDATE products SET name_normalized = :value WHERE id = :id")
+    for i in range(0, len(rows), BACKFILL_BATCH):
+        conn.execute(update, [{"id": pid, "value": normalize_search_text(name)} for pid, name in rows[i : i + BACKFILL_BATCH]])
+    op.execute("CREATE INDEX ix_products_name_normalized_trgm ON products USING gin (name_normalized gin_trgm_ops)")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_products_name_normalized_trgm")
+    op.drop_column("products", "name_normalized")
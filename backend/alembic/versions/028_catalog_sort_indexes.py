@@ -0,0 +1,31 @@
+"""Partial indexes for explicit catalog sorts over in-stock products.
+
+The public catalog only lists products with stock_quantity > 0 and pages with keyset cursors on
+(sort column, id) in one direction (see product_search.CATALOG_SORTS), so each sort, ascending or
+descending, is a range scan of one of these indexes. "newest" is id order.
+
+Revision ID: 028
+Revises: 027
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "028"
+down_revision: Union[str, None] = "027"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE INDEX ix_products_in_stock_price ON products (price, id) WHERE stock_quantity > 0")
+    op.execute("CREATE INDEX ix_products_in_stock_name ON products (name, id) WHERE stock_quantity > 0")
+    op.execute("CREATE INDEX ix_products_in_stock_id ON products (id) WHERE stock_quantity > 0")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_products_in_stock_id")
+    op.execute("DROP INDEX IF EXISTS ix_products_in_stock_name")
+    op.execute("DROP INDEX IF EXISTS ix_products_in_stock_price")
@@ -0,0 +1,26 @@
+"""Machine-first index on compatibility_matrix.
+
+The primary key (product_id, machine_id) cannot serve lookups by machine; this index makes
+loading a machine's compatible product ids (app.services.machine_compat) an index-only scan.
+
+Revision ID: 029
+Revises: 028
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "029"
+down_revision: Union[str, None] = "028"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_compatibility_matrix_machine_product", "compatibility_matrix", ["machine_id", "product_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_compatibility_matrix_machine_product", table_name="compatibility_matrix")
@@ -32,6 +32,10 @@ class Settings(BaseSettings):
     openai_chat_max_tokens: int = 500
     openai_timeout_seconds: float = 60.0
     cache_ttl_seconds: int = 300
+    # In-process L1 cache in front of Redis (per worker)
+    local_cache_max_entries: int = 2048
+    local_cache_ttl_seconds: float = 10.0
+    local_cache_max_bytes: int = 32 * 1024 * 1024  # total size of cached bodies/strings; 0 = unlimited
     max_upload_mb: int = 10
     trusted_proxies: str = ""
     chat_store_enabled: bool = True
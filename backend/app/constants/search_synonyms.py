@@ -0,0 +1,65 @@
+"""Agro spare-parts terminology for search expansion (ru / kk / en), see services.search_synonyms.
+
+Each group lists interchangeable search terms; the first is the canonical one. Covers the part names
+of price_parser._FUZZY_PART_TERMS and the terms the LLM suggested most often. Terms the LLM answers
+for unknown queries are stored separately in Redis and need no change here.
+"""
+
+SYNONYM_GROUPS: list[tuple[str, ...]] = [
+    ("фильтр", "filter", "сүзгі", "фильтрующий элемент"),
+    ("масляный фильтр", "oil filter", "фильтр масла", "май сүзгісі"),
+    ("воздушный фильтр", "air filter", "фильтр воздуха", "ауа сүзгісі"),
+    ("топливный фильтр", "fuel filter", "фильтр топлива", "отын сүзгісі"),
+    ("гидравлический фильтр", "hydraulic filter", "фильтр гидравлики"),
+    ("прокладка", "gasket", "төсем", "уплотнительная прокладка"),
+    ("сальник", "seal", "oil seal", "манжета", "тығыздағыш"),
+    ("уплотнение", "seal kit", "ремкомплект уплотнений", "o-ring", "кольцо уплотнительное"),
+    ("масло", "oil", "май", "моторное масло", "motor oil"),
+    ("гидравлическое масло", "hydraulic oil", "гидравлика", "гидромасло"),
+    ("ремень", "belt", "белдік", "приводной ремень", "v-belt", "клиновой ремень"),
+    ("подшипник", "bearing", "мойынтірек", "подшипниковый узел"),
+    ("щетка", "brush", "щётка", "қылшақ"),
+    ("нож", "blade", "лезвие", "пышақ", "сегмент ножа"),
+    ("свеча зажигания", "spark plug", "свеча", "оталдыру шамы"),
+    ("свеча накала", "glow plug", "қыздыру шамы"),
+    ("шланг", "hose", "рукав", "шланг высокого давления", "рвд"),
+    ("хомут", "clamp", "хомуты", "қамыт"),
+    ("шина", "tire", "tyre", "покрышка", "доңғалақ"),
+    ("камера", "inner tube", "tube", "камера шины"),
+    ("диск сцепления", "clutch disc", "сцепление", "clutch", "ілінісу дискісі"),
+    ("тормозные колодки", "brake pads", "колодки", "тежегіш қалыптары"),
+    ("аккумулятор", "battery", "акб", "аккумуляторная батарея"),
+    ("генератор", "alternator", "generator"),
+    ("стартер", "starter", "starter motor"),
+    ("насос", "pump", "сорғы", "помпа"),
+    ("гидронасос", "hydraulic pump", "насос гидравлический", "нш"),
+    ("топливный насос", "fuel pump", "тнвд", "насос топливный"),
+    ("форсунка", "injector", "nozzle", "бүрку құралы"),
+    ("радиатор", "radiator", "cooler", "салқындатқыш"),
+    ("цепь", "chain", "шынжыр", "приводная цепь"),
+    ("звездочка", "sprocket", "звёздочка", "жұлдызша"),
+    ("шестерня", "gear", "шестерёнка", "тісті доңғалақ"),
+    ("вал", "shaft", "білік", "карданный вал"),
+    ("палец", "pin", "шплинт", "саусақ"),
+    ("болт", "bolt", "бұранда", "крепеж"),
+    ("гайка", "nut", "сомын"),
+    ("пружина", "spring", "серіппе"),
+    ("лемех", "ploughshare", "share", "лемех плуга", "тұмсық"),
+    ("диск бороны", "harrow disc", "диск", "тырма дискісі"),
+    ("лапа культиватора", "cultivator sweep", "лапа", "культиватор табаны"),
+    ("сошник", "coulter", "opener", "сеялка сошник"),
+    ("датчик", "sensor", "сенсор", "бергіш"),
+    ("реле", "relay", "реле стартера"),
+    ("предохранитель", "fuse", "сақтандырғыш"),
+    ("фара", "headlight", "lamp", "фонарь", "шам"),
+    ("стекло", "glass", "windshield", "лобовое стекло", "әйнек"),
+    ("сиденье", "seat", "кресло", "орындық"),
+    ("гидроцилиндр", "hydraulic cylinder", "цилиндр гидравлический"),
+    ("распределитель", "hydraulic valve", "гидрораспределитель", "control valve"),
+    ("турбина", "turbocharger", "турбокомпрессор", "turbo"),
+    ("поршень", "piston", "поршневая группа"),
+    ("кольца поршневые", "piston rings", "кольца"),
+    ("термостат", "thermostat"),
+    ("антифриз", "antifreeze", "coolant", "охлаждающая жидкость", "тосол"),
+    ("смазка", "grease", "литол", "майлау"),
+]
@@ -1,4 +1,5 @@
-from sqlalchemy import text
+from contextlib import asynccontextmanager
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 from app.config import settings
@@ -19,14 +20,45 @@ class Base(DeclarativeBase):
 RLS_DEFAULT_USER_ID = "-1"
 
 
+def _set_rls_default(session, transaction, connection) -> None:
+    connection.exec_driver_sql(f"SET LOCAL app.current_user_id = {RLS_DEFAULT_USER_ID}")
+
+
+def _with_rls_default(session: AsyncSession, user_id: int | None = None) -> AsyncSession:
+    """Apply the RLS default (or user_id) at the start of every transaction instead of eagerly, so a request
+    that never touches the DB (e.g. a catalog cache hit) never checks out a pooled connection."""
+    if user_id is None:
+        event.listen(session.sync_session, "after_begin", _set_rls_default)
+        return session
+    uid = int(user_id)  # literal: SET does not support bound parameters
+
+    def _set_rls_user(session, transaction, connection) -> None:
+        connection.exec_driver_sql(f"SET LOCAL app.current_user_id = {uid}")
+
+    event.listen(session.sync_session, "after_begin", _set_rls_user)
+    return session
+
+
 async def get_db() -> AsyncSession:
     async with async_session_maker() as session:
         try:
-            await session.execute(text(f"SET LOCAL app.current_user_id = {RLS_DEFAULT_USER_ID}"))
-            yield session
+            yield _with_rls_default(session)
             await session.commit()
         except Exception:
             await session.rollback()
             raise
         finally:
             await session.close()
+
+
+@asynccontextmanager
+async def background_session(user_id: int | None = None):
+    """Session for work outside a request (background refreshes): same RLS default as get_db, or the RLS
+    context of user_id when the work recomputes what that user's request would have seen."""
+    async with async_session_maker() as session:
+        try:
+            yield _with_rls_default(session, user_id)
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
@@ -4,10 +4,12 @@ from pathlib import Path
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from app.config import settings, validate_secrets
 from app.database import get_db
+from app.services.redis_client import start_cache_invalidation_listener, stop_cache_invalidation_listener
+from app.services.autocomplete import start_autocomplete_index, stop_autocomplete_index
 from app.routers import auth, products, machines, garage, cart, checkout, orders, vendor_upload, vendors, recommendations, webhooks, admin, categories, search, chat, notifications, feedback, staff, regions
 
 logger = logging.getLogger(__name__)
@@ -28,7 +30,11 @@ if not CORS_ALLOWED_ORIGINS and settings.environment.strip().lower() in _DEV_ENV
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     validate_secrets()
+    start_cache_invalidation_listener()
+    start_autocomplete_index()
     yield
+    await stop_autocomplete_index()
+    await stop_cache_invalidation_listener()
     try:
         from app.services.llm_client import close_openai_client
         await close_openai_client()
@@ -61,8 +67,12 @@ def _cors_headers_for_request(request: Request) -> dict[str, str]:
 
 
 @app.exception_handler(StarletteHTTPException)
-async def http_exception_handler(request: Request, exc: StarletteHTTPException) -> JSONResponse:
-    response = JSONResponse(status_code=exc.status_code, content={"detail": exc.detail})
+async def http_exception_handler(request: Request, exc: StarletteHTTPException) -> Response:
+    if exc.status_code in (204, 304):
+        # No body allowed; 304 carries the ETag / Cache-Control headers of http_cache.conditional_get
+        response = Response(status_code=exc.status_code, headers=exc.headers)
+    else:
+        response = JSONResponse(status_code=exc.status_code, content={"detail": exc.detail}, headers=exc.headers)
     for k, v in _cors_headers_for_request(request).items():
         response.headers[k] = v
     return response
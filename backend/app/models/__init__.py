@@ -9,6 +9,7 @@ from app.models.compatibility import CompatibilityMatrix
 from app.models.garage import Garage
 from app.models.order import Order, OrderStatus, OrderItem
 from app.models.product_review import ProductReview
+from app.models.rating_stats import ProductRatingStats, VendorRatingStats
 from app.models.notification import Notification
 from app.models.feedback import FeedbackTicket, FeedbackStatus
 from app.models.reply_template import ReplyTemplate
@@ -32,6 +33,8 @@ __all__ = [
     "OrderStatus",
     "OrderItem",
     "ProductReview",
+    "ProductRatingStats",
+    "VendorRatingStats",
     "Notification",
     "FeedbackTicket",
     "FeedbackStatus",
@@ -1,11 +1,15 @@
-from sqlalchemy import ForeignKey, UniqueConstraint
+from sqlalchemy import ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column
 from app.database import Base
 
 
 class CompatibilityMatrix(Base):
     __tablename__ = "compatibility_matrix"
-    __table_args__ = (UniqueConstraint("product_id", "machine_id", name="uq_compatibility_product_machine"),)
+    __table_args__ = (
+        UniqueConstraint("product_id", "machine_id", name="uq_compatibility_product_machine"),
+        # The primary key leads with product_id; machine filters need machine_id first (services.machine_compat)
+        Index("ix_compatibility_matrix_machine_product", "machine_id", "product_id"),
+    )
 
     product_id: Mapped[int] = mapped_column(ForeignKey("products.id"), primary_key=True)
     machine_id: Mapped[int] = mapped_column(ForeignKey("machines.id"), primary_key=True)
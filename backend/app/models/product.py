@@ -1,9 +1,11 @@
 import enum
-from sqlalchemy import String, Numeric, Integer, ForeignKey, DateTime, Enum
-from sqlalchemy.dialects.postgresql import JSONB, ARRAY
+from sqlalchemy import String, Text, Numeric, Integer, ForeignKey, DateTime, Enum, Computed, event
+from sqlalchemy.dialects.postgresql import JSONB, ARRAY, TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from datetime import datetime
 from app.database import Base
+from app.utils import normalize_article_number
+from app.utils.search_text import normalize_search_text
 
 
 class ProductStatus(str, enum.Enum):
@@ -18,8 +20,14 @@ class Product(Base):
     vendor_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False, index=True)
     category_id: Mapped[int | None] = mapped_column(ForeignKey("categories.id"), nullable=True, index=True)
     name: Mapped[str] = mapped_column(String(512), nullable=False)
+    # normalize_search_text(name): folded / transliterated / stemmed words for search (trigram-indexed), see _sync_search_keys.
+    # Text, not String: transliteration ("щ" -> "sch") can make it several times longer than name.
+    name_normalized: Mapped[str | None] = mapped_column(Text, nullable=True)
     # Global uniqueness: one article_number per system. For per-vendor uniqueness use (vendor_id, article_number).
     article_number: Mapped[str] = mapped_column(String(128), nullable=False, unique=True, index=True)
+    # normalize_article_number(article_number), kept in sync on every ORM insert/update (see _sync_search_keys).
+    # Exact-match index for pasted part numbers ("RE 504836" == "re-504836"), see product_search.
+    article_key: Mapped[str | None] = mapped_column(String(128), nullable=True, index=True)
     price: Mapped[float] = mapped_column(Numeric(12, 2), nullable=False)
     stock_quantity: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     description: Mapped[str | None] = mapped_column(String(2048), nullable=True)
@@ -32,3 +40,33 @@ class Product(Base):
         nullable=False,
     )
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+    # Full-text search vector maintained by PostgreSQL (GIN-indexed, see app.services.product_search).
+    search_vector: Mapped[str | None] = mapped_column(
+        TSVECTOR,
+        Computed("to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(article_number, ''))", persisted=True),
+        nullable=True,
+        deferred=True,
+    )
+
+
+@event.listens_for(Product, "before_insert")
+@event.listens_for(Product, "before_update")
+def _sync_search_keys(mapper, connection, target: Product) -> None:
+    # Covers every write path (product API, price-list import, 1C webhook, seed) without per-caller code
+    target.article_key = normalize_article_number(target.article_number)
+    target.name_normalized = normalize_search_text(target.name)
+
+
+# Columns rendered on a catalog card. Public listings select just these as a Core projection (no ORM
+# objects); the text / JSONB detail fields are only loaded for the product page and vendor listings.
+PRODUCT_CARD_COLUMNS = (
+    Product.id,
+    Product.vendor_id,
+    Product.category_id,
+    Product.name,
+    Product.article_number,
+    Product.price,
+    Product.stock_quantity,
+    Product.images,
+    Product.status,
+)
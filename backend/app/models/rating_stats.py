@@ -0,0 +1,23 @@
+from sqlalchemy import Integer, BigInteger, ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database import Base
+
+
+class ProductRatingStats(Base):
+    """Denormalized review aggregate per product (maintained on review write, see services.rating_stats)."""
+
+    __tablename__ = "product_rating_stats"
+
+    product_id: Mapped[int] = mapped_column(ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+    reviews_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    rating_sum: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+
+class VendorRatingStats(Base):
+    """Denormalized review aggregate over all products of a vendor."""
+
+    __tablename__ = "vendor_rating_stats"
+
+    vendor_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    reviews_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    rating_sum: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
@@ -1,4 +1,3 @@
-import json
 import logging
 from decimal import Decimal
 from datetime import datetime, timezone, timedelta, date
@@ -37,7 +36,9 @@ from app.constants.permissions import (
 from app.models.staff import Staff
 from app.utils.sanitize import sanitize_text_required
 from app.services.audit import write_audit_log, write_staff_audit_log
-from app.services.redis_client import get_redis
+from app.services.redis_client import cache_get, cache_set
+from app.services.swr import swr_envelope, swr_hard_ttl, swr_refresh_in_background, swr_unwrap
+from app.services.product_search import apply_product_search
 from pydantic import BaseModel
 
 router = APIRouter()
@@ -744,12 +745,8 @@ async def admin_search(
         if not any(x["id"] == oid for x in out["orders"]):
             out["orders"].append({"id": oid, "order_number": onum})
     # Products: name, article_number
-    p_stmt = select(Product.id, Product.name, Product.article_number).where(
-        or_(
-            Product.name.ilike(f"%{q_trim}%"),
-            Product.article_number.ilike(f"%{q_trim}%"),
-        )
-    ).limit(10)
+    p_stmt, p_rank = apply_product_search(select(Product.id, Product.name, Product.article_number), [q_trim])
+    p_stmt = p_stmt.order_by(p_rank.desc(), Product.id).limit(10)
     p_result = await db.execute(p_stmt)
     for row in p_result.all():
         out["products"].append({"id": row.id, "name": row.name, "article_number": row.article_number})
@@ -778,21 +775,8 @@ async def admin_search(
 DASHBOARD_CACHE_TTL = 300  # 5 minutes
 
 
-@router.get("/dashboard")
-async def admin_dashboard(
-    date_from: date | None = Query(None),
-    date_to: date | None = Query(None),
-    db: AsyncSession = Depends(get_db),
-    current_user=Depends(require_admin_or_staff(PERMISSION_DASHBOARD_VIEW)),
-):
-    cache_key = f"admin:dashboard:{date_from or 'all'}:{date_to or 'all'}"
-    try:
-        r = await get_redis()
-        cached = await r.get(cache_key)
-        if cached:
-            return json.loads(cached)
-    except Exception:
-        pass
+async def _build_dashboard(db: AsyncSession, date_from: date | None, date_to: date | None, cache_key: str) -> dict:
+    """Compute dashboard stats and cache them (stale-while-revalidate envelope)."""
     order_date_filter = None
     if date_from is not None:
         order_date_filter = Order.created_at >= datetime.combine(date_from, datetime.min.time()).replace(tzinfo=timezone.utc)
@@ -870,14 +854,30 @@ async def admin_dashboard(
         "open_feedback_count": open_feedback_count,
         "recent_reviews": recent_reviews,
     }
-    try:
-        r = await get_redis()
-        await r.setex(cache_key, DASHBOARD_CACHE_TTL, json.dumps(out, default=str))
-    except Exception:
-        pass
+    await cache_set(cache_key, swr_envelope(out, DASHBOARD_CACHE_TTL), ttl=swr_hard_ttl(DASHBOARD_CACHE_TTL))
     return out
 
 
+@router.get("/dashboard")
+async def admin_dashboard(
+    date_from: date | None = Query(None),
+    date_to: date | None = Query(None),
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(require_admin_or_staff(PERMISSION_DASHBOARD_VIEW)),
+):
+    cache_key = f"admin:dashboard:{date_from or 'all'}:{date_to or 'all'}"
+    cached, is_fresh = swr_unwrap(await cache_get(cache_key))
+    if cached is not None:
+        if not is_fresh:
+            # Same RLS context as this request: an admin User sets its own id, staff tokens keep the default
+            rls_user_id = current_user.id if isinstance(current_user, User) else None
+            swr_refresh_in_background(
+                cache_key, lambda session: _build_dashboard(session, date_from, date_to, cache_key), user_id=rls_user_id
+            )
+        return cached
+    return await _build_dashboard(db, date_from, date_to, cache_key)
+
+
 # --- Send notification to user ---
 
 class SendNotificationIn(BaseModel):
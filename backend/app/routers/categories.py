@@ -5,41 +5,40 @@ from sqlalchemy import select
 from app.database import get_db
 from app.models.category import Category
 from app.schemas.category import CategoryOut, CategoryCreate, CategoryTreeOut
+from app.services.category_index import get_category_index, invalidate_category_index
+from app.services.redis_client import data_epoch, invalidate_product_cache
 from app.dependencies import require_role
 from app.models.user import UserRole
+from app.utils.http_cache import conditional_get
 from app.utils.sanitize import sanitize_text_required
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+CATEGORIES_CACHE_CONTROL = "public, max-age=300"
+
+
+async def _category_index_version(db: AsyncSession = Depends(get_db)) -> str | None:
+    """ETag version of the category endpoints: data epoch plus the index version counter (see data_epoch)."""
+    epoch = await data_epoch()
+    version = (await get_category_index(db)).version
+    return None if epoch is None or version is None else f"{epoch}-{version}"
 
-def _build_tree(categories: list[Category], parent_id: int | None = None) -> list[CategoryTreeOut]:
-    out = []
-    for c in categories:
-        if c.parent_id == parent_id:
-            node = CategoryTreeOut(
-                id=c.id,
-                parent_id=c.parent_id,
-                name=c.name,
-                slug=c.slug,
-                children=_build_tree(categories, c.id),
-            )
-            out.append(node)
-    return out
 
+_http_cache = Depends(conditional_get(CATEGORIES_CACHE_CONTROL, _category_index_version))
 
-@router.get("", response_model=list[CategoryOut])
+
+@router.get("", response_model=list[CategoryOut], dependencies=[_http_cache])
 async def list_categories(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Category).order_by(Category.slug))
-    return [CategoryOut.model_validate(c) for c in result.scalars().all()]
+    index = await get_category_index(db)
+    return [CategoryOut(id=c.id, parent_id=c.parent_id, name=c.name, slug=c.slug) for c in index.nodes]
 
 
-@router.get("/tree", response_model=list[CategoryTreeOut])
+@router.get("/tree", response_model=list[CategoryTreeOut], dependencies=[_http_cache])
 async def tree_categories(db: AsyncSession = Depends(get_db)):
     try:
-        result = await db.execute(select(Category).order_by(Category.slug))
-        categories = list(result.scalars().all())
-        return _build_tree(categories)
+        index = await get_category_index(db)
+        return index.tree
     except Exception as e:
         logger.exception("Categories tree failed: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error") from e
@@ -59,7 +58,12 @@ async def create_category(
     db.add(cat)
     await db.flush()
     await db.refresh(cat)
-    return CategoryOut.model_validate(cat)
+    out = CategoryOut.model_validate(cat)
+    # Commit before bumping the index version so other workers never rebuild from pre-commit data
+    await db.commit()
+    await invalidate_category_index()
+    await invalidate_product_cache()
+    return out
 
 
 @router.delete("/{category_id}", status_code=204)
@@ -72,3 +76,6 @@ async def delete_category(
     cat = result.scalar_one_or_none()
     if cat:
         await db.delete(cat)
+        await db.commit()
+        await invalidate_category_index()
+        await invalidate_product_cache()
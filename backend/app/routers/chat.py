@@ -17,12 +17,14 @@ from app.models.garage import Garage
 from app.models.chat_feedback import ChatFeedback
 from app.models.chat_session import ChatSession, ChatMessage as ChatMessageRow
 from app.models.machine import Machine
-from app.models.category import Category
 from app.dependencies import get_current_user_optional, get_current_user, check_chat_rate_limit
 from app.services.chat_assistant import get_assistant_reply, stream_assistant_reply, _normalize_history
+from app.services.category_index import get_category_index
 from app.services.catalog_context import build_catalog_context, get_products_snippet, resolve_category_by_query
 from app.services.search_suggest import get_search_suggestions
-from app.services.redis_client import cache_get, cache_set
+from app.utils import looks_like_article_number
+from app.services.redis_client import cache_get, cache_set, cache_key_prefix, single_flight
+from app.services.cache_tags import ALL_TAG, cache_get_tagged, cache_set_tagged, tag_versions
 
 router = APIRouter()
 
@@ -135,7 +137,7 @@ async def _get_user_context(
     return ctx, machine_id
 
 
-CATALOG_CONTEXT_CACHE_KEY = "catalog:context:tree"
+CATALOG_CONTEXT_CACHE_SUFFIX = "context:tree"  # under the catalog cache generation, see cache_key_prefix()
 CATALOG_CONTEXT_TTL = 600  # 10 min
 
 async def _prepare_chat_context(
@@ -145,17 +147,27 @@ async def _prepare_chat_context(
 ) -> PreparedChatContext:
     """Build history, catalog context, user context, products snippet, and suggested_catalog_url in one place."""
     history_dicts = [{"role": h.role, "content": h.content} for h in body.history]
-    cached_catalog = await cache_get(CATALOG_CONTEXT_CACHE_KEY)
+    catalog_context_key = f"{await cache_key_prefix()}{CATALOG_CONTEXT_CACHE_SUFFIX}"
+    cached_catalog = await cache_get_tagged(catalog_context_key)
     catalog_context = cached_catalog.get("v") if isinstance(cached_catalog, dict) and "v" in cached_catalog else None
     if not catalog_context:
-        catalog_context = await build_catalog_context(db, include_product_counts=True)
-        await cache_set(CATALOG_CONTEXT_CACHE_KEY, {"v": catalog_context}, ttl=CATALOG_CONTEXT_TTL)
+        async def load_catalog_context() -> str:
+            # Per-category product counts change with any listing membership change
+            versions = await tag_versions([ALL_TAG])
+            context = await build_catalog_context(db, include_product_counts=True)
+            await cache_set_tagged(catalog_context_key, {"v": context}, versions, ttl=CATALOG_CONTEXT_TTL)
+            return context
+
+        catalog_context = await single_flight.run(catalog_context_key, load_catalog_context)
     allow_personalization = bool(current_user and current_user.chat_storage_opt_in)
     user_context, machine_id = await _get_user_context(db, current_user, allow_personalization)
 
     search_query = (body.message or "").strip()[:100]
     search_terms: list[str] | None = None
-    if search_query and len(search_query) >= 2:
+    if search_query and looks_like_article_number(search_query):
+        # A pasted part number needs no synonym expansion (get_products_snippet matches it by article_key)
+        search_terms = [search_query]
+    elif search_query and len(search_query) >= 2:
         try:
             suggest = await get_search_suggestions(search_query)
             search_terms = suggest.expanded_terms[:6] if suggest.expanded_terms else [search_query]
@@ -177,12 +189,9 @@ async def _prepare_chat_context(
 
     if _is_parts_intent(body.message or "") and machine_id is not None:
         params = {"machine_id": str(machine_id)}
-        cat_result = await db.execute(
-            select(Category.id).where(Category.slug == PARTS_CATEGORY_SLUG).limit(1)
-        )
-        row = cat_result.first()
-        if row:
-            params["category"] = str(row[0])
+        parts_category_id = (await get_category_index(db)).id_by_slug.get(PARTS_CATEGORY_SLUG)
+        if parts_category_id is not None:
+            params["category"] = str(parts_category_id)
         suggested_catalog_url = "/catalog?" + urlencode(params)
     else:
         resolved_category_id = await resolve_category_by_query(db, search_query or (body.message or ""))
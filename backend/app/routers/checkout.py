@@ -9,6 +9,7 @@ from app.models.order import Order, OrderStatus, OrderItem
 from app.models.user import User
 from app.dependencies import get_current_user, rate_limit
 from app.schemas.order import CheckoutIn, CheckoutOut
+from app.services.cache_tags import commit_and_invalidate, listing_state, product_cache_tags
 from app.services.cart_service import get_cart, clear_cart, CartUnavailableError
 from app.utils.sanitize import sanitize_text
 
@@ -53,6 +54,7 @@ async def checkout(
             by_vendor[p.vendor_id] = []
         by_vendor[p.vendor_id].append((p, qty))
     order_ids = []
+    old_states = {p.id: listing_state(p) for p in products.values()}
     for vendor_id, rows in by_vendor.items():
         total = sum(Decimal(str(p.price)) * qty for p, qty in rows)
         order = Order(
@@ -77,4 +79,8 @@ async def checkout(
     except CartUnavailableError:
         raise HTTPException(503, CART_UNAVAILABLE_MSG)
     await db.flush()
+    moved = [p for p in products.values() if listing_state(p) != old_states[p.id]]  # sold out
+    changed = [p for p in products.values() if listing_state(p) == old_states[p.id]]  # stock quantity only
+    tags = await product_cache_tags(db, moved) | await product_cache_tags(db, changed, membership=False)
+    await commit_and_invalidate(db, tags)
     return CheckoutOut(order_ids=order_ids, message="Orders created")
\ No newline at end of file
@@ -6,11 +6,42 @@ from app.models.machine import Machine
 from app.schemas.machine import MachineOut, MachineCreate
 from app.dependencies import require_role
 from app.models.user import UserRole
+from app.services.cache_tags import commit_and_invalidate, machine_tag
+from app.services.redis_client import data_epoch, get_redis, local_cache, publish_invalidation
+from app.utils.http_cache import conditional_get
 
 router = APIRouter()
 
+MACHINES_CACHE_CONTROL = "public, max-age=300"
+MACHINE_LIST_VERSION_KEY = "machines:version"  # no TTL (unlike cache tag counters), so it never restarts on its own
 
-@router.get("", response_model=list[MachineOut])
+
+async def _machine_list_version() -> str | None:
+    """ETag version of GET /machines: data epoch plus the machine list counter (see data_epoch)."""
+    epoch = await data_epoch()
+    if epoch is None:
+        return None
+    version = local_cache.get(MACHINE_LIST_VERSION_KEY)
+    if version is None:
+        try:
+            r = await get_redis()
+            version = await r.get(MACHINE_LIST_VERSION_KEY) or "0"
+        except Exception:
+            return None
+        local_cache.set(MACHINE_LIST_VERSION_KEY, version)
+    return f"{epoch}-{version}"
+
+
+async def _bump_machine_list_version() -> None:
+    try:
+        r = await get_redis()
+        await r.incr(MACHINE_LIST_VERSION_KEY)
+    except Exception:
+        pass
+    await publish_invalidation(MACHINE_LIST_VERSION_KEY)
+
+
+@router.get("", response_model=list[MachineOut], dependencies=[Depends(conditional_get(MACHINES_CACHE_CONTROL, _machine_list_version))])
 async def list_machines(
     brand: str | None = Query(None),
     db: AsyncSession = Depends(get_db),
@@ -33,4 +64,6 @@ async def create_machine(
     db.add(machine)
     await db.flush()
     await db.refresh(machine)
+    await commit_and_invalidate(db, [machine_tag(machine.id)])
+    await _bump_machine_list_version()
     return MachineOut.model_validate(machine)
@@ -1,9 +1,15 @@
+import logging
+import re
+from collections.abc import Awaitable, Sequence
+from dataclasses import dataclass
+from decimal import Decimal
+import orjson
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, or_
+from sqlalchemy import Row, Select, select
 from app.database import get_db
-from app.utils import generate_article_number
-from app.models.product import Product, ProductStatus
+from app.utils import generate_article_number, looks_like_article_number
+from app.models.product import PRODUCT_CARD_COLUMNS, Product
 from app.models.product_review import ProductReview
 from app.models.notification import Notification
 from app.models.machine import Machine
@@ -11,42 +17,48 @@ from app.models.compatibility import CompatibilityMatrix
 from app.services.compatibility_checker import verify_compatibility
 from app.models.category import Category
 from app.models.user import User, UserRole
-from app.schemas.product import ProductOut, ProductListOut, ProductCreate, ProductUpdate, AddCompatibilityIn, CheckCompatibilityIn
+from app.schemas.product import ProductOut, ProductListOut, ProductFacetsOut, product_out_json, product_list_json, ProductCreate, ProductUpdate, AddCompatibilityIn, CheckCompatibilityIn
 from app.schemas.review import ReviewCreateIn, ReviewOut, ProductReviewsResponse
-from app.dependencies import get_current_vendor, get_current_admin, get_product_for_vendor, get_current_user, get_current_user_optional, get_client_ip, check_compatibility_rate_limit, rate_limit
-from app.services.redis_client import get_redis, cache_get, cache_set, cache_key_prefix, invalidate_product_cache
+from fastapi.responses import ORJSONResponse
+from fastapi.security import HTTPAuthorizationCredentials
+from app.dependencies import security, get_current_vendor, get_current_admin, get_product_for_vendor, get_current_user, get_current_user_optional, get_client_ip, check_compatibility_rate_limit, rate_limit
+from app.services.redis_client import get_redis, cache_key_prefix, coalesce
 from app.services.search_suggest import get_search_suggestions
+from app.services.swr import DB_UNAVAILABLE_ERRORS, swr_fresh_until, swr_hard_ttl, swr_is_fresh, swr_refresh_in_background
+from app.services.cache_tags import ALL_TAG, PRICE_TAG, cache_get_tagged, cache_get_tagged_many, cache_lookup_tagged_body, cache_set_tagged, cache_set_tagged_body, cache_set_tagged_many, category_tag, commit_and_invalidate, invalidate_products, listing_state, machine_tag, product_cache_tags, product_tag, tag_versions, vendor_tag
+from app.services.autocomplete import fuzzy_product_ids
+from app.services.machine_compat import get_machine_product_ids, product_id_in
+from app.services.category_index import get_category_index
+from app.services.catalog_count import count_rows, cached_count_rows
+from app.services.catalog_facets import facet_counts, roll_up_categories
+from app.services.product_search import CatalogSort, normalize_search_terms, apply_product_search, article_search_key, catalog_cursor_values, catalog_order_by, catalog_sort_keys, catalog_sort_types, catalog_sort_values
 from app.services.audit import write_audit_log
+from app.services.rating_stats import apply_review_delta, get_product_rating, get_product_ratings, remove_product_from_vendor_stats
 from app.utils.sanitize import sanitize_image_urls, sanitize_text, sanitize_text_required
+from app.utils.cursor import InvalidCursorError, decode_cursor, encode_cursor, keyset_after
+from app.utils.http_cache import body_etag, conditional_get, json_bytes_response
 from app.config import settings
 
-router = APIRouter()
+logger = logging.getLogger(__name__)
+router = APIRouter(default_response_class=ORJSONResponse)
 
-
-def _collect_category_and_descendant_ids(categories: list[Category], root_id: int) -> set[int]:
-    """Return root_id and all descendant category ids (by parent_id)."""
-    by_parent: dict[int | None, list[Category]] = {}
-    for c in categories:
-        by_parent.setdefault(c.parent_id, []).append(c)
-    ids = {root_id}
-
-    def add_children(pid: int) -> None:
-        for c in by_parent.get(pid) or []:
-            ids.add(c.id)
-            add_children(c.id)
-
-    add_children(root_id)
-    return ids
+CATALOG_CACHE_SOFT_TTL = settings.cache_ttl_seconds  # catalog pages are served stale-while-revalidate after this
+FUZZY_MAX_RESULTS = 500  # fuzzy mode ranks at most this many candidates (skip + limit beyond it come back empty)
+BATCH_MAX_IDS = 300
+MAX_ID = 2**31 - 1  # products.id is int4
+_ID = re.compile(r"[0-9]+")
+CATALOG_CACHE_CONTROL = "private, no-cache"  # stock moves constantly: always revalidate (cheap 304 via the page ETag)
+PRODUCT_PAGE_REVIEWS = 10  # reviews cached with the product page: the first page of GET /{id}/reviews
 
 
 async def _category_ids_for_filter(db: AsyncSession, category_id: int) -> set[int]:
-    """Load all categories and return category_id plus all descendant ids."""
-    result = await db.execute(select(Category))
-    categories = list(result.scalars().all())
-    return _collect_category_and_descendant_ids(categories, category_id)
+    """Return category_id plus all descendant ids (from the in-process category index)."""
+    index = await get_category_index(db)
+    return set(index.descendant_ids(category_id))
 
 
 def _cache_key(
+    prefix: str,
     q: str | None,
     category_id: int | None,
     vendor_id: int | None,
@@ -54,9 +66,15 @@ def _cache_key(
     skip: int,
     limit: int,
     expand: bool = False,
+    cursor: str | None = None,
+    with_total: bool = True,
+    fuzzy: bool = False,
+    sort: str | None = None,
+    price_min: Decimal | None = None,
+    price_max: Decimal | None = None,
 ) -> str:
     parts = [
-        cache_key_prefix(),
+        prefix.rstrip(":"),
         f"q={q or ''}",
         f"cat={category_id or ''}",
         f"v={vendor_id or ''}",
@@ -64,26 +82,78 @@ def _cache_key(
         f"expand={1 if expand else 0}",
         f"{skip}",
         f"{limit}",
+        f"cur={cursor or ''}",
+        f"total={1 if with_total else 0}",
+        f"fuzzy={1 if fuzzy else 0}",
+        f"sort={sort or ''}",
+        f"price={_price_range_part(price_min, price_max)}",
     ]
     return ":".join(parts)
 
 
-async def _query_products(
-    db: AsyncSession,
-    q: str | None = None,
-    search_terms: list[str] | None = None,
+def _count_cache_key(
+    prefix: str,
+    q: str | None,
+    category_id: int | None,
+    vendor_id: int | None,
+    machine_id: int | None,
+    expand: bool = False,
+    kind: str = "count",
+    price_min: Decimal | None = None,
+    price_max: Decimal | None = None,
+) -> str:
+    """Cache key for the total (or facets, kind="facets") of a filter set: same filters as _cache_key, without skip/limit/cursor."""
+    parts = [
+        prefix.rstrip(":"),
+        kind,
+        f"q={q or ''}",
+        f"cat={category_id or ''}",
+        f"v={vendor_id or ''}",
+        f"m={machine_id or ''}",
+        f"expand={1 if expand else 0}",
+        f"price={_price_range_part(price_min, price_max)}",
+    ]
+    return ":".join(parts)
+
+
+def _price_range_part(price_min: Decimal | None, price_max: Decimal | None) -> str:
+    if price_min is None and price_max is None:
+        return ""
+    # normalize() so 100, 100.0 and 100.00 share one cache entry
+    return "-".join("" if p is None else str(p.normalize()) for p in (price_min, price_max))
+
+
+def _listing_tags(category_id: int | None, vendor_ids: list[int], machine_id: int | None, by_price: bool = False) -> list[str]:
+    """Cache tags whose bump can change the membership of a listing with these filters.
+
+    by_price: the listing is filtered or ordered by price, so any price change can alter it (PRICE_TAG).
+    """
+    tags = [vendor_tag(v) for v in vendor_ids]
+    if category_id is not None:
+        tags.append(category_tag(category_id))
+    if machine_id is not None:
+        tags.append(machine_tag(machine_id))
+    tags = tags or [ALL_TAG]
+    if by_price:
+        tags.append(PRICE_TAG)
+    return tags
+
+
+def _apply_catalog_filters(
+    stmt: Select,
     category_ids: set[int] | None = None,
     vendor_id: int | None = None,
     vendor_ids: list[int] | None = None,
-    machine_id: int | None = None,
-    skip: int = 0,
-    limit: int = 20,
-):
-    stmt = select(Product)
-    if machine_id is not None:
-        stmt = stmt.join(CompatibilityMatrix, Product.id == CompatibilityMatrix.product_id).where(
-            CompatibilityMatrix.machine_id == machine_id
-        )
+    machine_product_ids: Sequence[int] | None = None,
+    price_min: Decimal | None = None,
+    price_max: Decimal | None = None,
+) -> Select:
+    """Restrict a products select to a catalog filter set (shared by listings and facets).
+
+    machine_product_ids: the machine filter, as the machine's compatible ids (see services.machine_compat).
+    """
+    if machine_product_ids is not None:
+        stmt = stmt.where(product_id_in(machine_product_ids))
     if category_ids is not None:
         stmt = stmt.where(Product.category_id.in_(category_ids))
     if vendor_ids is not None:
@@ -93,32 +163,127 @@ async def _query_products(
     else:
         # В каталоге (без фильтра по поставщику) показываем только товары с остатком — без остатка скрыты до пополнения
         stmt = stmt.where(Product.stock_quantity > 0)
-    terms = search_terms if search_terms else ([q.strip()] if q and q.strip() else [])
-    if terms:
-        cond = or_(
-            *[
-                or_(
-                    Product.article_number.ilike(f"%{t}%"),
-                    Product.name.ilike(f"%{t}%"),
-                )
-                for t in terms
-            ]
-        )
-        stmt = stmt.where(cond)
-    count_stmt = select(func.count()).select_from(stmt.subquery())
-    total = (await db.execute(count_stmt)).scalar() or 0
-    # Order: In_Stock first, then On_Order
-    stmt = stmt.order_by(
-        (Product.status == ProductStatus.in_stock).desc(),
-        Product.name,
-    ).offset(skip).limit(limit)
-    result = await db.execute(stmt)
-    products = result.scalars().unique().all()
-    return list(products), total
+    if price_min is not None:
+        stmt = stmt.where(Product.price >= price_min)
+    if price_max is not None:
+        stmt = stmt.where(Product.price <= price_max)
+    return stmt
+
+
+@dataclass
+class ProductPage:
+    """One page of _query_products: rows, optional total (exact or planner estimate) and next keyset cursor."""
+    # Product entities, or PRODUCT_CARD_COLUMNS rows for card_only queries
+    products: list[Product] | list[Row]
+    total: int | None
+    total_is_estimate: bool
+    next_cursor: str | None
+
+
+async def _query_products(
+    db: AsyncSession,
+    q: str | None = None,
+    search_terms: list[str] | None = None,
+    category_ids: set[int] | None = None,
+    vendor_id: int | None = None,
+    vendor_ids: list[int] | None = None,
+    machine_id: int | None = None,
+    skip: int = 0,
+    limit: int = 20,
+    cursor: str | None = None,
+    with_total: bool = True,
+    count_cache_key: str | None = None,
+    count_tag_versions: dict[str, int] | None = None,
+    card_only: bool = False,
+    fuzzy: bool = False,
+    sort: str | None = None,
+    price_min: Decimal | None = None,
+    price_max: Decimal | None = None,
+) -> ProductPage:
+    """Return one catalog page.
+
+    With cursor, the page starts right after the encoded sort key (keyset pagination, no OFFSET).
+    next_cursor is set whenever another page exists, in both modes. The total is exact up to
+    EXACT_COUNT_LIMIT rows and a planner estimate above; it is cached under count_cache_key if given.
+    card_only selects just PRODUCT_CARD_COLUMNS (rows instead of ORM objects). fuzzy matches q by
+    product name with typo tolerance (in-memory index, see services.autocomplete): one page, no cursor.
+    sort picks one of CATALOG_SORTS instead of the default relevance / in-stock / name order.
+    """
+    machine_product_ids = await get_machine_product_ids(db, machine_id) if machine_id is not None else None
+    if machine_product_ids is not None and not machine_product_ids:
+        return ProductPage(products=[], total=0 if with_total else None, total_is_estimate=False, next_cursor=None)
+    stmt = select(*PRODUCT_CARD_COLUMNS) if card_only else select(Product)
+    stmt = _apply_catalog_filters(stmt, category_ids, vendor_id, vendor_ids, machine_product_ids, price_min, price_max)
+    terms = normalize_search_terms(q, search_terms)
+    if fuzzy and terms:
+        return await _query_products_fuzzy(db, stmt, terms[0], skip, limit, with_total, card_only)
+    article_key = article_search_key(terms)
+    if article_key and not cursor and not skip:
+        # Pasted part number: exact article_key hit via its btree index, no ranking or count query
+        exact = (
+            await db.execute(stmt.where(Product.article_key == article_key).order_by(*catalog_order_by(sort=sort)).limit(limit + 1))
+        ).all()
+        if 0 < len(exact) <= limit:
+            products = list(exact) if card_only else [row[0] for row in exact]
+            return ProductPage(
+                products=products, total=len(products) if with_total else None, total_is_estimate=False, next_cursor=None
+            )
+    stmt, rank = apply_product_search(stmt, terms)
+    if sort is not None:
+        rank = None  # an explicit sort replaces relevance ordering
+    total: int | None = None
+    total_is_estimate = False
+    if with_total:
+        if count_cache_key:
+            total, total_is_estimate = await cached_count_rows(db, stmt, count_cache_key, count_tag_versions)
+        else:
+            total, total_is_estimate = await count_rows(db, stmt)
+    sort_keys = catalog_sort_keys(rank, sort)
+    if cursor:
+        try:
+            after = catalog_cursor_values(decode_cursor(cursor, types=catalog_sort_types(rank, sort)), sort)
+        except (InvalidCursorError, ValueError) as e:  # malformed token, or a bad price value inside it
+            raise HTTPException(400, "Invalid cursor") from e
+        stmt = stmt.where(keyset_after(sort_keys, after))
+    if rank is not None:
+        stmt = stmt.add_columns(rank.label("rank"))
+    # Order: relevance when searching, then In_Stock first, then On_Order; fetch one extra row to detect the next page
+    stmt = stmt.order_by(*catalog_order_by(rank, sort)).limit(limit + 1)
+    if not cursor:
+        stmt = stmt.offset(skip)
+    rows = (await db.execute(stmt)).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    products = list(rows) if card_only else [row[0] for row in rows]
+    next_cursor = None
+    if has_more and products:
+        next_cursor = encode_cursor(catalog_sort_values(products[-1], rows[-1].rank if rank is not None else None, sort))
+    return ProductPage(products=products, total=total, total_is_estimate=total_is_estimate, next_cursor=next_cursor)
+
+
+async def _query_products_fuzzy(
+    db: AsyncSession, stmt: Select, q: str, skip: int, limit: int, with_total: bool, card_only: bool
+) -> ProductPage:
+    """Typo-tolerant page: candidate ids from the in-memory name index, filtered by primary key in the DB."""
+    candidate_limit = min(FUZZY_MAX_RESULTS, max(skip + limit, 1) * 5)
+    ranked_ids = await fuzzy_product_ids(q, limit=candidate_limit)
+    if not ranked_ids:
+        return ProductPage(products=[], total=0 if with_total else None, total_is_estimate=False, next_cursor=None)
+    position = {pid: i for i, pid in enumerate(ranked_ids)}
+    rows = (await db.execute(stmt.where(Product.id.in_(ranked_ids)))).all()
+    products = sorted((list(rows) if card_only else [row[0] for row in rows]), key=lambda p: position[p.id])
+    return ProductPage(
+        products=products[skip : skip + limit],
+        total=len(products) if with_total else None,
+        # A full candidate list was cut off, so the count is only a lower bound (and depends on the page)
+        total_is_estimate=with_total and len(ranked_ids) >= candidate_limit,
+        next_cursor=None,
+    )
 
 
 @router.get("", response_model=ProductListOut)
 async def list_products(
+    request: Request,
     q: str | None = Query(None),
     expand: bool = Query(False),
     category_id: int | None = Query(None),
@@ -126,12 +291,32 @@ async def list_products(
     machine_id: int | None = Query(None),
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=500),
+    cursor: str | None = Query(None, max_length=1024, description="next_cursor from the previous page (keyset mode)"),
+    with_total: bool | None = Query(None, description="Compute total; defaults to true without cursor, false with cursor"),
+    fuzzy: bool = Query(False, description="Typo-tolerant name search for q (single page, no cursor)"),
+    sort: CatalogSort | None = Query(None, description="Explicit order instead of relevance / in stock first / name"),
+    price_min: Decimal | None = Query(None, ge=0),
+    price_max: Decimal | None = Query(None, ge=0),
     db: AsyncSession = Depends(get_db),
-    current_user: User | None = Depends(get_current_user_optional),
+    credentials: HTTPAuthorizationCredentials | None = Depends(security),
+    cache_headers: dict[str, str] = Depends(conditional_get(CATALOG_CACHE_CONTROL)),
 ):
+    # No auth dependency: the user only matters for a vendor's own listing, so anonymous and plain
+    # catalog requests reach the cache without touching the DB (get_db connects lazily).
+    if cursor and skip:
+        raise HTTPException(400, "cursor and skip cannot be combined")
+    if cursor and fuzzy:
+        raise HTTPException(400, "cursor and fuzzy cannot be combined")
+    if sort and fuzzy:
+        raise HTTPException(400, "sort and fuzzy cannot be combined")
+    if price_min is not None and price_max is not None and price_min > price_max:
+        raise HTTPException(400, "price_min cannot exceed price_max")
+    if with_total is None:
+        with_total = not cursor
     search_terms: list[str] | None = None
     suggested_terms: list[str] | None = None
-    if q and q.strip() and expand:
+    # Part numbers are looked up as they are: no synonym expansion, no LLM
+    if q and q.strip() and expand and not fuzzy and not looks_like_article_number(q):
         try:
             suggest = await get_search_suggestions(q.strip())
             search_terms = suggest.expanded_terms
@@ -142,6 +327,9 @@ async def list_products(
     # When vendor requests "my products" (vendor_id=self) and has company, show all company products
     effective_vendor_id = vendor_id
     vendor_ids: list[int] | None = None
+    current_user: User | None = None
+    if vendor_id is not None and credentials is not None:
+        current_user = await get_current_user_optional(request, credentials, db)
     if (
         current_user
         and vendor_id is not None
@@ -154,44 +342,206 @@ async def list_products(
             effective_vendor_id = None  # use vendor_ids instead
 
     vendor_cache_part = effective_vendor_id if not vendor_ids else (f"c{current_user.company_id}" if current_user else None)
-    ckey = _cache_key(q, category_id, vendor_cache_part, machine_id, skip, limit, expand=expand)
-    cached = await cache_get(ckey)
-    if cached is not None:
-        return ProductListOut(**cached)
-    category_ids = await _category_ids_for_filter(db, category_id) if category_id is not None else None
-    products, total = await _query_products(
-        db,
-        q=q,
-        search_terms=search_terms,
-        category_ids=category_ids,
-        vendor_id=effective_vendor_id,
-        vendor_ids=vendor_ids,
-        machine_id=machine_id,
-        skip=skip,
-        limit=limit,
-    )
-    cat_ids = list({p.category_id for p in products if p.category_id is not None})
-    cat_slug_by_id: dict[int, str] = {}
-    if cat_ids:
-        cat_result = await db.execute(select(Category.id, Category.slug).where(Category.id.in_(cat_ids)))
-        for cid, slug in cat_result.all():
-            cat_slug_by_id[cid] = slug
-    product_ids = [p.id for p in products]
-    ratings_by_id = await _get_ratings_by_product_ids(db, product_ids)
-    items = [
-        _product_out_with_category_slug(
-            p,
-            cat_slug_by_id.get(p.category_id) if p.category_id else None,
-            ratings_by_id.get(p.id, (None, 0))[0],
-            ratings_by_id.get(p.id, (None, 0))[1],
+    prefix = await cache_key_prefix()
+    ckey = _cache_key(prefix, q, category_id, vendor_cache_part, machine_id, skip, limit, expand=expand, cursor=cursor, with_total=with_total, fuzzy=fuzzy, sort=sort, price_min=price_min, price_max=price_max)
+    by_price = price_min is not None or price_max is not None or sort in ("price_asc", "price_desc")
+
+    async def build_page(session: AsyncSession) -> tuple[dict, bytes]:
+        # Read filter tag versions before querying so a concurrent invalidation leaves this entry stale
+        filter_versions = await tag_versions(_listing_tags(category_id, vendor_ids or ([effective_vendor_id] if effective_vendor_id is not None else []), machine_id, by_price))
+        category_ids = await _category_ids_for_filter(session, category_id) if category_id is not None else None
+        page = await _query_products(
+            session,
+            q=q,
+            search_terms=search_terms,
+            category_ids=category_ids,
+            vendor_id=effective_vendor_id,
+            vendor_ids=vendor_ids,
+            machine_id=machine_id,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+            with_total=with_total,
+            count_cache_key=_count_cache_key(prefix, q, category_id, vendor_cache_part, machine_id, expand=expand, price_min=price_min, price_max=price_max),
+            count_tag_versions=filter_versions,
+            # The public catalog only renders cards; vendor listings feed the edit form and need every field
+            card_only=effective_vendor_id is None and vendor_ids is None,
+            fuzzy=fuzzy,
+            sort=sort,
+            price_min=price_min,
+            price_max=price_max,
         )
-        for p in products
-    ]
-    out = ProductListOut(items=items, total=total, suggested_terms=suggested_terms)
-    await cache_set(ckey, out.model_dump(mode="json"))
+        products = page.products
+        category_index = await get_category_index(session)
+        product_ids = [p.id for p in products]
+        ratings_by_id = await get_product_ratings(session, product_ids)
+        items = [
+            product_out_json(
+                p,
+                category_index.slug_of(p.category_id),
+                *ratings_by_id.get(p.id, (None, 0)),
+            )
+            for p in products
+        ]
+        out = product_list_json(
+            items,
+            total=page.total,
+            total_is_estimate=page.total_is_estimate,
+            suggested_terms=suggested_terms,
+            next_cursor=page.next_cursor,
+        )
+        # Cache the exact response bytes: hits are served without decoding, validation or re-encoding
+        body = orjson.dumps(out)
+        meta = {"fresh_until": swr_fresh_until(CATALOG_CACHE_SOFT_TTL), "etag": body_etag(body)}
+        page_versions = await tag_versions(product_tag(pid) for pid in product_ids)
+        if filter_versions is not None and page_versions is not None:
+            await cache_set_tagged_body(
+                ckey, body, {**filter_versions, **page_versions}, meta, ttl=swr_hard_ttl(CATALOG_CACHE_SOFT_TTL)
+            )
+        return meta, body
+
+    async def fresh_page() -> tuple[dict, bytes] | None:
+        header, body, is_current = await cache_lookup_tagged_body(ckey)
+        return (header, body) if is_current and swr_is_fresh(header) else None
+
+    def rebuild(session: AsyncSession) -> Awaitable[tuple[dict, bytes]]:
+        # Identical concurrent misses (e.g. right after an invalidation) run the queries once across workers
+        return coalesce(ckey, lambda: build_page(session), fresh_page)
+
+    header, body, is_current = await cache_lookup_tagged_body(ckey)
+    if header is not None and is_current:
+        if not swr_is_fresh(header):
+            swr_refresh_in_background(ckey, rebuild)
+        return json_bytes_response(request, body, header.get("etag"), cache_headers)
+    try:
+        header, body = await rebuild(db)
+    except DB_UNAVAILABLE_ERRORS as e:
+        if header is None:
+            raise
+        # Serve the invalidated page rather than an error while the database is failing
+        logger.warning("Catalog query failed, serving stale page: %s", e)
+        try:
+            await db.rollback()
+        except Exception:
+            pass
+    return json_bytes_response(request, body, header.get("etag"), cache_headers)
+
+
+@router.get("/facets", response_model=ProductFacetsOut)
+async def product_facets(
+    q: str | None = Query(None),
+    expand: bool = Query(False),
+    category_id: int | None = Query(None),
+    vendor_id: int | None = Query(None),
+    machine_id: int | None = Query(None),
+    price_min: Decimal | None = Query(None, ge=0),
+    price_max: Decimal | None = Query(None, ge=0),
+    db: AsyncSession = Depends(get_db),
+):
+    """Category / vendor / status / in-stock counts for a catalog filter set (same filters as GET /products)."""
+    search_terms: list[str] | None = None
+    if q and q.strip() and expand and not looks_like_article_number(q):
+        try:
+            search_terms = (await get_search_suggestions(q.strip())).expanded_terms
+        except Exception:
+            pass
+    prefix = await cache_key_prefix()
+    ckey = _count_cache_key(prefix, q, category_id, vendor_id, machine_id, expand=expand, kind="facets", price_min=price_min, price_max=price_max)
+
+    async def build() -> dict:
+        by_price = price_min is not None or price_max is not None
+        versions = await tag_versions(_listing_tags(category_id, [vendor_id] if vendor_id is not None else [], machine_id, by_price))
+        index = await get_category_index(db)
+        stmt = _apply_catalog_filters(
+            select(Product),
+            category_ids=set(index.descendant_ids(category_id)) if category_id is not None else None,
+            vendor_id=vendor_id,
+            machine_product_ids=await get_machine_product_ids(db, machine_id) if machine_id is not None else None,
+            price_min=price_min,
+            price_max=price_max,
+        )
+        stmt, _ = apply_product_search(stmt, normalize_search_terms(q, search_terms))
+        counts = await facet_counts(db, stmt)
+        categories = [
+            {"id": cid, "slug": index.by_id[cid].slug, "name": index.by_id[cid].name, "count": n}
+            for cid, n in roll_up_categories(counts.categories, index).items()
+            if cid in index.by_id
+        ]
+        data = {
+            "total": counts.total,
+            "in_stock": counts.in_stock,
+            "categories": sorted(categories, key=lambda c: (-c["count"], c["slug"])),
+            "vendors": [{"id": v, "count": n} for v, n in sorted(counts.vendors.items(), key=lambda kv: (-kv[1], kv[0]))],
+            "statuses": counts.statuses,
+        }
+        await cache_set_tagged(ckey, data, versions)
+        return data
+
+    cached = await cache_get_tagged(ckey)
+    if cached is not None:
+        return cached
+    return await coalesce(ckey, build, lambda: cache_get_tagged(ckey))
+
+
+def _product_cache_key(prefix: str, product_id: int) -> str:
+    return f"{prefix}product:{product_id}"
+
+
+def _product_page_cache_key(prefix: str, product_id: int) -> str:
+    return f"{prefix}product:{product_id}:page"
+
+
+def _parse_id_list(ids: str, max_ids: int) -> list[int]:
+    """Comma-separated ids -> unique ids in request order; 400 on anything else."""
+    out: list[int] = []
+    seen: set[int] = set()
+    for part in ids.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if len(part) > 10 or not _ID.fullmatch(part) or int(part) > MAX_ID:
+            raise HTTPException(400, "ids must be comma-separated integers")
+        pid = int(part)
+        if pid not in seen:
+            seen.add(pid)
+            out.append(pid)
+    if len(out) > max_ids:
+        raise HTTPException(400, f"At most {max_ids} ids per request")
     return out
 
 
+async def _load_product_outs(db: AsyncSession, product_ids: list[int]) -> dict[int, dict]:
+    """ProductOut JSON per id (missing ids left out): per-product cache entries first, then two queries for the misses."""
+    prefix = await cache_key_prefix()
+    keys = {pid: _product_cache_key(prefix, pid) for pid in product_ids}
+    cached = await cache_get_tagged_many(list(keys.values()))
+    found = {pid: cached[key] for pid, key in keys.items() if key in cached}
+    misses = [pid for pid in product_ids if pid not in found]
+    if not misses:
+        return found
+    versions = await tag_versions(product_tag(pid) for pid in misses)
+    result = await db.execute(
+        select(Product, Category.slug).outerjoin(Category, Product.category_id == Category.id).where(Product.id.in_(misses))
+    )
+    rows = result.all()
+    ratings = await get_product_ratings(db, [p.id for p, _ in rows])
+    loaded = {p.id: product_out_json(p, slug, *ratings.get(p.id, (None, 0))) for p, slug in rows}
+    await cache_set_tagged_many({keys[pid]: (data, [product_tag(pid)]) for pid, data in loaded.items()}, versions)
+    return found | loaded
+
+
+@router.get("/batch", response_model=list[ProductOut])
+async def get_products_batch(
+    request: Request,
+    ids: str = Query(..., description=f"Comma-separated product ids, at most {BATCH_MAX_IDS}"),
+    db: AsyncSession = Depends(get_db),
+):
+    """Several products by id, in request order; unknown ids are skipped."""
+    product_ids = _parse_id_list(ids, BATCH_MAX_IDS)
+    products = await _load_product_outs(db, product_ids)
+    return json_bytes_response(request, orjson.dumps([products[pid] for pid in product_ids if pid in products]))
+
+
 @router.post("/check-compatibility")
 async def check_compatibility(
     body: CheckCompatibilityIn,
@@ -217,18 +567,8 @@ async def check_compatibility(
     return verification.model_dump()
 
 
-@router.get("/{product_id}/reviews", response_model=ProductReviewsResponse)
-async def list_product_reviews(
-    product_id: int,
-    limit: int = Query(10, ge=1, le=50),
-    offset: int = Query(0, ge=0),
-    db: AsyncSession = Depends(get_db),
-):
-    result = await db.execute(select(Product).where(Product.id == product_id))
-    if result.scalar_one_or_none() is None:
-        raise HTTPException(404, "Product not found")
-    avg_rating, total_count = await _get_product_rating(db, product_id)
-    rev_stmt = (
+async def _review_items(db: AsyncSession, product_id: int, limit: int, offset: int) -> list[ReviewOut]:
+    rev_result = await db.execute(
         select(ProductReview, User.phone)
         .join(User, ProductReview.user_id == User.id)
         .where(ProductReview.product_id == product_id)
@@ -236,9 +576,7 @@ async def list_product_reviews(
         .offset(offset)
         .limit(limit)
     )
-    rev_result = await db.execute(rev_stmt)
-    rows = rev_result.all()
-    items = [
+    return [
         ReviewOut(
             id=r.id,
             user_id=r.user_id,
@@ -247,8 +585,65 @@ async def list_product_reviews(
             text=r.text,
             created_at=r.created_at.isoformat() if r.created_at else "",
         )
-        for r, phone in rows
+        for r, phone in rev_result.all()
     ]
+
+
+async def _product_page(db: AsyncSession, product_id: int) -> dict:
+    """Cached product page: {"product": ProductOut JSON or None if there is no such product, "reviews": first review page}.
+
+    Tagged with the product tag, so product updates, reviews, compatibility changes, deletes and
+    stock updates (all of which bump it) evict the entry.
+    """
+    key = _product_page_cache_key(await cache_key_prefix(), product_id)
+
+    async def build() -> dict:
+        versions = await tag_versions([product_tag(product_id)])
+        result = await db.execute(
+            select(Product, Category.slug).outerjoin(Category, Product.category_id == Category.id).where(Product.id == product_id)
+        )
+        row = result.one_or_none()
+        if row is None:
+            data = {"product": None, "reviews": None}  # cached too, so unknown ids don't reach the DB every time
+        else:
+            product, cat_slug = row
+            avg_rating, reviews_count = await get_product_rating(db, product_id)
+            items = await _review_items(db, product_id, PRODUCT_PAGE_REVIEWS, 0)
+            data = {
+                "product": product_out_json(product, cat_slug, avg_rating, reviews_count),
+                "reviews": {
+                    "items": [i.model_dump(mode="json") for i in items],
+                    "total_count": reviews_count,
+                    "average_rating": avg_rating,
+                },
+            }
+        await cache_set_tagged(key, data, versions)
+        return data
+
+    cached = await cache_get_tagged(key)
+    if cached is not None:
+        return cached
+    return await coalesce(key, build, lambda: cache_get_tagged(key))
+
+
+@router.get("/{product_id}/reviews", response_model=ProductReviewsResponse)
+async def list_product_reviews(
+    product_id: int,
+    limit: int = Query(10, ge=1, le=50),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_db),
+):
+    if offset + limit <= PRODUCT_PAGE_REVIEWS:
+        page = await _product_page(db, product_id)
+        if page["product"] is None:
+            raise HTTPException(404, "Product not found")
+        reviews = page["reviews"]
+        return {**reviews, "items": reviews["items"][offset : offset + limit]}
+    result = await db.execute(select(Product).where(Product.id == product_id))
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(404, "Product not found")
+    avg_rating, total_count = await get_product_rating(db, product_id)
+    items = await _review_items(db, product_id, limit, offset)
     return ProductReviewsResponse(items=items, total_count=total_count, average_rating=avg_rating)
 
 
@@ -264,17 +659,22 @@ async def create_or_update_review(
     if not product:
         raise HTTPException(404, "Product not found")
     result = await db.execute(
-        select(ProductReview).where(ProductReview.product_id == product_id, ProductReview.user_id == current_user.id)
+        select(ProductReview)
+        .where(ProductReview.product_id == product_id, ProductReview.user_id == current_user.id)
+        .with_for_update()  # rating delta below must be computed from the row we overwrite
     )
     review = result.scalar_one_or_none()
     if review:
+        rating_delta = body.rating - review.rating
         review.rating = body.rating
         review.text = (body.text or "").strip() or None
         await db.flush()
+        await apply_review_delta(db, product_id, product.vendor_id, 0, rating_delta)
     else:
         review = ProductReview(product_id=product_id, user_id=current_user.id, rating=body.rating, text=(body.text or "").strip() or None)
         db.add(review)
         await db.flush()
+        await apply_review_delta(db, product_id, product.vendor_id, 1, body.rating)
         if product.vendor_id != current_user.id:
             text_preview = (body.text or "").strip()[:200] if body.text else None
             notification = Notification(
@@ -290,78 +690,12 @@ async def create_or_update_review(
             )
             db.add(notification)
             await db.flush()
-    await invalidate_product_cache()
-    avg_rating, total_count = await _get_product_rating(db, product_id)
-    rev_result = await db.execute(
-        select(ProductReview, User.phone)
-        .join(User, ProductReview.user_id == User.id)
-        .where(ProductReview.product_id == product_id)
-        .order_by(ProductReview.created_at.desc())
-        .limit(10)
-        .offset(0)
-    )
-    rows = rev_result.all()
-    items = [
-        ReviewOut(
-            id=r.id,
-            user_id=r.user_id,
-            author_display=_mask_author(phone),
-            rating=r.rating,
-            text=r.text,
-            created_at=r.created_at.isoformat() if r.created_at else "",
-        )
-        for r, phone in rows
-    ]
+    avg_rating, total_count = await get_product_rating(db, product_id)
+    items = await _review_items(db, product_id, PRODUCT_PAGE_REVIEWS, 0)
+    await commit_and_invalidate(db, [product_tag(product_id)])
     return ProductReviewsResponse(items=items, total_count=total_count, average_rating=avg_rating)
 
 
-def _product_out_with_category_slug(
-    product: Product,
-    category_slug: str | None,
-    average_rating: float | None = None,
-    reviews_count: int = 0,
-) -> ProductOut:
-    data = ProductOut.model_validate(product).model_dump()
-    data["category_slug"] = category_slug
-    data["average_rating"] = average_rating
-    data["reviews_count"] = reviews_count
-    return ProductOut(**data)
-
-
-async def _get_product_rating(db: AsyncSession, product_id: int) -> tuple[float | None, int]:
-    """Return (average_rating, reviews_count) for product_id."""
-    r = await db.execute(
-        select(func.coalesce(func.avg(ProductReview.rating), 0).label("avg"), func.count(ProductReview.id).label("cnt"))
-        .where(ProductReview.product_id == product_id)
-    )
-    row = r.one()
-    avg_val = float(row.avg) if row.avg is not None else None
-    cnt = row.cnt or 0
-    if cnt == 0:
-        return (None, 0)
-    return (round(avg_val, 2) if avg_val is not None else None, cnt)
-
-
-async def _get_ratings_by_product_ids(db: AsyncSession, product_ids: list[int]) -> dict[int, tuple[float | None, int]]:
-    """Return dict product_id -> (average_rating, reviews_count)."""
-    if not product_ids:
-        return {}
-    r = await db.execute(
-        select(
-            ProductReview.product_id,
-            func.avg(ProductReview.rating).label("avg"),
-            func.count(ProductReview.id).label("cnt"),
-        )
-        .where(ProductReview.product_id.in_(product_ids))
-        .group_by(ProductReview.product_id)
-    )
-    out: dict[int, tuple[float | None, int]] = {pid: (None, 0) for pid in product_ids}
-    for row in r.all():
-        avg_val = round(float(row.avg), 2) if row.avg is not None else None
-        out[row.product_id] = (avg_val, row.cnt or 0)
-    return out
-
-
 def _mask_author(phone: str | None) -> str:
     if not phone or len(phone) < 4:
         return "Покупатель"
@@ -370,15 +704,10 @@ def _mask_author(phone: str | None) -> str:
 
 @router.get("/{product_id}", response_model=ProductOut)
 async def get_product(product_id: int, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(
-        select(Product, Category.slug).outerjoin(Category, Product.category_id == Category.id).where(Product.id == product_id)
-    )
-    row = result.one_or_none()
-    if not row:
+    product = (await _product_page(db, product_id))["product"]
+    if product is None:
         raise HTTPException(404, "Product not found")
-    product, cat_slug = row
-    avg_rating, reviews_count = await _get_product_rating(db, product_id)
-    return _product_out_with_category_slug(product, cat_slug, avg_rating, reviews_count)
+    return ORJSONResponse(product)
 
 
 @router.post("", response_model=ProductOut)
@@ -406,7 +735,6 @@ async def create_product(
     db.add(product)
     await db.flush()
     await db.refresh(product)
-    await invalidate_product_cache()
     if current_user.company_id:
         await write_audit_log(
             db,
@@ -419,6 +747,7 @@ async def create_product(
             ip=get_client_ip(request),
         )
         await db.flush()
+    await invalidate_products(db, [product])
     return ProductOut.model_validate(product)
 
 
@@ -445,11 +774,12 @@ async def update_product(
     if "images" in updates:
         updates["images"] = sanitize_image_urls(updates["images"])
     old_price = product.price
+    old_state = listing_state(product)
+    old_category_id, old_vendor_id = product.category_id, product.vendor_id
     for k, v in updates.items():
         setattr(product, k, v)
     await db.flush()
     await db.refresh(product)
-    await invalidate_product_cache()
     audit_details: dict = {"name": product.name, "article_number": product.article_number}
     action = "product_update"
     if "price" in updates and old_price != product.price:
@@ -468,6 +798,14 @@ async def update_product(
             ip=get_client_ip(request),
         )
         await db.flush()
+    await invalidate_products(
+        db,
+        [product],
+        membership=listing_state(product) != old_state,
+        previous_category_ids=[old_category_id],
+        previous_vendor_ids=[old_vendor_id],
+        price_changed=old_price != product.price,
+    )
     return ProductOut.model_validate(product)
 
 
@@ -480,7 +818,7 @@ async def add_compatibility(
     comp = CompatibilityMatrix(product_id=product.id, machine_id=body.machine_id)
     db.add(comp)
     await db.flush()
-    await invalidate_product_cache()
+    await commit_and_invalidate(db, [machine_tag(body.machine_id), product_tag(product.id)])
     return {"product_id": product.id, "machine_id": body.machine_id}
 
 
@@ -496,8 +834,9 @@ async def delete_product(
     if product:
         vendor = await db.get(User, product.vendor_id)
         company_id = vendor.company_id if vendor else None
+        await remove_product_from_vendor_stats(db, product.id, product.vendor_id)
+        tags = await product_cache_tags(db, [product])  # before the delete: needs its compatibility rows
         await db.delete(product)
-        await invalidate_product_cache()
         await write_audit_log(
             db,
             user_id=current_user.id,
@@ -509,3 +848,4 @@ async def delete_product(
             ip=get_client_ip(request),
         )
         await db.flush()
+        await commit_and_invalidate(db, tags)
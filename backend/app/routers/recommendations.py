@@ -8,11 +8,12 @@ from app.models.product import Product
 from app.models.category import Category
 from app.models.garage import Garage
 from app.models.machine import Machine
-from app.models.compatibility import CompatibilityMatrix
+from app.services.machine_compat import get_machines_product_ids, product_id_in
 from app.models.user import User
 from app.dependencies import get_current_user_optional
 from app.schemas.maintenance import MaintenanceAdviceOut
 from app.services.maintenance import recommend_maintenance_kits
+from app.services.category_index import get_category_index
 from pydantic import BaseModel
 
 router = APIRouter()
@@ -51,19 +52,20 @@ async def get_recommendations(
     machine_ids = [g.machine_id for g in garages]
     # Get products compatible with these machines in "recommended" categories (e.g. oil filters)
     target_slugs = set(CROSS_SELL_RULES.values())
-    cat_result = await db.execute(select(Category).where(Category.slug.in_(target_slugs)))
-    categories = {c.slug: c for c in cat_result.scalars().all()}
-    if not categories:
+    index = await get_category_index(db)
+    cat_ids = [index.id_by_slug[s] for s in target_slugs if s in index.id_by_slug]
+    if not cat_ids:
         return []
-    cat_ids = [c.id for c in categories.values()]
     # Products in these categories that are compatible with user's machines
+    product_ids = await get_machines_product_ids(db, machine_ids)
+    if not product_ids:
+        return []
     stmt = (
-        select(Product, Category.name)
+        select(Product.id, Product.name, Product.article_number, Product.price, Category.name.label("category_name"))
         .join(Category, Product.category_id == Category.id)
-        .join(CompatibilityMatrix, Product.id == CompatibilityMatrix.product_id)
         .where(
             Product.category_id.in_(cat_ids),
-            CompatibilityMatrix.machine_id.in_(machine_ids),
+            product_id_in(product_ids),
             Product.stock_quantity > 0,
         )
         .limit(5)
@@ -71,14 +73,14 @@ async def get_recommendations(
     result = await db.execute(stmt)
     rows = result.all()
     out = []
-    for product, cat_name in rows:
+    for product in rows:
         out.append(
             RecommendationOut(
                 product_id=product.id,
                 name=product.name,
                 article_number=product.article_number,
                 price=float(product.price),
-                category_name=cat_name,
+                category_name=product.category_name,
                 message=f"Не забудьте для вашей техники: {product.name}",
             )
         )
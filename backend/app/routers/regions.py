@@ -1,13 +1,22 @@
 """Regions of Kazakhstan — read-only list for frontend and validation."""
 
-from fastapi import APIRouter
+import orjson
+from fastapi import APIRouter, Depends
 
 from app.constants.regions import REGIONS_KZ
+from app.utils.http_cache import body_etag, conditional_get
 
 router = APIRouter()
 
+REGIONS_CACHE_CONTROL = "public, max-age=86400"
+_REGIONS_VERSION = body_etag(orjson.dumps(list(REGIONS_KZ)))  # changes only with a deploy
 
-@router.get("", response_model=list[str])
+
+async def _regions_version() -> str:
+    return _REGIONS_VERSION
+
+
+@router.get("", response_model=list[str], dependencies=[Depends(conditional_get(REGIONS_CACHE_CONTROL, _regions_version))])
 def list_regions() -> list[str]:
     """Return the list of regions of Kazakhstan (single source of truth)."""
     return list(REGIONS_KZ)
@@ -1,7 +1,8 @@
-"""Search suggest endpoint for Smart Search."""
+"""Search suggest and autocomplete endpoints for Smart Search."""
 from fastapi import APIRouter, Depends, Query
 
 from app.dependencies import check_search_suggest_rate_limit
+from app.services.autocomplete import AutocompleteOut, autocomplete
 from app.services.search_suggest import get_search_suggestions, SearchSuggestOut
 
 router = APIRouter()
@@ -14,3 +15,12 @@ async def search_suggest(
 ):
     """Return AI-suggested synonyms and expanded terms for the query (for Smart Search)."""
     return await get_search_suggestions(q)
+
+
+@router.get("/autocomplete", response_model=list[AutocompleteOut])
+async def search_autocomplete(
+    q: str = Query(..., min_length=1, max_length=128),
+    limit: int = Query(10, ge=1, le=20),
+):
+    """Typeahead matches among categories, machines, product names and article numbers (in-memory, no DB query)."""
+    return await autocomplete(q, limit)
@@ -15,7 +15,7 @@ from app.models.company import Company
 from app.models.audit_log import AuditLog
 from app.models.company_member import CompanyMember, CompanyRole
 from app.dependencies import get_current_vendor, get_current_vendor_owner, get_client_ip, rate_limit
-from app.services.redis_client import invalidate_product_cache
+from app.services.cache_tags import invalidate_products
 from app.services.audit import write_audit_log
 from app.services.storage_quota import ensure_storage_quota
 from app.schemas.audit import AuditLogOut
@@ -209,6 +209,7 @@ async def upload_pricelist(
     rows = apply_fuzzy_name_correction(rows, mapping_result.confidence, known_part_names=known_names or None)
     created = 0
     updated = 0
+    touched: list[Product] = []
     for r in rows:
         article = (r.get("article_number") or "").strip() or generate_article_number()
         name = r.get("name", "")
@@ -223,6 +224,7 @@ async def upload_pricelist(
             existing.price = price
             existing.stock_quantity = qty
             existing.status = ProductStatus.in_stock if qty > 0 else ProductStatus.on_order
+            touched.append(existing)
             updated += 1
         else:
             product = Product(
@@ -234,9 +236,9 @@ async def upload_pricelist(
                 status=ProductStatus.in_stock if qty > 0 else ProductStatus.on_order,
             )
             db.add(product)
+            touched.append(product)
             created += 1
     await db.flush()
-    await invalidate_product_cache()
     if current_user.company_id:
         await write_audit_log(
             db,
@@ -247,6 +249,8 @@ async def upload_pricelist(
             ip=get_client_ip(request),
         )
         await db.flush()
+    if touched:
+        await invalidate_products(db, touched)
     return {
         "created": created,
         "updated": updated,
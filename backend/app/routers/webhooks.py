@@ -5,7 +5,7 @@ from sqlalchemy import select
 from app.database import get_db
 from app.models.product import Product, ProductStatus
 from app.dependencies import verify_webhook_1c_key
-from app.services.redis_client import invalidate_product_cache
+from app.services.cache_tags import commit_and_invalidate, listing_state, product_cache_tags
 
 router = APIRouter()
 
@@ -26,13 +26,18 @@ async def webhook_1c_stock(
     _: None = Depends(verify_webhook_1c_key),
 ):
     updated = 0
+    moved: list[Product] = []  # in/out of stock: listing membership changes
+    changed: list[Product] = []  # quantity only: just entries showing the product
     for it in body.items:
         result = await db.execute(select(Product).where(Product.article_number == it.article_number))
         product = result.scalar_one_or_none()
         if product:
+            old_state = listing_state(product)
             product.stock_quantity = max(0, it.quantity)
             product.status = ProductStatus.in_stock if product.stock_quantity > 0 else ProductStatus.on_order
+            (moved if listing_state(product) != old_state else changed).append(product)
             updated += 1
     await db.flush()
-    await invalidate_product_cache()
+    tags = await product_cache_tags(db, moved) | await product_cache_tags(db, changed, membership=False)
+    await commit_and_invalidate(db, tags)
     return {"updated": updated}
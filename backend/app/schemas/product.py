@@ -52,8 +52,88 @@ class ProductUpdate(BaseModel):
 
 class ProductListOut(BaseModel):
     items: list[ProductOut]
-    total: int
+    # None when the count was skipped (cursor pages default to with_total=false)
+    total: int | None
+    # True when total is a planner estimate (large result sets), not an exact COUNT
+    total_is_estimate: bool = False
     suggested_terms: list[str] | None = None
+    # Opaque keyset cursor for the next page; None on the last page
+    next_cursor: str | None = None
+
+
+class CategoryFacetOut(BaseModel):
+    id: int
+    slug: str
+    name: str
+    # Matching products in the category and all its subcategories
+    count: int
+
+
+class VendorFacetOut(BaseModel):
+    id: int
+    count: int
+
+
+class ProductFacetsOut(BaseModel):
+    total: int
+    # Matching products with stock_quantity > 0 (equals total in the public catalog, which hides the rest)
+    in_stock: int
+    categories: list[CategoryFacetOut]
+    vendors: list[VendorFacetOut]
+    statuses: dict[str, int]
+
+
+def _decimal_json(value) -> str:
+    # Same as pydantic's Decimal JSON serialization (floats go through str like pydantic's Decimal coercion)
+    return str(value if isinstance(value, Decimal) else Decimal(str(value)))
+
+
+def product_out_json(
+    product,
+    category_slug: str | None = None,
+    average_rating: float | None = None,
+    reviews_count: int = 0,
+) -> dict:
+    """JSON-ready dict equal to ProductOut.model_dump(mode="json"), built without pydantic validation.
+
+    Fast path for catalog pages (up to 500 items); must stay in sync with ProductOut. product may
+    also be a PRODUCT_CARD_COLUMNS row, whose missing detail fields are rendered as null.
+    """
+    status = product.status
+    return {
+        "id": product.id,
+        "vendor_id": product.vendor_id,
+        "category_id": product.category_id,
+        "category_slug": category_slug,
+        "name": product.name,
+        "article_number": product.article_number,
+        "price": _decimal_json(product.price),
+        "stock_quantity": product.stock_quantity,
+        "description": getattr(product, "description", None),
+        "characteristics": getattr(product, "characteristics", None),
+        "composition": getattr(product, "composition", None),
+        "images": list(product.images) if product.images is not None else None,
+        "status": status.value if isinstance(status, ProductStatus) else ProductStatus(status).value,
+        "average_rating": average_rating,
+        "reviews_count": reviews_count,
+    }
+
+
+def product_list_json(
+    items: list[dict],
+    total: int | None,
+    total_is_estimate: bool = False,
+    suggested_terms: list[str] | None = None,
+    next_cursor: str | None = None,
+) -> dict:
+    """JSON-ready ProductListOut from product_out_json() items."""
+    return {
+        "items": items,
+        "total": total,
+        "total_is_estimate": total_is_estimate,
+        "suggested_terms": suggested_terms,
+        "next_cursor": next_cursor,
+    }
 
 
 class AddCompatibilityIn(BaseModel):
@@ -0,0 +1,363 @@
+"""Per-worker typeahead index for GET /search/autocomplete (product names, article numbers, categories, machines).
+
+Every indexed word is kept in a sorted vocabulary with a posting set of the items containing it, so a
+query is one bisect plus a bounded scan and never touches Postgres. The same vocabulary serves
+typo-tolerant product search (PrefixIndex.fuzzy_search, GET /products?fuzzy=true and the chat
+snippet): query words are corrected against it with rapidfuzz. The index is built once per
+worker and then kept current from cache invalidation messages (redis_client.on_invalidation):
+product / machine tags reload just those rows, a catalog generation bump (category changes) or a
+lost pub/sub connection rebuilds it, and it is rebuilt every AUTOCOMPLETE_REBUILD_INTERVAL anyway.
+"""
+import asyncio
+import heapq
+import logging
+import re
+import time
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from itertools import chain, islice
+
+from pydantic import BaseModel
+from rapidfuzz import fuzz, process
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import background_session
+from app.models.machine import Machine
+from app.models.product import Product
+from app.services.cache_tags import TAG_KEY_PREFIX
+from app.services.category_index import get_category_index
+from app.services.redis_client import CATALOG_GENERATION_KEY, on_invalidation
+
+logger = logging.getLogger(__name__)
+
+AUTOCOMPLETE_REBUILD_INTERVAL = 600.0
+MAX_CANDIDATES = 500  # items ranked per query; bounds the cost of one-letter prefixes
+FUZZY_WORD_CUTOFF = 75  # fuzz.ratio a vocabulary word needs to count as a spelling of a query word
+FUZZY_WORD_CHOICES = 5  # spellings considered per query word
+FUZZY_MIN_WORD_LENGTH = 3  # shorter query words must match exactly
+
+KIND_CATEGORY = "category"
+KIND_MACHINE = "machine"
+KIND_PRODUCT = "product"
+_KIND_RANK = {KIND_CATEGORY: 0, KIND_MACHINE: 1, KIND_PRODUCT: 2}
+
+_WORD = re.compile(r"[^\W_]+")
+_PRODUCT_TAG = TAG_KEY_PREFIX + "product:"
+_MACHINE_TAG = TAG_KEY_PREFIX + "machine:"
+
+
+class AutocompleteOut(BaseModel):
+    kind: str
+    id: int
+    label: str
+
+
+def tokenize(text: str | None) -> list[str]:
+    return _WORD.findall((text or "").lower().replace("ё", "е"))
+
+
+def compact(text: str | None) -> str:
+    """Article-number form: lowercase letters and digits only ("AB-12 34" -> "ab1234")."""
+    return "".join(tokenize(text))
+
+
+@dataclass(frozen=True)
+class AutocompleteItem:
+    kind: str
+    id: int
+    label: str
+    words: tuple[str, ...]
+    normalized: str  # label words joined by spaces, for phrase-prefix ranking
+
+
+class PrefixIndex:
+    def __init__(self, bulk: bool = False) -> None:
+        """bulk=True defers sorting the vocabulary to end_bulk() (initial load); search before that is not allowed."""
+        self._bulk = bulk
+        self._vocab: list[str] = []  # sorted distinct words
+        self._postings: dict[str, set[tuple[str, int]]] = {}
+        self._items: dict[tuple[str, int], AutocompleteItem] = {}
+        self._fuzzy_words: list[str] | None = None  # alphabetic vocabulary words, rebuilt when that set changes
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def put(self, kind: str, item_id: int, label: str, extra_words: tuple[str, ...] = ()) -> None:
+        """Add or replace an item; it is found by any word of label or extra_words."""
+        self.remove(kind, item_id)
+        words = tuple(dict.fromkeys([*tokenize(label), *(w for w in extra_words if w)]))
+        if not words:
+            return
+        key = (kind, item_id)
+        self._items[key] = AutocompleteItem(kind, item_id, label, words, " ".join(tokenize(label)))
+        for w in words:
+            posting = self._postings.get(w)
+            if posting is None:
+                posting = self._postings[w] = set()
+                if self._bulk:
+                    self._vocab.append(w)
+                else:
+                    insort(self._vocab, w)
+                if w.isalpha():
+                    self._fuzzy_words = None
+            posting.add(key)
+
+    def end_bulk(self) -> None:
+        self._vocab.sort()
+        self._bulk = False
+
+    def remove(self, kind: str, item_id: int) -> None:
+        item = self._items.pop((kind, item_id), None)
+        if item is None:
+            return
+        for w in item.words:
+            posting = self._postings.get(w)
+            if posting is None:
+                continue
+            posting.discard((kind, item_id))
+            if not posting:
+                del self._postings[w]
+                del self._vocab[bisect_left(self._vocab, w)]
+                if w.isalpha():
+                    self._fuzzy_words = None
+
+    def _with_prefix(self, prefix: str, limit: int) -> list[AutocompleteItem]:
+        found: dict[tuple[str, int], AutocompleteItem] = {}
+        i = bisect_left(self._vocab, prefix)
+        while i < len(self._vocab) and self._vocab[i].startswith(prefix) and len(found) < limit:
+            for key in self._postings[self._vocab[i]]:
+                found[key] = self._items[key]
+                if len(found) >= limit:
+                    break
+            i += 1
+        return list(found.values())
+
+    def search(self, query: str, limit: int = 10) -> list[AutocompleteItem]:
+        """Items having a word starting with each query word (the last one may be partial), best first."""
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        *complete, last = tokens
+        candidates = [
+            item
+            for item in self._with_prefix(last, MAX_CANDIDATES)
+            if all(any(w.startswith(t) for w in item.words) for t in complete)
+        ]
+        if len(tokens) > 1:
+            # "AB-12" style queries: also match article numbers written without separators
+            seen = {(c.kind, c.id) for c in candidates}
+            candidates += [c for c in self._with_prefix("".join(tokens), MAX_CANDIDATES) if (c.kind, c.id) not in seen]
+        phrase = " ".join(tokens)
+        candidates.sort(
+            key=lambda c: (not c.normalized.startswith(phrase), _KIND_RANK[c.kind], len(c.label), c.label)
+        )
+        return candidates[:limit]
+
+    def fuzzy_search(self, query: str, kind: str = KIND_PRODUCT, limit: int = 20) -> list[tuple[AutocompleteItem, float]]:
+        """Typo-tolerant match ("фильр масляный"): each query word is matched against the vocabulary and
+        items are ranked by the summed similarity of the query words they contain. Returns (item, score)."""
+        if self._fuzzy_words is None:
+            # Only words are misspelled; numbers and article codes would just slow the scan down
+            self._fuzzy_words = [w for w in self._vocab if w.isalpha()]
+        token_spellings: list[list[tuple[str, float]]] = []
+        for token in dict.fromkeys(tokenize(query)):
+            if token in self._postings or len(token) < FUZZY_MIN_WORD_LENGTH or not token.isalpha():
+                spellings = [(token, 100.0)] if token in self._postings else []
+            else:
+                spellings = [
+                    (word, score)
+                    for word, score, _ in process.extract(
+                        token, self._fuzzy_words, scorer=fuzz.ratio, limit=FUZZY_WORD_CHOICES, score_cutoff=FUZZY_WORD_CUTOFF
+                    )
+                ]
+            if spellings:
+                token_spellings.append(spellings)
+        if not token_spellings:
+            return []
+        # Enough items contain the best spelling of every word: they share the top score, shortest names
+        # first (among at most MAX_CANDIDATES of them, which bounds the cost of very common words)
+        best_sets = sorted((self._postings[spellings[0][0]] for spellings in token_spellings), key=len)
+        top = list(islice((key for key in best_sets[0].intersection(*best_sets[1:]) if key[0] == kind), MAX_CANDIDATES))
+        if len(top) >= limit:
+            top_score = sum(spellings[0][1] for spellings in token_spellings)
+            return [(self._items[key], top_score) for key in heapq.nsmallest(limit, top, key=lambda k: len(self._items[k].label))]
+        token_sets = sorted((set().union(*(self._postings[w] for w, _ in sp)) for sp in token_spellings), key=len)
+        # Items containing (a spelling of) every query word; partial matches only when those are too few
+        candidates = token_sets[0].intersection(*token_sets[1:])
+        if len(candidates) < limit:
+            candidates |= set(islice(chain.from_iterable(token_sets), MAX_CANDIDATES))
+        scores = dict.fromkeys(candidates, 0.0)
+        for spellings in token_spellings:
+            best: dict[tuple[str, int], float] = {}
+            for word, score in spellings:
+                for key in self._postings[word] & candidates:
+                    if score > best.get(key, 0.0):
+                        best[key] = score
+            for key, score in best.items():
+                scores[key] += score
+        scores = {key: score for key, score in scores.items() if key[0] == kind}
+        ranked = heapq.nsmallest(limit, scores.items(), key=lambda kv: (-kv[1], len(self._items[kv[0]].label)))
+        return [(self._items[key], score) for key, score in ranked]
+
+
+def _put_product(index: PrefixIndex, product_id: int, name: str, article_number: str) -> None:
+    index.put(KIND_PRODUCT, product_id, name, (compact(article_number), *tokenize(article_number)))
+
+
+def _put_machine(index: PrefixIndex, machine_id: int, brand: str, model: str) -> None:
+    index.put(KIND_MACHINE, machine_id, f"{brand} {model}", (compact(model),))
+
+
+async def build_autocomplete_index(db: AsyncSession) -> PrefixIndex:
+    index = PrefixIndex(bulk=True)
+    for node in (await get_category_index(db)).nodes:
+        index.put(KIND_CATEGORY, node.id, node.name)
+    for machine_id, brand, model in (await db.execute(select(Machine.id, Machine.brand, Machine.model))).all():
+        _put_machine(index, machine_id, brand, model)
+    # Same visibility as the public catalog: products without stock are hidden
+    result = await db.stream(
+        select(Product.id, Product.name, Product.article_number).where(Product.stock_quantity > 0)
+    )
+    async for product_id, name, article_number in result:
+        _put_product(index, product_id, name, article_number)
+    index.end_bulk()
+    return index
+
+
+async def _refresh_items(db: AsyncSession, index: PrefixIndex, product_ids: set[int], machine_ids: set[int]) -> None:
+    if product_ids:
+        result = await db.execute(
+            select(Product.id, Product.name, Product.article_number).where(
+                Product.id.in_(product_ids), Product.stock_quantity > 0
+            )
+        )
+        rows = result.all()
+        for product_id in product_ids - {row[0] for row in rows}:
+            index.remove(KIND_PRODUCT, product_id)
+        for product_id, name, article_number in rows:
+            _put_product(index, product_id, name, article_number)
+    if machine_ids:
+        result = await db.execute(select(Machine.id, Machine.brand, Machine.model).where(Machine.id.in_(machine_ids)))
+        rows = result.all()
+        for machine_id in machine_ids - {row[0] for row in rows}:
+            index.remove(KIND_MACHINE, machine_id)
+        for machine_id, brand, model in rows:
+            _put_machine(index, machine_id, brand, model)
+
+
+_index: PrefixIndex | None = None
+_build_lock = asyncio.Lock()
+_dirty_products: set[int] = set()
+_dirty_machines: set[int] = set()
+_rebuild_requested = False
+# time.monotonic() of the latest rebuild request and of the start of the latest full build: a build that
+# started after the request already reads everything the request was about (e.g. the listener's "*" on connect)
+_rebuild_requested_at = 0.0
+_built_at = 0.0
+_wakeup: asyncio.Event | None = None
+_task: asyncio.Task | None = None
+
+
+async def get_autocomplete_index() -> PrefixIndex:
+    """The worker's index; built on first use if the background task has not finished yet."""
+    global _index, _built_at
+    if _index is None:
+        async with _build_lock:
+            if _index is None:
+                started = time.monotonic()
+                async with background_session() as session:
+                    _index = await build_autocomplete_index(session)
+                _built_at = started
+    return _index
+
+
+def _id_from(key: str, prefix: str) -> int | None:
+    try:
+        return int(key[len(prefix):])
+    except ValueError:
+        return None
+
+
+def _request_rebuild() -> None:
+    global _rebuild_requested, _rebuild_requested_at
+    _rebuild_requested = True
+    _rebuild_requested_at = time.monotonic()
+
+
+def _on_invalidation(keys: list[str]) -> None:
+    for key in keys:
+        if key in ("*", CATALOG_GENERATION_KEY):
+            _request_rebuild()
+        elif key.startswith(_PRODUCT_TAG) and (pid := _id_from(key, _PRODUCT_TAG)) is not None:
+            _dirty_products.add(pid)
+        elif key.startswith(_MACHINE_TAG) and (mid := _id_from(key, _MACHINE_TAG)) is not None:
+            _dirty_machines.add(mid)
+    if _wakeup is not None and (_rebuild_requested or _dirty_products or _dirty_machines):
+        _wakeup.set()
+
+
+async def _maintain_index() -> None:
+    global _index, _rebuild_requested, _built_at
+    while True:
+        try:
+            try:
+                await asyncio.wait_for(_wakeup.wait(), timeout=AUTOCOMPLETE_REBUILD_INTERVAL)
+            except asyncio.TimeoutError:
+                _request_rebuild()
+            _wakeup.clear()
+            # Invalidations are published after commit (cache_tags.commit_and_invalidate): reload right away
+            async with _build_lock:
+                # A request may have built it meanwhile, after the rebuild was asked for
+                rebuild = _index is None or (_rebuild_requested and _rebuild_requested_at >= _built_at)
+                product_ids, machine_ids = set(_dirty_products), set(_dirty_machines)
+                _rebuild_requested = False
+                _dirty_products.clear()
+                _dirty_machines.clear()
+                started = time.monotonic()
+                async with background_session() as session:
+                    if rebuild:
+                        _index = await build_autocomplete_index(session)
+                        _built_at = started
+                    else:
+                        await _refresh_items(session, _index, product_ids, machine_ids)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("Autocomplete index update failed, rebuilding on next wakeup: %s", e)
+            _request_rebuild()
+            await asyncio.sleep(1)
+
+
+def start_autocomplete_index() -> None:
+    """Build the index in the background and keep it current (call from the app lifespan)."""
+    global _task, _wakeup
+    if _task is not None and not _task.done():
+        return
+    _wakeup = asyncio.Event()
+    # The first pass is woken by the "*" the invalidation listener sends once it has subscribed (or failed
+    # to), so the index is built once at boot, from data no older than the subscription
+    on_invalidation(_on_invalidation)
+    _task = asyncio.create_task(_maintain_index())
+
+
+async def stop_autocomplete_index() -> None:
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except (asyncio.CancelledError, Exception):
+            pass
+        _task = None
+
+
+async def fuzzy_product_ids(q: str, limit: int = 20) -> list[int]:
+    """Ids of catalog products whose names best match a possibly misspelled query, best first."""
+    index = await get_autocomplete_index()
+    return [item.id for item, _ in index.fuzzy_search(q, KIND_PRODUCT, limit)]
+
+
+async def autocomplete(q: str, limit: int = 10) -> list[AutocompleteOut]:
+    index = await get_autocomplete_index()
+    return [AutocompleteOut(kind=item.kind, id=item.id, label=item.label) for item in index.search(q, limit)]
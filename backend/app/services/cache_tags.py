@@ -0,0 +1,258 @@
+"""Tag-based selective invalidation for catalog cache entries.
+
+Each tag ("product:12", "category:3", "vendor:7", "machine:2", "all") has a version counter in Redis.
+A tagged entry stores the versions of its tags at build time and is treated as a miss as soon as
+any of them has been bumped, so a change only evicts the pages that can contain the product:
+
+- listing pages are tagged with their filter dimensions (category / vendor / machine, or "all"
+  when unfiltered) plus one product tag per item on the page;
+- changes that can move a product in or out of a listing (create, delete, category, vendor,
+  name/article, status, stock crossing zero) bump its dimension tags; anything else (price,
+  description, images, reviews) bumps only its product tag.
+
+Writers bump tags only after committing (commit_and_invalidate), so an entry stored under the new
+versions was always built from committed rows.
+
+The catalog generation (redis_client.cache_key_prefix) remains the "drop everything" switch.
+"""
+import logging
+from typing import Any, Iterable
+
+import orjson
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.compatibility import CompatibilityMatrix
+from app.models.product import Product, ProductStatus
+from app.services.category_index import get_category_index
+from app.services.redis_client import cache_get, cache_get_bytes, cache_get_many, cache_set, cache_set_bytes, cache_set_many, get_redis, local_cache, publish_invalidation
+
+logger = logging.getLogger(__name__)
+
+TAG_KEY_PREFIX = "cachetag:"
+TAG_VERSION_TTL = 7 * 24 * 3600  # must outlive every tagged entry
+ALL_TAG = "all"
+PRICE_TAG = "price"  # listings filtered or sorted by price: any price change can reorder them
+
+
+def product_tag(product_id: int) -> str:
+    return f"product:{product_id}"
+
+
+def category_tag(category_id: int) -> str:
+    return f"category:{category_id}"
+
+
+def vendor_tag(vendor_id: int) -> str:
+    return f"vendor:{vendor_id}"
+
+
+def machine_tag(machine_id: int) -> str:
+    return f"machine:{machine_id}"
+
+
+async def tag_versions(tags: Iterable[str]) -> dict[str, int] | None:
+    """Current version of each tag (0 if never bumped). None when Redis is unavailable.
+
+    Versions are kept in the L1 cache; invalidate_tags() evicts them on every worker.
+    """
+    tags = sorted(set(tags))
+    versions: dict[str, int] = {}
+    missing: list[str] = []
+    for t in tags:
+        v = local_cache.get(TAG_KEY_PREFIX + t)
+        if v is None:
+            missing.append(t)
+        else:
+            versions[t] = v
+    if missing:
+        try:
+            r = await get_redis()
+            values = await r.mget([TAG_KEY_PREFIX + t for t in missing])
+        except Exception as e:
+            logger.warning("Cache tag versions read failed: %s", e)
+            return None
+        for t, v in zip(missing, values):
+            versions[t] = int(v or 0)
+            local_cache.set(TAG_KEY_PREFIX + t, versions[t])
+    return versions
+
+
+async def cache_lookup_tagged(key: str) -> tuple[Any | None, bool]:
+    """Return (value, is_current) for key; is_current is False once any of its tags changed.
+
+    Invalidated values are still returned so callers can fall back to them when the DB fails.
+    """
+    entry = await cache_get(key)
+    if not isinstance(entry, dict) or "tags" not in entry:
+        return None, False
+    current = await tag_versions(entry["tags"])
+    return entry.get("v"), current is not None and current == entry["tags"]
+
+
+async def cache_get_tagged(key: str) -> Any | None:
+    """Return the cached value for key, or None if missing or any of its tags changed since it was stored."""
+    value, is_current = await cache_lookup_tagged(key)
+    return value if is_current else None
+
+
+async def cache_set_tagged(key: str, value: Any, versions: dict[str, int] | None, ttl: int | None = None) -> None:
+    """Store value with the given tag versions.
+
+    Read versions with tag_versions() *before* loading the data, so an invalidation that races
+    with the load leaves the entry already stale instead of caching old data under new versions.
+    """
+    if versions is None:
+        return
+    await cache_set(key, {"tags": versions, "v": value}, ttl=ttl)
+
+
+async def cache_get_tagged_many(keys: list[str]) -> dict[str, Any]:
+    """cache_get_tagged for several keys with one MGET and one tag version read; stale or missing keys are left out."""
+    entries = {
+        key: entry
+        for key, entry in (await cache_get_many(keys)).items()
+        if isinstance(entry, dict) and isinstance(entry.get("tags"), dict)
+    }
+    if not entries:
+        return {}
+    current = await tag_versions(t for entry in entries.values() for t in entry["tags"])
+    if current is None:
+        return {}
+    return {
+        key: entry.get("v")
+        for key, entry in entries.items()
+        if all(current.get(t) == v for t, v in entry["tags"].items())
+    }
+
+
+async def cache_set_tagged_many(entries: dict[str, tuple[Any, Iterable[str]]], versions: dict[str, int] | None, ttl: int | None = None) -> None:
+    """cache_set_tagged for several keys: entries maps key -> (value, its tags); versions come from one tag_versions() call."""
+    if versions is None:
+        return
+    await cache_set_many(
+        {key: {"tags": {t: versions.get(t, 0) for t in tags}, "v": value} for key, (value, tags) in entries.items()},
+        ttl=ttl,
+    )
+
+
+async def cache_lookup_tagged_body(key: str) -> tuple[dict | None, bytes | None, bool]:
+    """Pre-encoded variant of cache_lookup_tagged: return (header, body, is_current).
+
+    The entry is a small JSON header line ({"tags": ..., plus caller metadata}) followed by the
+    body bytes exactly as they will be sent, so a hit never decodes or re-encodes the body.
+    """
+    raw = await cache_get_bytes(key)
+    if raw is None:
+        return None, None, False
+    head, sep, body = raw.partition(b"\n")
+    try:
+        header = orjson.loads(head) if sep else None
+    except orjson.JSONDecodeError:
+        header = None
+    if not isinstance(header, dict) or not isinstance(header.get("tags"), dict):
+        return None, None, False
+    current = await tag_versions(header["tags"])
+    return header, body, current is not None and current == header["tags"]
+
+
+async def cache_set_tagged_body(
+    key: str, body: bytes, versions: dict[str, int] | None, meta: dict | None = None, ttl: int | None = None
+) -> None:
+    """Store pre-encoded body bytes with tag versions and extra header metadata (see cache_lookup_tagged_body)."""
+    if versions is None:
+        return
+    header = orjson.dumps({**(meta or {}), "tags": versions})
+    await cache_set_bytes(key, header + b"\n" + body, ttl=ttl)
+
+
+async def invalidate_tags(tags: Iterable[str]) -> None:
+    """Bump every tag's version, invalidating all entries stored under any of them."""
+    tags = set(tags)
+    if not tags:
+        return
+    try:
+        r = await get_redis()
+        async with r.pipeline(transaction=False) as pipe:
+            for t in tags:
+                pipe.incr(TAG_KEY_PREFIX + t)
+                pipe.expire(TAG_KEY_PREFIX + t, TAG_VERSION_TTL)
+            await pipe.execute()
+    except Exception as e:
+        logger.warning("Cache tag invalidation failed: %s", e)
+    await publish_invalidation(*(TAG_KEY_PREFIX + t for t in tags))
+
+
+def listing_state(product: Product) -> tuple:
+    """Fields that decide whether / where a product appears in catalog listings."""
+    return (
+        product.category_id,
+        product.vendor_id,
+        product.name,
+        product.article_number,
+        product.status == ProductStatus.in_stock,
+        (product.stock_quantity or 0) > 0,
+    )
+
+
+async def product_cache_tags(
+    db: AsyncSession,
+    products: list[Product],
+    membership: bool = True,
+    previous_category_ids: Iterable[int | None] = (),
+    previous_vendor_ids: Iterable[int] = (),
+    price_changed: bool = False,
+) -> set[str]:
+    """Tags of the cache entries showing products.
+
+    membership=False: only their product tags (entries that display them).
+    membership=True: also every listing they could enter or leave (category and its ancestors,
+    vendor, compatible machines, unfiltered listings). Pass the pre-update category/vendor ids
+    when those changed so listings the product left are invalidated too.
+    price_changed (or membership): also listings filtered or sorted by price.
+    """
+    if not products:
+        return set()
+    tags = {product_tag(p.id) for p in products}
+    if membership or price_changed:
+        tags.add(PRICE_TAG)
+    if membership:
+        tags.add(ALL_TAG)
+        index = await get_category_index(db)
+        category_ids = {p.category_id for p in products} | set(previous_category_ids)
+        for cid in category_ids:
+            if cid is not None:
+                tags.add(category_tag(cid))
+                tags.update(category_tag(a) for a in index.ancestor_ids(cid))
+        tags.update(vendor_tag(v) for v in {p.vendor_id for p in products} | set(previous_vendor_ids))
+        product_ids = [p.id for p in products if p.id is not None]
+        if product_ids:
+            result = await db.execute(
+                select(CompatibilityMatrix.machine_id).where(CompatibilityMatrix.product_id.in_(product_ids)).distinct()
+            )
+            tags.update(machine_tag(m) for m in result.scalars().all())
+    return tags
+
+
+async def commit_and_invalidate(db: AsyncSession, tags: Iterable[str]) -> None:
+    """Commit db, then bump tags.
+
+    Bumping first would let a concurrent reader see the new versions but still the pre-commit rows,
+    and cache those as current. Call it as the last write of the request.
+    """
+    await db.commit()
+    await invalidate_tags(tags)
+
+
+async def invalidate_products(
+    db: AsyncSession,
+    products: list[Product],
+    membership: bool = True,
+    previous_category_ids: Iterable[int | None] = (),
+    previous_vendor_ids: Iterable[int] = (),
+    price_changed: bool = False,
+) -> None:
+    """Commit db, then invalidate the cache entries showing products (see product_cache_tags)."""
+    tags = await product_cache_tags(db, products, membership, previous_category_ids, previous_vendor_ids, price_changed)
+    await commit_and_invalidate(db, tags)
@@ -1,30 +1,15 @@
 """Build catalog context string for the chat assistant (real-time category tree + optional product counts/snippet)."""
 import re
+from itertools import islice
+
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, or_
-
-from app.models.category import Category
-from app.models.product import Product, ProductStatus
-from app.models.compatibility import CompatibilityMatrix
-
-
-def _build_tree_flat(
-    categories: list[Category],
-    parent_id: int | None = None,
-    indent: int = 0,
-    max_depth: int | None = None,
-) -> list[tuple[str, str, str, int]]:
-    """Return list of (name, slug, indent_str, id) for serialization. Optional max_depth to limit depth."""
-    out = []
-    for c in categories:
-        if c.parent_id != parent_id:
-            continue
-        if max_depth is not None and indent >= max_depth:
-            continue
-        prefix = "  " * indent
-        out.append((c.name, c.slug, prefix, c.id))
-        out.extend(_build_tree_flat(categories, c.id, indent + 1, max_depth=max_depth))
-    return out
+from sqlalchemy import select, func
+
+from app.models.product import Product
+from app.services.machine_compat import get_machine_product_ids, product_id_in
+from app.services.autocomplete import fuzzy_product_ids
+from app.services.category_index import get_category_index
+from app.services.product_search import normalize_search_terms, apply_product_search, article_search_key, catalog_order_by
 
 
 async def build_catalog_context(
@@ -34,15 +19,13 @@ async def build_catalog_context(
     max_category_entries: int = 80,
 ) -> str:
     """Load category tree and optionally product counts; return a string for the LLM prompt. Limited by max_depth and max_category_entries to reduce tokens."""
-    result = await db.execute(select(Category).order_by(Category.slug))
-    categories = list(result.scalars().all())
-    if not categories:
+    index = await get_category_index(db)
+    if not index.nodes:
         return "Каталог пуст (нет категорий)."
 
     lines = ["Текущие разделы каталога (на момент запроса). Формат ссылки: /catalog?category=ID или /catalog?q=поиск:"]
-    flat = _build_tree_flat(categories, max_depth=max_depth)[:max_category_entries]
-    for name, slug, prefix, cid in flat:
-        lines.append(f"{prefix}- {name} (id: {cid}, slug: {slug})")
+    for node, depth in islice(index.walk(max_depth=max_depth), max_category_entries):
+        lines.append(f"{'  ' * depth}- {node.name} (id: {node.id}, slug: {node.slug})")
 
     if include_product_counts:
         count_stmt = (
@@ -53,38 +36,15 @@ async def build_catalog_context(
         count_result = await db.execute(count_stmt)
         counts = {row[0]: row[1] for row in count_result.all()}
 
-        def count_in_category(cat_id: int) -> int:
-            total = counts.get(cat_id, 0)
-            for c in categories:
-                if c.parent_id == cat_id:
-                    total += count_in_category(c.id)
-            return total
-
         lines.append("")
         lines.append("Количество товаров по разделам (включая подразделы):")
-        for c in categories:
-            if c.parent_id is None:
-                n = count_in_category(c.id)
-                lines.append(f"- {c.name}: {n} товаров")
+        for cid in index.children.get(None, ()):
+            n = sum(counts.get(d, 0) for d in index.descendant_ids(cid))
+            lines.append(f"- {index.by_id[cid].name}: {n} товаров")
 
     return "\n".join(lines)
 
 
-def _collect_descendant_ids(categories: list[Category], root_id: int) -> set[int]:
-    by_parent: dict[int | None, list[Category]] = {}
-    for c in categories:
-        by_parent.setdefault(c.parent_id, []).append(c)
-    ids = {root_id}
-
-    def add_children(pid: int) -> None:
-        for child in by_parent.get(pid) or []:
-            ids.add(child.id)
-            add_children(child.id)
-
-    add_children(root_id)
-    return ids
-
-
 def _normalize_for_match(s: str) -> str:
     """Lowercase and collapse spaces for matching."""
     return (s or "").lower().strip()
@@ -96,8 +56,7 @@ async def resolve_category_by_query(db: AsyncSession, query: str) -> int | None:
     """
     if not (query or "").strip():
         return None
-    result = await db.execute(select(Category).order_by(Category.slug))
-    categories = list(result.scalars().all())
+    categories = (await get_category_index(db)).nodes
     if not categories:
         return None
     query_lower = _normalize_for_match(query)
@@ -127,48 +86,45 @@ async def get_products_snippet(
     """Return a short text list of products for the chat context (name, price, category).
     Uses search_terms (OR) when provided, else q. Filters by machine compatibility when machine_id is set.
     """
-    stmt = select(Product, Category.name).outerjoin(Category, Product.category_id == Category.id)
+    # Only the columns the snippet prints: no ORM objects, no description / JSONB transfer
+    stmt = select(Product.name, Product.price)
 
     if machine_id is not None:
-        stmt = stmt.join(CompatibilityMatrix, Product.id == CompatibilityMatrix.product_id).where(
-            CompatibilityMatrix.machine_id == machine_id
-        )
+        machine_product_ids = await get_machine_product_ids(db, machine_id)
+        if not machine_product_ids:
+            return ""
+        stmt = stmt.where(product_id_in(machine_product_ids))
 
     stmt = stmt.where(Product.stock_quantity > 0)
 
-    category_ids: set[int] | None = None
     if category_id is not None:
-        result = await db.execute(select(Category))
-        all_cats = list(result.scalars().all())
-        category_ids = _collect_descendant_ids(all_cats, category_id)
+        category_ids = (await get_category_index(db)).descendant_ids(category_id)
         stmt = stmt.where(Product.category_id.in_(category_ids))
 
-    terms = search_terms if search_terms else ([q.strip()] if q and q.strip() else [])
-    if terms:
-        stmt = stmt.where(
-            or_(
-                *[
-                    or_(
-                        Product.article_number.ilike(f"%{t}%"),
-                        Product.name.ilike(f"%{t}%"),
-                    )
-                    for t in terms
-                ]
-            )
-        )
-
-    stmt = stmt.order_by(
-        (Product.status == ProductStatus.in_stock).desc(),
-        Product.name,
-    ).limit(limit)
-    result = await db.execute(stmt)
-    rows = result.all()
+    terms = normalize_search_terms(q, search_terms)
+    article_key = article_search_key(terms)
+    if article_key:
+        exact = (await db.execute(stmt.where(Product.article_key == article_key).order_by(*catalog_order_by()).limit(limit))).all()
+        if exact:
+            return _format_snippet(exact)
+    searched, rank = apply_product_search(stmt, terms)
+    rows = (await db.execute(searched.order_by(*catalog_order_by(rank)).limit(limit))).all()
+    if not rows and q:
+        # Nothing matched as typed: try a typo-tolerant name match from the in-memory index
+        ranked_ids = await fuzzy_product_ids(q, limit=limit)
+        if ranked_ids:
+            position = {pid: i for i, pid in enumerate(ranked_ids)}
+            found = (await db.execute(stmt.add_columns(Product.id).where(Product.id.in_(ranked_ids)))).all()
+            rows = sorted(found, key=lambda row: position[row.id])
+    return _format_snippet(rows)
+
+
+def _format_snippet(rows) -> str:
     if not rows:
         return ""
-
     max_name_len = 70
     lines = ["Примеры товаров (название, цена):"]
-    for product, _cat_name in rows:
+    for product in rows:
         price = float(product.price) if product.price else 0
         name = (product.name or "")[:max_name_len]
         if len(product.name or "") > max_name_len:
@@ -0,0 +1,85 @@
+"""Count strategy for catalog listings.
+
+Exact COUNT(*) over a filtered catalog costs about as much as the page query itself. Instead:
+- count exactly, but stop after EXACT_COUNT_LIMIT rows (cheap for small result sets);
+- above that, use the planner's row estimate from EXPLAIN (total_is_estimate=True);
+- cache the result per filter set (independent of skip/limit/cursor) so paging never recounts.
+"""
+import json
+import logging
+
+from sqlalchemy import Select, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.base import Executable
+from sqlalchemy.sql.elements import ClauseElement
+
+from app.services.cache_tags import cache_get_tagged, cache_set_tagged
+from app.services.redis_client import cache_get, cache_set
+
+logger = logging.getLogger(__name__)
+
+EXACT_COUNT_LIMIT = 1000
+COUNT_CACHE_TTL = 600  # 10 min
+
+
+class Explain(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) <stmt> with the statement's bound parameters kept as parameters."""
+
+    inherit_cache = False
+
+    def __init__(self, stmt: Select):
+        self.statement = stmt
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element: Explain, compiler, **kw) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+async def estimate_row_count(db: AsyncSession, stmt: Select) -> int | None:
+    """Planner estimate of rows returned by stmt (EXPLAIN, no execution). None if unavailable."""
+    try:
+        # A savepoint, so an EXPLAIN that fails in Postgres (statement timeout, cancel) does not abort the
+        # transaction count_rows falls back to for its exact COUNT
+        async with db.begin_nested():
+            plan = (await db.execute(Explain(stmt))).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except Exception as e:
+        logger.warning("Catalog count estimate failed: %s", e)
+        return None
+
+
+async def count_rows(db: AsyncSession, stmt: Select, exact_limit: int = EXACT_COUNT_LIMIT) -> tuple[int, bool]:
+    """Return (total, is_estimate) for the rows of stmt."""
+    capped = select(func.count()).select_from(stmt.limit(exact_limit + 1).subquery())
+    n = (await db.execute(capped)).scalar() or 0
+    if n <= exact_limit:
+        return n, False
+    estimate = await estimate_row_count(db, stmt)
+    if estimate is None:
+        exact = select(func.count()).select_from(stmt.subquery())
+        return (await db.execute(exact)).scalar() or 0, False
+    # The planner can under-estimate; we already know there are more than exact_limit rows.
+    return max(estimate, n), True
+
+
+async def cached_count_rows(
+    db: AsyncSession, stmt: Select, cache_key: str, tag_versions: dict[str, int] | None = None
+) -> tuple[int, bool]:
+    """count_rows() with a cache entry per filter set (tagged when tag_versions is given, see cache_tags)."""
+    if tag_versions is not None:
+        cached = await cache_get_tagged(cache_key)
+    else:
+        cached = await cache_get(cache_key)
+    if isinstance(cached, dict) and "total" in cached:
+        return int(cached["total"]), bool(cached.get("estimate"))
+    total, is_estimate = await count_rows(db, stmt)
+    value = {"total": total, "estimate": is_estimate}
+    if tag_versions is not None:
+        await cache_set_tagged(cache_key, value, tag_versions, ttl=COUNT_CACHE_TTL)
+    else:
+        await cache_set(cache_key, value, ttl=COUNT_CACHE_TTL)
+    return total, is_estimate
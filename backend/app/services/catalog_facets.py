@@ -0,0 +1,77 @@
+"""Catalog facet counts: per category, vendor, status and in-stock for one filter set.
+
+All facets come from a single GROUPING SETS query over the filtered products; category counts
+are then rolled up through the category index so a parent counts its subcategories' products.
+"""
+from dataclasses import dataclass, field
+
+from sqlalchemy import Select, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.product import Product
+from app.services.category_index import CategoryIndex
+
+# GROUPING(category_id, vendor_id, status, in_stock) bitmask per grouping set (1 = column not grouped)
+_BY_CATEGORY = 0b0111
+_BY_VENDOR = 0b1011
+_BY_STATUS = 0b1101
+_BY_IN_STOCK = 0b1110
+_TOTAL = 0b1111
+
+
+@dataclass
+class FacetCounts:
+    total: int = 0
+    in_stock: int = 0
+    categories: dict[int, int] = field(default_factory=dict)  # category id -> products directly in it
+    vendors: dict[int, int] = field(default_factory=dict)
+    statuses: dict[str, int] = field(default_factory=dict)
+
+
+def facets_query(stmt: Select) -> Select:
+    """Grouped facet query for a filtered products select (its columns and ordering are ignored)."""
+    filtered = stmt.with_only_columns(
+        Product.category_id,
+        Product.vendor_id,
+        Product.status,
+        (Product.stock_quantity > 0).label("in_stock"),
+    ).order_by(None).subquery()
+    c = filtered.c
+    return select(
+        func.grouping(c.category_id, c.vendor_id, c.status, c.in_stock).label("g"),
+        c.category_id,
+        c.vendor_id,
+        c.status,
+        c.in_stock,
+        func.count().label("n"),
+    ).group_by(
+        func.grouping_sets(
+            tuple_(c.category_id), tuple_(c.vendor_id), tuple_(c.status), tuple_(c.in_stock), tuple_()
+        )
+    )
+
+
+async def facet_counts(db: AsyncSession, stmt: Select) -> FacetCounts:
+    """Count the products matched by stmt per facet in one round trip."""
+    out = FacetCounts()
+    for row in (await db.execute(facets_query(stmt))).all():
+        if row.g == _TOTAL:
+            out.total = row.n
+        elif row.g == _BY_CATEGORY and row.category_id is not None:
+            out.categories[row.category_id] = row.n
+        elif row.g == _BY_VENDOR:
+            out.vendors[row.vendor_id] = row.n
+        elif row.g == _BY_STATUS:
+            out.statuses[getattr(row.status, "value", row.status)] = row.n
+        elif row.g == _BY_IN_STOCK and row.in_stock:
+            out.in_stock = row.n
+    return out
+
+
+def roll_up_categories(counts: dict[int, int], index: CategoryIndex) -> dict[int, int]:
+    """Per-category counts including all subcategories (each product also counts for every ancestor)."""
+    totals: dict[int, int] = {}
+    for cid, n in counts.items():
+        for target in (cid, *index.ancestor_ids(cid)):
+            totals[target] = totals.get(target, 0) + n
+    return totals
@@ -0,0 +1,162 @@
+"""In-process category tree index shared by catalog filters, the chat context and /categories/tree.
+
+Categories change rarely but were re-read (whole table) and re-walked on every catalog request.
+Each worker now keeps one immutable CategoryIndex with precomputed descendant sets, ancestors,
+slug lookups and the serialized tree. A version counter in Redis (bumped on category create/delete)
+tells other workers to rebuild; between checks (VERSION_CHECK_INTERVAL) lookups cost no I/O at all.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.category import Category
+from app.services.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+CATEGORY_INDEX_VERSION_KEY = "category_index:version"
+VERSION_CHECK_INTERVAL = 5.0  # seconds between Redis version checks per worker
+MAX_INDEX_AGE = 600.0  # rebuild at least this often, even if Redis is unreachable or a bump was missed
+
+
+@dataclass(frozen=True)
+class CategoryNode:
+    id: int
+    parent_id: int | None
+    name: str
+    slug: str
+
+
+@dataclass(frozen=True)
+class CategoryIndex:
+    version: str | None
+    nodes: tuple[CategoryNode, ...]  # ordered by slug
+    by_id: dict[int, CategoryNode]
+    children: dict[int | None, tuple[int, ...]]
+    descendants: dict[int, frozenset[int]]  # includes the category itself
+    ancestors: dict[int, tuple[int, ...]]  # root first, parent last
+    id_by_slug: dict[str, int]
+    tree: list[dict]  # CategoryTreeOut-shaped dicts for GET /categories/tree
+
+    def descendant_ids(self, category_id: int) -> frozenset[int]:
+        """category_id plus all its descendants (just category_id when unknown)."""
+        return self.descendants.get(category_id, frozenset((category_id,)))
+
+    def ancestor_ids(self, category_id: int) -> tuple[int, ...]:
+        return self.ancestors.get(category_id, ())
+
+    def slug_of(self, category_id: int | None) -> str | None:
+        node = self.by_id.get(category_id) if category_id is not None else None
+        return node.slug if node else None
+
+    def walk(self, parent_id: int | None = None, depth: int = 0, max_depth: int | None = None):
+        """Yield (node, depth) depth-first in slug order."""
+        if max_depth is not None and depth >= max_depth:
+            return
+        for cid in self.children.get(parent_id, ()):
+            yield self.by_id[cid], depth
+            yield from self.walk(cid, depth + 1, max_depth)
+
+
+def build_category_index(categories: list[CategoryNode], version: str | None = None) -> CategoryIndex:
+    """Build an index from nodes (any order). Cycles and dangling parents are treated as roots."""
+    nodes = tuple(sorted(categories, key=lambda c: c.slug))
+    by_id = {c.id: c for c in nodes}
+    children: dict[int | None, list[int]] = {}
+    for c in nodes:
+        parent = c.parent_id if c.parent_id in by_id else None
+        children.setdefault(parent, []).append(c.id)
+
+    descendants: dict[int, frozenset[int]] = {}
+    ancestors: dict[int, tuple[int, ...]] = {}
+
+    def visit(cid: int, path: tuple[int, ...]) -> frozenset[int]:
+        ancestors[cid] = path
+        ids = {cid}
+        for child in children.get(cid, ()):
+            if child not in ancestors:
+                ids |= visit(child, path + (cid,))
+        descendants[cid] = frozenset(ids)
+        return descendants[cid]
+
+    for root in children.get(None, ()):
+        visit(root, ())
+
+    def subtree(parent_id: int | None) -> list[dict]:
+        return [
+            {
+                "id": cid,
+                "parent_id": by_id[cid].parent_id,
+                "name": by_id[cid].name,
+                "slug": by_id[cid].slug,
+                "children": subtree(cid),
+            }
+            for cid in children.get(parent_id, ())
+        ]
+
+    return CategoryIndex(
+        version=version,
+        nodes=nodes,
+        by_id=by_id,
+        children={k: tuple(v) for k, v in children.items()},
+        descendants=descendants,
+        ancestors=ancestors,
+        id_by_slug={c.slug: c.id for c in nodes},
+        tree=subtree(None),
+    )
+
+
+_index: CategoryIndex | None = None
+_built_at = 0.0
+_checked_at = 0.0
+_lock = asyncio.Lock()
+
+
+async def _remote_version() -> str | None:
+    try:
+        r = await get_redis()
+        return await r.get(CATEGORY_INDEX_VERSION_KEY) or "0"
+    except Exception as e:
+        logger.warning("Category index version check failed: %s", e)
+        return None
+
+
+async def _load(db: AsyncSession, version: str | None) -> CategoryIndex:
+    result = await db.execute(select(Category.id, Category.parent_id, Category.name, Category.slug))
+    return build_category_index([CategoryNode(*row) for row in result.all()], version)
+
+
+async def get_category_index(db: AsyncSession) -> CategoryIndex:
+    """Return the current index, rebuilding it from db only when another worker bumped the version."""
+    global _index, _built_at, _checked_at
+    now = time.monotonic()
+    index = _index
+    if index is not None and now - _checked_at < VERSION_CHECK_INTERVAL and now - _built_at < MAX_INDEX_AGE:
+        return index
+    async with _lock:
+        if _index is not index and _index is not None:
+            return _index
+        version = await _remote_version()
+        now = time.monotonic()
+        fresh = index is not None and now - _built_at < MAX_INDEX_AGE
+        if fresh and version is not None and version == index.version:
+            _checked_at = now
+            return index
+        _index = await _load(db, version)
+        _built_at = _checked_at = time.monotonic()
+        return _index
+
+
+async def invalidate_category_index() -> None:
+    """Drop this worker's index and bump the shared version so every worker rebuilds. Call after commit."""
+    global _index
+    _index = None
+    try:
+        r = await get_redis()
+        await r.incr(CATEGORY_INDEX_VERSION_KEY)
+    except Exception as e:
+        logger.warning("Category index invalidation failed: %s", e)
@@ -0,0 +1,98 @@
+"""In-process (L1) cache and single-flight helper used in front of Redis (see redis_client).
+
+LocalCache is an LRU with per-entry TTL, bounded by entry count (local_cache_max_entries) and by the
+total size of its bytes/str values such as pre-encoded response bodies (local_cache_max_bytes); a
+single value larger than that byte budget is not kept. Values are shared between callers and must be
+treated as read-only. Entries are evicted across uvicorn workers via Redis pub/sub; the short TTL
+bounds staleness if an invalidation message is lost.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, TypeVar
+
+T = TypeVar("T")
+
+_MISSING = object()
+
+
+def _size(value: Any) -> int:
+    """Bytes counted against LocalCache.max_bytes; only raw bodies and strings are large enough to matter."""
+    return len(value) if isinstance(value, (bytes, bytearray, str)) else 0
+
+
+class LocalCache:
+    def __init__(self, max_entries: int, ttl: float, max_bytes: int = 0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes  # 0 = no byte budget
+        self.size_bytes = 0
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        item = self._data.get(key, _MISSING)
+        if item is _MISSING:
+            return default
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            self._pop(key)
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: float | None = None) -> None:
+        if self.max_entries <= 0:
+            return
+        size = _size(value)
+        if self.max_bytes and size > self.max_bytes:
+            self._pop(key)  # never serve an older copy of a value we declined to keep
+            return
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        self._pop(key)
+        self._data[key] = (time.monotonic() + ttl, value)
+        self.size_bytes += size
+        while len(self._data) > self.max_entries or (self.max_bytes and self.size_bytes > self.max_bytes):
+            _, (_, evicted) = self._data.popitem(last=False)
+            self.size_bytes -= _size(evicted)
+
+    def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._pop(key)
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.size_bytes = 0
+
+    def _pop(self, key: str) -> None:
+        item = self._data.pop(key, None)
+        if item is not None:
+            self.size_bytes -= _size(item[1])
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SingleFlight:
+    """Run at most one loader per key at a time in this process; concurrent callers await its result."""
+
+    def __init__(self) -> None:
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    async def run(self, key: str, loader: Callable[[], Awaitable[T]]) -> T:
+        fut = self._inflight.get(key)
+        if fut is not None:
+            return await asyncio.shield(fut)
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[key] = fut
+        try:
+            result = await loader()
+        except BaseException as e:
+            fut.set_exception(e)
+            # Waiters re-raise it; mark retrieved so an unawaited failure is not logged as "never retrieved"
+            fut.exception()
+            raise
+        else:
+            fut.set_result(result)
+            return result
+        finally:
+            self._inflight.pop(key, None)
@@ -0,0 +1,71 @@
+"""Per-machine compatible product ids, cached as compact int arrays.
+
+Garage-filtered catalog pages, the chat snippet and recommendations filter by these ids
+(product.id = ANY(...)) instead of joining compatibility_matrix on every request; a machine
+without compatible products short-circuits to an empty result without a query. The cache is
+rebuilt from the machine-first index of alembic 029 and tagged with the machine tag, which
+add_compatibility and invalidate_products already bump.
+"""
+from array import array
+from typing import Iterable, Sequence
+
+from sqlalchemy import Integer, any_, literal, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.models.compatibility import CompatibilityMatrix
+from app.models.product import Product
+from app.services.cache_tags import cache_lookup_tagged_body, cache_set_tagged_body, machine_tag, tag_versions
+from app.services.redis_client import coalesce
+
+MACHINE_PRODUCTS_TTL = 3600
+_ARRAY_TYPECODE = "i"  # int32, like products.id
+
+
+def _cache_key(machine_id: int) -> str:
+    return f"machine_products:{machine_id}"
+
+
+def _decode(body: bytes) -> array:
+    ids = array(_ARRAY_TYPECODE)
+    ids.frombytes(body)
+    return ids
+
+
+async def _cached(machine_id: int) -> array | None:
+    _, body, is_current = await cache_lookup_tagged_body(_cache_key(machine_id))
+    return _decode(body) if is_current else None
+
+
+async def get_machine_product_ids(db: AsyncSession, machine_id: int) -> array:
+    """Sorted ids of the products compatible with machine_id."""
+    cached = await _cached(machine_id)
+    if cached is not None:
+        return cached
+
+    async def load() -> array:
+        versions = await tag_versions([machine_tag(machine_id)])
+        result = await db.execute(
+            select(CompatibilityMatrix.product_id)
+            .where(CompatibilityMatrix.machine_id == machine_id)
+            .order_by(CompatibilityMatrix.product_id)
+        )
+        ids = array(_ARRAY_TYPECODE, result.scalars().all())
+        await cache_set_tagged_body(_cache_key(machine_id), ids.tobytes(), versions, ttl=MACHINE_PRODUCTS_TTL)
+        return ids
+
+    return await coalesce(_cache_key(machine_id), load, lambda: _cached(machine_id))
+
+
+async def get_machines_product_ids(db: AsyncSession, machine_ids: Iterable[int]) -> list[int]:
+    """Sorted ids of the products compatible with any of machine_ids."""
+    ids: set[int] = set()
+    for machine_id in set(machine_ids):
+        ids.update(await get_machine_product_ids(db, machine_id))
+    return sorted(ids)
+
+
+def product_id_in(ids: Sequence[int]) -> ColumnElement:
+    """products.id = ANY(:ids) with the ids bound as one int array parameter (not one parameter per id)."""
+    return Product.id == any_(literal(list(ids), ARRAY(Integer)))
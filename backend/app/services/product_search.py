@@ -0,0 +1,163 @@
+"""Catalog product search: full-text (tsvector) + trigram (pg_trgm) matching with relevance ranking.
+
+Shared by GET /products, the chat products snippet and admin global search so every
+product search hits the same GIN indexes (see alembic 024_product_search_indexes).
+"""
+from decimal import Decimal, InvalidOperation
+from typing import Literal
+
+from sqlalchemy import Select, and_, case, func, or_
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.models.product import Product, ProductStatus
+from app.utils import looks_like_article_number, normalize_article_number
+from app.utils.search_text import normalize_search_text, search_words
+
+# Text search configuration used by products.search_vector (must match the migration).
+SEARCH_TS_CONFIG = "simple"
+MAX_SEARCH_TERMS = 8
+
+# Explicit catalog sorts: (column, descending). Each is followed by id in the same direction, matching
+# the in-stock partial indexes of alembic 028 so pages are index range scans. "newest" is id order:
+# ids grow with creation, and created_at is nullable (NULLs would break keyset comparison).
+CatalogSort = Literal["price_asc", "price_desc", "name_asc", "name_desc", "newest"]
+CATALOG_SORTS: dict[str, tuple[ColumnElement, bool]] = {
+    "price_asc": (Product.price, False),
+    "price_desc": (Product.price, True),
+    "name_asc": (Product.name, False),
+    "name_desc": (Product.name, True),
+    "newest": (Product.id, True),
+}
+
+
+def normalize_search_terms(q: str | None, search_terms: list[str] | None = None) -> list[str]:
+    """Return unique non-empty terms (expanded terms if given, else q). Case-insensitive dedup, order kept."""
+    raw = search_terms if search_terms else ([q] if q else [])
+    out: list[str] = []
+    seen: set[str] = set()
+    for t in raw:
+        term = (t or "").strip()
+        if not term or term.lower() in seen:
+            continue
+        seen.add(term.lower())
+        out.append(term)
+    return out[:MAX_SEARCH_TERMS]
+
+
+def article_search_key(terms: list[str]) -> str | None:
+    """article_key to try first when the search is a single part-number-like term (e.g. "RE 504836")."""
+    if len(terms) == 1 and looks_like_article_number(terms[0]):
+        return normalize_article_number(terms[0])
+    return None
+
+
+def _escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _tsquery(term: str) -> ColumnElement:
+    return func.plainto_tsquery(SEARCH_TS_CONFIG, term)
+
+
+def search_condition(terms: list[str]) -> ColumnElement:
+    """OR of per-term matches: full-text hit, substring of name / article_number (trigram-indexed ILIKE),
+    the same article number written with other separators (article_key btree), or every normalized word
+    of the term in name_normalized (other word forms, Kazakh letters, transliteration; trigram-indexed)."""
+    conds = []
+    for t in terms:
+        pattern = f"%{_escape_like(t)}%"
+        conds.append(Product.search_vector.op("@@")(_tsquery(t)))
+        conds.append(Product.name.ilike(pattern, escape="\\"))
+        conds.append(Product.article_number.ilike(pattern, escape="\\"))
+        key = normalize_article_number(t)
+        if key:
+            conds.append(Product.article_key == key)
+        words = search_words(t)
+        if words:
+            conds.append(and_(*(Product.name_normalized.like(f"%{_escape_like(w)}%", escape="\\") for w in words)))
+    return or_(*conds)
+
+
+def search_rank(terms: list[str]) -> ColumnElement:
+    """Relevance score: best of exact article hit, full-text rank and trigram word similarity over all terms."""
+    per_term = [
+        func.greatest(
+            case((Product.article_key == normalize_article_number(t), 2.0), else_=0.0),
+            func.ts_rank(Product.search_vector, _tsquery(t)),
+            func.word_similarity(t, Product.name),
+            func.similarity(Product.article_number, t),
+            func.word_similarity(normalize_search_text(t), Product.name_normalized),
+        )
+        for t in terms
+    ]
+    return per_term[0] if len(per_term) == 1 else func.greatest(*per_term)
+
+
+def apply_product_search(stmt: Select, terms: list[str]) -> tuple[Select, ColumnElement | None]:
+    """Filter stmt by terms; return (stmt, rank expression or None when there is nothing to search)."""
+    if not terms:
+        return stmt, None
+    return stmt.where(search_condition(terms)), search_rank(terms)
+
+
+def catalog_sort_keys(rank: ColumnElement | None = None, sort: str | None = None) -> list[tuple[ColumnElement, bool]]:
+    """Catalog sort key as (expression, descending) pairs.
+
+    Default: relevance (when searching), In_Stock first, name, id. An explicit sort (CATALOG_SORTS)
+    replaces all of that, relevance included. The trailing id makes the order total, so keyset
+    cursors never skip or repeat rows.
+    """
+    if sort is not None:
+        column, descending = CATALOG_SORTS[sort]
+        return [(column, descending)] if column is Product.id else [(column, descending), (Product.id, descending)]
+    keys: list[tuple[ColumnElement, bool]] = [
+        (Product.status == ProductStatus.in_stock, True),
+        (Product.name, False),
+        (Product.id, False),
+    ]
+    if rank is not None:
+        keys.insert(0, (rank, True))
+    return keys
+
+
+def catalog_order_by(rank: ColumnElement | None = None, sort: str | None = None) -> list[ColumnElement]:
+    """ORDER BY clauses for catalog_sort_keys()."""
+    return [expr.desc() if descending else expr for expr, descending in catalog_sort_keys(rank, sort)]
+
+
+def catalog_sort_types(rank: ColumnElement | None = None, sort: str | None = None) -> tuple[type, ...]:
+    """Python types of catalog_sort_values(), for validating decoded cursors."""
+    if sort is not None:
+        return (int,) if CATALOG_SORTS[sort][0] is Product.id else (str, int)
+    types: tuple[type, ...] = (bool, str, int)
+    return (float,) + types if rank is not None else types
+
+
+def catalog_sort_values(product: Product, rank_value: float | None = None, sort: str | None = None) -> list:
+    """Sort-key values of a row, in catalog_sort_keys() order (used to build the next-page cursor).
+
+    Prices are encoded as strings so the cursor keeps their exact decimal value.
+    """
+    if sort is not None:
+        column = CATALOG_SORTS[sort][0]
+        if column is Product.id:
+            return [product.id]
+        value = getattr(product, column.key)
+        return [str(value) if column is Product.price else value, product.id]
+    values = [product.status == ProductStatus.in_stock, product.name, product.id]
+    if rank_value is not None:
+        values.insert(0, float(rank_value))
+    return values
+
+
+def catalog_cursor_values(values: list, sort: str | None = None) -> list:
+    """Decoded cursor values back in column types (price strings to Decimal); ValueError if malformed."""
+    if sort is not None and CATALOG_SORTS[sort][0] is Product.price:
+        try:
+            price = Decimal(values[0])
+        except InvalidOperation as e:
+            raise ValueError("Invalid price in cursor") from e
+        if not price.is_finite():
+            raise ValueError("Invalid price in cursor")
+        return [price, values[1]]
+    return values
@@ -0,0 +1,111 @@
+"""Denormalized review aggregates (product_rating_stats, vendor_rating_stats).
+
+Updated incrementally on review write so catalog pages and vendor rating read plain columns
+instead of aggregating product_reviews. rebuild_rating_stats() recomputes everything
+(scripts/backfill_rating_stats.py) if the tables ever drift.
+"""
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.rating_stats import ProductRatingStats, VendorRatingStats
+
+
+def average_rating(reviews_count: int, rating_sum: int) -> float | None:
+    """Average rounded to 2 decimals; None when there are no reviews."""
+    if not reviews_count:
+        return None
+    return round(rating_sum / reviews_count, 2)
+
+
+async def _upsert_delta(db: AsyncSession, model, key: str, key_value: int, count_delta: int, sum_delta: int) -> None:
+    stmt = insert(model).values({key: key_value, "reviews_count": count_delta, "rating_sum": sum_delta})
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[key],
+        set_={
+            "reviews_count": model.reviews_count + stmt.excluded.reviews_count,
+            "rating_sum": model.rating_sum + stmt.excluded.rating_sum,
+        },
+    )
+    await db.execute(stmt)
+
+
+async def apply_review_delta(
+    db: AsyncSession, product_id: int, vendor_id: int, count_delta: int, sum_delta: int
+) -> None:
+    """Add (count_delta, sum_delta) to the product's and its vendor's aggregates in the current transaction.
+
+    New review: (1, rating); changed rating: (0, new - old).
+    """
+    if not count_delta and not sum_delta:
+        return
+    await _upsert_delta(db, ProductRatingStats, "product_id", product_id, count_delta, sum_delta)
+    await _upsert_delta(db, VendorRatingStats, "vendor_id", vendor_id, count_delta, sum_delta)
+
+
+async def remove_product_from_vendor_stats(db: AsyncSession, product_id: int, vendor_id: int) -> None:
+    """Subtract a product's reviews from its vendor's aggregate (call before deleting the product)."""
+    r = await db.execute(
+        select(ProductRatingStats.reviews_count, ProductRatingStats.rating_sum).where(
+            ProductRatingStats.product_id == product_id
+        )
+    )
+    row = r.first()
+    if row and row.reviews_count:
+        await _upsert_delta(db, VendorRatingStats, "vendor_id", vendor_id, -row.reviews_count, -row.rating_sum)
+
+
+async def get_product_rating(db: AsyncSession, product_id: int) -> tuple[float | None, int]:
+    """Return (average_rating, reviews_count) for product_id."""
+    return (await get_product_ratings(db, [product_id]))[product_id]
+
+
+async def get_product_ratings(db: AsyncSession, product_ids: list[int]) -> dict[int, tuple[float | None, int]]:
+    """Return dict product_id -> (average_rating, reviews_count); (None, 0) for products without reviews."""
+    out: dict[int, tuple[float | None, int]] = {pid: (None, 0) for pid in product_ids}
+    if not product_ids:
+        return out
+    r = await db.execute(
+        select(ProductRatingStats.product_id, ProductRatingStats.reviews_count, ProductRatingStats.rating_sum).where(
+            ProductRatingStats.product_id.in_(product_ids)
+        )
+    )
+    for row in r.all():
+        if row.reviews_count > 0:
+            out[row.product_id] = (average_rating(row.reviews_count, row.rating_sum), row.reviews_count)
+    return out
+
+
+async def get_vendor_rating(db: AsyncSession, vendor_id: int) -> tuple[float | None, int]:
+    """Return (average_rating, reviews_count) over all products of vendor_id."""
+    r = await db.execute(
+        select(VendorRatingStats.reviews_count, VendorRatingStats.rating_sum).where(
+            VendorRatingStats.vendor_id == vendor_id
+        )
+    )
+    row = r.first()
+    if not row or row.reviews_count <= 0:
+        return (None, 0)
+    return (average_rating(row.reviews_count, row.rating_sum), row.reviews_count)
+
+
+async def rebuild_rating_stats(db: AsyncSession) -> tuple[int, int]:
+    """Recompute both aggregate tables from product_reviews. Return (product rows, vendor rows)."""
+    await db.execute(delete(VendorRatingStats))
+    await db.execute(delete(ProductRatingStats))
+    await db.execute(
+        text(
+            "INSERT INTO product_rating_stats (product_id, reviews_count, rating_sum) "
+            "SELECT product_id, count(*), sum(rating) FROM product_reviews GROUP BY product_id"
+        )
+    )
+    await db.execute(
+        text(
+            "INSERT INTO vendor_rating_stats (vendor_id, reviews_count, rating_sum) "
+            "SELECT p.vendor_id, count(*), sum(r.rating) FROM product_reviews r "
+            "JOIN products p ON p.id = r.product_id GROUP BY p.vendor_id"
+        )
+    )
+    products = (await db.execute(select(func.count()).select_from(ProductRatingStats))).scalar() or 0
+    vendors = (await db.execute(select(func.count()).select_from(VendorRatingStats))).scalar() or 0
+    return products, vendors
@@ -1,9 +1,35 @@
+import asyncio
 import json
-from typing import Any
+import logging
+import time
+import uuid
+from typing import Any, Awaitable, Callable, TypeVar
 import redis.asyncio as redis
 from app.config import settings
+from app.services.local_cache import LocalCache, SingleFlight
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
 
 _redis: redis.Redis | None = None
+_redis_bytes: redis.Redis | None = None
+
+# L1: per-process cache in front of Redis (see services.local_cache). Writes and invalidations are
+# broadcast on CACHE_INVALIDATION_CHANNEL so other workers drop their copy.
+local_cache = LocalCache(settings.local_cache_max_entries, settings.local_cache_ttl_seconds, settings.local_cache_max_bytes)
+single_flight = SingleFlight()
+CACHE_INVALIDATION_CHANNEL = "cache:invalidate"
+_WORKER_ID = uuid.uuid4().hex
+_listener_task: asyncio.Task | None = None
+# Called with the evicted keys of every invalidation, local or from another worker (see on_invalidation)
+_invalidation_hooks: list[Callable[[list[str]], None]] = []
+
+# Cross-worker coalescing of cache fills (see coalesce): lock expiry bounds a crashed holder,
+# waiters poll for the holder's result for at most CACHE_LOCK_WAIT seconds.
+CACHE_LOCK_TTL = 10.0
+CACHE_LOCK_WAIT = 5.0
+CACHE_LOCK_POLL_INTERVAL = 0.05
 
 
 async def get_redis() -> redis.Redis:
@@ -13,11 +39,58 @@ async def get_redis() -> redis.Redis:
     return _redis
 
 
-def cache_key_prefix() -> str:
-    return "catalog:"
+async def get_redis_bytes() -> redis.Redis:
+    """Client returning raw bytes, for pre-encoded cache entries (see cache_get_bytes)."""
+    global _redis_bytes
+    if _redis_bytes is None:
+        _redis_bytes = redis.from_url(settings.redis_url, decode_responses=False)
+    return _redis_bytes
+
+
+# Catalog cache namespace: keys are "catalog:g<generation>:...". Invalidation bumps the generation
+# (one INCR) instead of SCAN + DELETE; entries of old generations simply expire by their TTL.
+CATALOG_GENERATION_KEY = "catalog_generation"
+
+
+async def cache_key_prefix() -> str:
+    generation = local_cache.get(CATALOG_GENERATION_KEY)
+    if generation is None:
+        try:
+            r = await get_redis()
+            generation = await r.get(CATALOG_GENERATION_KEY) or "0"
+            local_cache.set(CATALOG_GENERATION_KEY, generation)
+        except Exception:
+            generation = "0"
+    return f"catalog:g{generation}:"
+
+
+DATA_EPOCH_KEY = "data_epoch"
+DATA_EPOCH_L1_TTL = 5.0  # bounds how long a worker keeps using the epoch of flushed Redis data
+
+
+async def data_epoch() -> str | None:
+    """Random token created once (SET NX, no TTL) that changes only when Redis loses its data.
+
+    Counters restart at 0 after a flush; prefixing them with the epoch keeps versions built from
+    them (e.g. HTTP ETags) from ever repeating. None when Redis is unavailable.
+    """
+    epoch = local_cache.get(DATA_EPOCH_KEY)
+    if epoch is None:
+        try:
+            r = await get_redis()
+            await r.set(DATA_EPOCH_KEY, uuid.uuid4().hex, nx=True)
+            epoch = await r.get(DATA_EPOCH_KEY)
+        except Exception as e:
+            logger.warning("Data epoch read failed: %s", e)
+            return None
+        local_cache.set(DATA_EPOCH_KEY, epoch, ttl=DATA_EPOCH_L1_TTL)
+    return epoch
 
 
 async def cache_get(key: str) -> Any | None:
+    cached = local_cache.get(key)
+    if cached is not None:
+        return cached
     try:
         r = await get_redis()
         data = await r.get(key)
@@ -26,9 +99,11 @@ async def cache_get(key: str) -> Any | None:
     if data is None:
         return None
     try:
-        return json.loads(data)
+        value = json.loads(data)
     except json.JSONDecodeError:
-        return data
+        value = data
+    local_cache.set(key, value)
+    return value
 
 
 async def cache_set(key: str, value: Any, ttl: int | None = None) -> None:
@@ -38,10 +113,238 @@ async def cache_set(key: str, value: Any, ttl: int | None = None) -> None:
         if isinstance(value, (dict, list)):
             value = json.dumps(value, default=str)
         await r.set(key, value, ex=ttl)
+        await publish_invalidation(key)
+    except Exception:
+        return
+    try:
+        local_cache.set(key, json.loads(value), ttl=ttl)
+    except (json.JSONDecodeError, TypeError):
+        local_cache.set(key, value, ttl=ttl)
+
+
+async def cache_get_many(keys: list[str]) -> dict[str, Any]:
+    """cache_get for several keys: L1 first, then one MGET for the rest. Missing keys are left out."""
+    found: dict[str, Any] = {}
+    missing: list[str] = []
+    for key in keys:
+        cached = local_cache.get(key)
+        if cached is None:
+            missing.append(key)
+        else:
+            found[key] = cached
+    if not missing:
+        return found
+    try:
+        r = await get_redis()
+        values = await r.mget(missing)
+    except Exception:
+        return found
+    for key, data in zip(missing, values):
+        if data is None:
+            continue
+        try:
+            value = json.loads(data)
+        except json.JSONDecodeError:
+            value = data
+        local_cache.set(key, value)
+        found[key] = value
+    return found
+
+
+async def cache_set_many(items: dict[str, Any], ttl: int | None = None) -> None:
+    """cache_set for several keys in one pipeline and one invalidation message."""
+    if not items:
+        return
+    ttl = ttl or settings.cache_ttl_seconds
+    try:
+        r = await get_redis()
+        async with r.pipeline(transaction=False) as pipe:
+            for key, value in items.items():
+                pipe.set(key, json.dumps(value, default=str), ex=ttl)
+            await pipe.execute()
+        await publish_invalidation(*items)
+    except Exception:
+        return
+    for key, value in items.items():
+        local_cache.set(key, value, ttl=ttl)
+
+
+async def cache_get_bytes(key: str) -> bytes | None:
+    """Raw bytes stored with cache_set_bytes (no decoding; L1-cached like cache_get)."""
+    cached = local_cache.get(key)
+    if isinstance(cached, bytes):
+        return cached
+    try:
+        r = await get_redis_bytes()
+        data = await r.get(key)
+    except Exception:
+        return None
+    if data is not None:
+        local_cache.set(key, data)
+    return data
+
+
+async def cache_set_bytes(key: str, value: bytes, ttl: int | None = None) -> None:
+    try:
+        r = await get_redis_bytes()
+        ttl = ttl or settings.cache_ttl_seconds
+        await r.set(key, value, ex=ttl)
+        await publish_invalidation(key)
+    except Exception:
+        return
+    local_cache.set(key, value, ttl=ttl)
+
+
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+async def acquire_lock(name: str, ttl: float = CACHE_LOCK_TTL) -> str | None:
+    """Try to take a Redis lock (SET NX PX). Return its token, or None if another holder has it.
+
+    If Redis is unavailable the lock counts as acquired, so an outage never blocks requests.
+    """
+    token = uuid.uuid4().hex
+    try:
+        r = await get_redis()
+        if not await r.set(f"lock:{name}", token, nx=True, px=int(ttl * 1000)):
+            return None
+    except Exception as e:
+        logger.warning("Lock %s unavailable, proceeding without it: %s", name, e)
+    return token
+
+
+async def release_lock(name: str, token: str) -> None:
+    """Release a lock taken by acquire_lock() if it is still ours (it may have expired meanwhile)."""
+    try:
+        r = await get_redis()
+        await r.eval(_RELEASE_LOCK_SCRIPT, 1, f"lock:{name}", token)
     except Exception:
         pass
 
 
+async def coalesce(
+    key: str,
+    compute: Callable[[], Awaitable[T]],
+    lookup: Callable[[], Awaitable[T | None]],
+    lock_ttl: float = CACHE_LOCK_TTL,
+    wait_timeout: float = CACHE_LOCK_WAIT,
+) -> T:
+    """Run compute() for key at most once at a time: per process via single_flight, across workers via a Redis lock.
+
+    compute() is expected to store its result where lookup() finds it. A worker that loses the lock
+    polls lookup() until the holder's result appears; after wait_timeout (or if the holder dies and
+    the lock expires) it computes itself.
+    """
+
+    async def run() -> T:
+        token = await acquire_lock(key, lock_ttl)
+        if token is None:
+            deadline = time.monotonic() + wait_timeout
+            while time.monotonic() < deadline:
+                await asyncio.sleep(CACHE_LOCK_POLL_INTERVAL)
+                value = await lookup()
+                if value is not None:
+                    return value
+            token = await acquire_lock(key, lock_ttl)
+        try:
+            value = await lookup()
+            if value is not None:
+                return value
+            return await compute()
+        finally:
+            if token is not None:
+                await release_lock(key, token)
+
+    return await single_flight.run(key, run)
+
+
+def on_invalidation(hook: Callable[[list[str]], None]) -> None:
+    """Register a synchronous callback for invalidated keys, e.g. to keep an in-memory index current.
+
+    It receives the keys of every publish_invalidation() in any worker; ["*"] means anything may
+    have changed (including messages lost while the listener was reconnecting).
+    """
+    if hook not in _invalidation_hooks:
+        _invalidation_hooks.append(hook)
+
+
+def _evict_local(keys: list[str]) -> None:
+    if "*" in keys:
+        local_cache.clear()
+    else:
+        local_cache.delete(*keys)
+    for hook in _invalidation_hooks:
+        try:
+            hook(keys)
+        except Exception as e:
+            logger.warning("Cache invalidation hook failed: %s", e)
+
+
+async def publish_invalidation(*keys: str) -> None:
+    """Evict keys from the L1 cache of this and every other worker ("*" clears everything)."""
+    _evict_local(list(keys))
+    try:
+        r = await get_redis()
+        await r.publish(CACHE_INVALIDATION_CHANNEL, json.dumps({"w": _WORKER_ID, "keys": list(keys)}))
+    except Exception as e:
+        logger.warning("Cache invalidation publish failed: %s", e)
+
+
+async def _listen_for_invalidations() -> None:
+    evicted_since_connect = False  # one "*" per outage, not one per failed retry (hooks may rebuild on it)
+    while True:
+        try:
+            r = await get_redis()
+            pubsub = r.pubsub()
+            await pubsub.subscribe(CACHE_INVALIDATION_CHANNEL)
+            # Messages may have been missed while (re)connecting
+            _evict_local(["*"])
+            evicted_since_connect = False
+            try:
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    try:
+                        payload = json.loads(message["data"])
+                    except (json.JSONDecodeError, TypeError):
+                        continue
+                    if payload.get("w") == _WORKER_ID:
+                        continue
+                    _evict_local(list(payload.get("keys") or []))
+            finally:
+                await pubsub.reset()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("Cache invalidation listener error, reconnecting: %s", e)
+            if not evicted_since_connect:
+                _evict_local(["*"])
+                evicted_since_connect = True
+            await asyncio.sleep(1)
+
+
+def start_cache_invalidation_listener() -> None:
+    global _listener_task
+    if _listener_task is None or _listener_task.done():
+        _listener_task = asyncio.create_task(_listen_for_invalidations())
+
+
+async def stop_cache_invalidation_listener() -> None:
+    global _listener_task
+    if _listener_task is not None:
+        _listener_task.cancel()
+        try:
+            await _listener_task
+        except (asyncio.CancelledError, Exception):
+            pass
+        _listener_task = None
+
+
 async def cache_invalidate_pattern(pattern: str) -> None:
     try:
         r = await get_redis()
@@ -56,4 +359,9 @@ async def cache_invalidate_pattern(pattern: str) -> None:
 
 async def invalidate_product_cache() -> None:
     """Invalidate all catalog/product cache keys. Call after any product or catalog change."""
-    await cache_invalidate_pattern(f"{cache_key_prefix()}*")
+    try:
+        r = await get_redis()
+        await r.incr(CATALOG_GENERATION_KEY)
+    except Exception:
+        pass
+    await publish_invalidation(CATALOG_GENERATION_KEY)
@@ -1,5 +1,9 @@
-"""AI search suggestions: synonyms and related part terms for a query."""
-import hashlib
+"""Search suggestions: synonyms and related part terms for a query.
+
+Served from the offline dictionary (services.search_synonyms); the LLM is only asked about
+queries it does not know, and its answer is added to the dictionary. Every LLM answer, including
+the ones the dictionary rejects and parse failures, is also cached for SUGGEST_CACHE_TTL seconds.
+"""
 import json
 import re
 
@@ -8,9 +12,8 @@ from pydantic import BaseModel
 from app.config import settings
 from app.services.llm_client import get_openai_client
 from app.services.llm_logging import create_completion_logged
-from app.services.redis_client import cache_get, cache_set
-
-SUGGEST_CACHE_TTL = 300
+from app.services.redis_client import cache_get, cache_set, single_flight
+from app.services.search_synonyms import learn_synonyms, lookup_synonyms, normalize_query
 
 SUGGEST_SYSTEM_PROMPT = """You are an expert in agricultural equipment and spare parts terminology. Given a search query (in any language, e.g. "filter", "фильтр", "gasket"), suggest synonyms and related part terms that a buyer might also search for.
 
@@ -20,6 +23,9 @@ Reply with a JSON object only, no markdown: {"suggestions": ["term1", "term2", .
 - expanded_terms: terms to add to an OR search (synonyms + related, 2-6 terms). Include the original query. Use for backend search expansion.
 Keep suggestions and expanded_terms concise; prefer short words or common phrases."""
 
+SUGGEST_CACHE_PREFIX = "suggest:"
+SUGGEST_CACHE_TTL = 300
+
 
 class SearchSuggestOut(BaseModel):
     original_query: str
@@ -33,19 +39,34 @@ async def get_search_suggestions(q: str) -> SearchSuggestOut:
     if not original:
         return SearchSuggestOut(original_query=original, suggestions=[], expanded_terms=[])
 
-    cache_key = f"suggest:{hashlib.sha256(original.encode()).hexdigest()}"
-    cached = await cache_get(cache_key)
-    if isinstance(cached, dict) and "suggestions" in cached and "expanded_terms" in cached:
-        return SearchSuggestOut(
-            original_query=cached.get("original_query", original),
-            suggestions=cached.get("suggestions", [original]),
-            expanded_terms=cached.get("expanded_terms", [original]),
-        )
+    known = await lookup_synonyms(original)
+    if known is not None:
+        suggestions, expanded = known
+        return SearchSuggestOut(original_query=original, suggestions=suggestions, expanded_terms=expanded)
 
     client = get_openai_client()
     if not client:
         return SearchSuggestOut(original_query=original, suggestions=[original], expanded_terms=[original])
 
+    # Concurrent identical unknown queries share one LLM call
+    key = SUGGEST_CACHE_PREFIX + normalize_query(original)
+    return await single_flight.run(key, lambda: _suggest_cached(key, original, client))
+
+
+async def _suggest_cached(key: str, original: str, client) -> SearchSuggestOut:
+    cached = await cache_get(key)
+    if isinstance(cached, dict):
+        return SearchSuggestOut(
+            original_query=original,
+            suggestions=list(cached.get("suggestions") or []),
+            expanded_terms=list(cached.get("expanded_terms") or []),
+        )
+    result = await _suggest_uncached(original, client)
+    await cache_set(key, result.model_dump(), ttl=SUGGEST_CACHE_TTL)
+    return result
+
+
+async def _suggest_uncached(original: str, client) -> SearchSuggestOut:
     try:
         model = getattr(settings, "openai_tool_model", None) or settings.openai_model
         resp = await create_completion_logged(
@@ -87,5 +108,5 @@ async def get_search_suggestions(q: str) -> SearchSuggestOut:
         suggestions=suggestions[:10],
         expanded_terms=expanded[:6],
     )
-    await cache_set(cache_key, result.model_dump(), ttl=SUGGEST_CACHE_TTL)
+    await learn_synonyms(original, result.suggestions, result.expanded_terms)
     return result
@@ -0,0 +1,119 @@
+"""Offline synonym dictionary for search suggestions (see search_suggest).
+
+Queries are answered from, in order: the seed groups in constants.search_synonyms (in memory),
+learned answers (per-process LocalCache, then the Redis hash LEARNED_SYNONYMS_KEY). Only a query
+found in neither goes to the LLM, and its answer is written back with learn_synonyms(), so every
+learned query reaches the LLM at most once across all workers. Only answers that pass worth_learning()
+are stored (the rest are only cached briefly, see search_suggest); the hash is capped at
+LEARNED_MAX_ENTRIES and expires LEARNED_TTL_SECONDS after the last write.
+"""
+import json
+import logging
+import re
+
+from app.constants.search_synonyms import SYNONYM_GROUPS
+from app.services.local_cache import LocalCache
+from app.services.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+LEARNED_SYNONYMS_KEY = "search_synonyms:learned"
+LEARNED_L1_MAX_ENTRIES = 5000
+LEARNED_L1_TTL = 3600.0  # learned entries are never rewritten, so a long TTL is safe
+LEARNED_MAX_ENTRIES = 50_000  # once full, new answers are served but not stored
+LEARNED_TTL_SECONDS = 30 * 24 * 3600
+LEARNED_MAX_QUERY_LENGTH = 64  # longer inputs are one-off phrases, not dictionary terms
+
+MAX_SUGGESTIONS = 10
+MAX_EXPANDED_TERMS = 6
+
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_query(q: str) -> str:
+    """Dictionary key for a query: lowercase, ё -> е, single spaces."""
+    return _SPACES.sub(" ", (q or "").lower().replace("ё", "е")).strip()
+
+
+def build_seed_dictionary(groups: list[tuple[str, ...]]) -> dict[str, tuple[str, ...]]:
+    """Map every normalized term to its group (a term listed in several groups keeps the first)."""
+    seed: dict[str, tuple[str, ...]] = {}
+    for group in groups:
+        for term in group:
+            seed.setdefault(normalize_query(term), group)
+    return seed
+
+
+_seed = build_seed_dictionary(SYNONYM_GROUPS)
+_learned = LocalCache(LEARNED_L1_MAX_ENTRIES, LEARNED_L1_TTL)
+
+
+def _with_original(original: str, terms: list[str], limit: int) -> list[str]:
+    """original followed by terms, without (normalized) duplicates, capped at limit."""
+    seen = {normalize_query(original)}
+    out = [original.strip()]
+    for t in terms:
+        key = normalize_query(t)
+        if key and key not in seen:
+            seen.add(key)
+            out.append(t.strip())
+    return out[:limit]
+
+
+def seed_synonyms(original: str) -> tuple[list[str], list[str]] | None:
+    group = _seed.get(normalize_query(original))
+    if group is None:
+        return None
+    return _with_original(original, list(group), MAX_SUGGESTIONS), _with_original(original, list(group), MAX_EXPANDED_TERMS)
+
+
+async def learned_synonyms(original: str) -> tuple[list[str], list[str]] | None:
+    key = normalize_query(original)
+    entry = _learned.get(key)
+    if entry is None:
+        try:
+            r = await get_redis()
+            raw = await r.hget(LEARNED_SYNONYMS_KEY, key)
+            entry = json.loads(raw) if raw else None
+        except Exception as e:
+            logger.warning("Learned synonyms lookup failed: %s", e)
+            return None
+        if not isinstance(entry, dict):
+            return None
+        _learned.set(key, entry)
+    return (
+        _with_original(original, list(entry.get("suggestions") or []), MAX_SUGGESTIONS),
+        _with_original(original, list(entry.get("expanded_terms") or []), MAX_EXPANDED_TERMS),
+    )
+
+
+async def lookup_synonyms(original: str) -> tuple[list[str], list[str]] | None:
+    """(suggestions, expanded_terms) from the seed or learned dictionary; None for unknown queries."""
+    return seed_synonyms(original) or await learned_synonyms(original)
+
+
+def worth_learning(original: str, suggestions: list[str], expanded_terms: list[str]) -> bool:
+    """True if the query is dictionary-sized and the answer adds at least one term besides the query."""
+    key = normalize_query(original)
+    if not 2 <= len(key) <= LEARNED_MAX_QUERY_LENGTH:
+        return False
+    return any(normalize_query(t) not in ("", key) for t in [*suggestions, *expanded_terms])
+
+
+async def learn_synonyms(original: str, suggestions: list[str], expanded_terms: list[str]) -> None:
+    """Store an LLM answer so later lookups of the same query are served locally."""
+    if not worth_learning(original, suggestions, expanded_terms):
+        return
+    key = normalize_query(original)
+    entry = {"suggestions": suggestions, "expanded_terms": expanded_terms}
+    _learned.set(key, entry)
+    try:
+        r = await get_redis()
+        if await r.hlen(LEARNED_SYNONYMS_KEY) >= LEARNED_MAX_ENTRIES:
+            return
+        async with r.pipeline(transaction=False) as pipe:
+            pipe.hset(LEARNED_SYNONYMS_KEY, key, json.dumps(entry, ensure_ascii=False))
+            pipe.expire(LEARNED_SYNONYMS_KEY, LEARNED_TTL_SECONDS)
+            await pipe.execute()
+    except Exception as e:
+        logger.warning("Learned synonyms write failed: %s", e)
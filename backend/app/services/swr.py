@@ -0,0 +1,72 @@
+"""Stale-while-revalidate for cached endpoint payloads (catalog pages, admin dashboard).
+
+A cached payload is wrapped as {"fresh_until": <unix time>, "v": payload} and stored for
+soft_ttl + SWR_STALE_TTL seconds. Until fresh_until it is served as is; after that it is still
+served immediately while one background task per key recomputes it, so requests never wait on
+a recompute. Endpoints also fall back to a stale payload when the database errors.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import background_session
+
+logger = logging.getLogger(__name__)
+
+SWR_STALE_TTL = 3600  # how long past its soft expiry a payload may still be served
+
+# Errors meaning "the database is unavailable or failing", for which a stale payload is an acceptable answer
+DB_UNAVAILABLE_ERRORS = (SQLAlchemyError, OSError, asyncio.TimeoutError)
+
+_refreshing: dict[str, asyncio.Task] = {}
+
+
+def swr_fresh_until(soft_ttl: float) -> float:
+    return time.time() + soft_ttl
+
+
+def swr_is_fresh(meta: dict) -> bool:
+    """Whether an envelope (or a header carrying "fresh_until") is still within its soft TTL."""
+    return time.time() < float(meta.get("fresh_until") or 0)
+
+
+def swr_envelope(value: Any, soft_ttl: float) -> dict:
+    return {"fresh_until": swr_fresh_until(soft_ttl), "v": value}
+
+
+def swr_hard_ttl(soft_ttl: int) -> int:
+    """Storage TTL for an envelope with the given soft TTL."""
+    return soft_ttl + SWR_STALE_TTL
+
+
+def swr_unwrap(entry: Any) -> tuple[Any | None, bool]:
+    """Return (payload, is_fresh); (None, False) if entry is not an envelope."""
+    if not isinstance(entry, dict) or "v" not in entry or "fresh_until" not in entry:
+        return None, False
+    return entry["v"], swr_is_fresh(entry)
+
+
+def swr_refresh_in_background(
+    key: str, refresh: Callable[[AsyncSession], Awaitable[Any]], user_id: int | None = None
+) -> None:
+    """Run refresh(session) in a background task with its own DB session, at most one per key per process.
+
+    The session uses the RLS context of user_id (the requester), or the anonymous default when None.
+    """
+    if key in _refreshing:
+        return
+
+    async def run() -> None:
+        try:
+            async with background_session(user_id) as session:
+                await refresh(session)
+        except Exception as e:
+            logger.warning("Background refresh of %s failed, keeping stale entry: %s", key, e)
+        finally:
+            _refreshing.pop(key, None)
+
+    _refreshing[key] = asyncio.create_task(run())
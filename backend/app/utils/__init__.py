@@ -1,4 +1,5 @@
 # Utils package
+import re
 from uuid import uuid4
 
 from app.utils.sanitize import sanitize_text, sanitize_text_required
@@ -8,4 +9,33 @@ def generate_article_number() -> str:
     """Generate a unique-looking article number (e.g. ART-A1B2C3D4E5)."""
     return f"ART-{uuid4().hex[:10].upper()}"
 
-__all__ = ["generate_article_number", "sanitize_text", "sanitize_text_required"]
+
+_ARTICLE_SEPARATORS = re.compile(r"[\W_]+")
+# OEM part numbers: letter/digit groups joined by at most single separators ("RE 504836", "AF-CAB-001", "re504836")
+_ARTICLE_LIKE = re.compile(r"^[^\W_]+(?:[\s\-./][^\W_]+){0,4}$")
+
+
+def normalize_article_number(value: str | None) -> str:
+    """Article lookup key: uppercase with separators stripped ("re-504 836" -> "RE504836")."""
+    return _ARTICLE_SEPARATORS.sub("", value or "").upper()
+
+
+def looks_like_article_number(query: str | None) -> bool:
+    """True when a search query is probably a part number rather than words: code-like groups, a third digits."""
+    q = (query or "").strip()
+    if not _ARTICLE_LIKE.match(q):
+        return False
+    if any(g.isalpha() and len(g) > 3 for g in _ARTICLE_SEPARATORS.split(q)):
+        return False  # contains a word ("Масло 15W-40")
+    key = normalize_article_number(q)
+    digits = sum(c.isdigit() for c in key)
+    return 4 <= len(key) <= 64 and digits >= 2 and digits * 3 >= len(key)
+
+
+__all__ = [
+    "generate_article_number",
+    "looks_like_article_number",
+    "normalize_article_number",
+    "sanitize_text",
+    "sanitize_text_required",
+]
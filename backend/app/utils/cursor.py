@@ -0,0 +1,68 @@
+"""Opaque keyset-pagination cursors.
+
+A cursor is the URL-safe base64 of a compact JSON list holding the sort-key values of the
+last row on the previous page. keyset_after() turns it back into a WHERE clause so the next
+page is an index range scan instead of OFFSET (which reads and discards every skipped row).
+"""
+
+import base64
+import json
+from typing import Any
+
+from sqlalchemy import and_, literal, or_, tuple_
+from sqlalchemy.sql.elements import ColumnElement
+
+MAX_CURSOR_LENGTH = 1024
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a cursor token cannot be decoded or does not match the current sort."""
+
+
+def encode_cursor(values: list[Any]) -> str:
+    """Encode sort-key values (JSON-serializable scalars) into an opaque token."""
+    raw = json.dumps(values, separators=(",", ":"), ensure_ascii=False).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str, types: tuple[type, ...] | None = None) -> list[Any]:
+    """Decode a token produced by encode_cursor(); when types is given, check length and per-position types.
+
+    Raise InvalidCursorError on any mismatch (e.g. a cursor issued for a different sort).
+    """
+    if not token or len(token) > MAX_CURSOR_LENGTH:
+        raise InvalidCursorError("Invalid cursor")
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError("Invalid cursor") from e
+    if not isinstance(values, list):
+        raise InvalidCursorError("Invalid cursor")
+    if types is not None:
+        if len(values) != len(types) or not all(isinstance(v, t) for v, t in zip(values, types)):
+            raise InvalidCursorError("Invalid cursor")
+    return values
+
+
+def keyset_after(keys: list[tuple[ColumnElement, bool]], values: list[Any]) -> ColumnElement:
+    """Return a condition selecting rows strictly after `values` in the ordering described by keys.
+
+    keys is a list of (expression, descending) pairs matching the ORDER BY. When all keys share one
+    direction this is a row-value comparison, (k1, k2) > (v1, v2), which Postgres uses as an index
+    range condition on a matching (k1, k2) index. Mixed directions are expanded to
+    (k1 > v1) OR (k1 = v1 AND k2 > v2) OR ...
+    """
+    bound = [literal(v) for v in values]
+    if len({descending for _, descending in keys}) == 1:
+        descending = keys[0][1]
+        if len(keys) == 1:
+            return keys[0][0] < bound[0] if descending else keys[0][0] > bound[0]
+        lhs, rhs = tuple_(*(expr for expr, _ in keys)), tuple_(*bound)
+        return lhs < rhs if descending else lhs > rhs
+    clauses = []
+    for i, (expr, descending) in enumerate(keys):
+        prefix = [k == v for (k, _), v in zip(keys[:i], bound[:i])]
+        step = expr < bound[i] if descending else expr > bound[i]
+        clauses.append(and_(*prefix, step))
+    return or_(*clauses)
@@ -0,0 +1,70 @@
+"""HTTP caching helpers: strong ETags for pre-encoded JSON bodies and conditional (304) responses.
+
+Endpoints whose payload is determined by a cheap version (a Redis counter, an in-memory index)
+use the conditional_get() dependency: it answers a matching If-None-Match with 304 before the
+route runs, so revalidation costs neither database work nor body transfer.
+"""
+import hashlib
+from typing import Any, Callable
+
+from fastapi import Depends, HTTPException, Request, Response
+
+
+def body_etag(body: bytes) -> str:
+    """Strong ETag for a response body."""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match covers etag (weak comparison, as for GET)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    tag = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == tag for candidate in header.split(","))
+
+
+def version_etag(request: Request, version: str) -> str:
+    """Strong ETag for a response fully determined by version, path and query string."""
+    key = f"{version}|{request.url.path}?{request.url.query}".encode()
+    return '"' + hashlib.blake2b(key, digest_size=16).hexdigest() + '"'
+
+
+def json_bytes_response(
+    request: Request, body: bytes, etag: str | None = None, headers: dict[str, str] | None = None
+) -> Response:
+    """Return already-encoded JSON as is, with an ETag; 304 without body when the client has it."""
+    etag = etag or body_etag(body)
+    headers = {**(headers or {}), "ETag": etag}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+async def _no_version() -> None:
+    return None
+
+
+def conditional_get(cache_control: str, version: Callable[..., Any] | None = None) -> Callable[..., Any]:
+    """Dependency for cacheable GET endpoints: sets Cache-Control and, given a version dependency, an ETag.
+
+    version is itself a dependency (it may take db etc.) returning a string that changes whenever
+    the response would, or None when unknown (then no ETag is sent). A request whose If-None-Match
+    matches gets 304 without running the route. The dependency returns the headers, for routes that
+    build their Response themselves (headers set on the injected response are not applied to those).
+    """
+
+    async def dependency(
+        request: Request, response: Response, current: str | None = Depends(version or _no_version)
+    ) -> dict[str, str]:
+        headers = {"Cache-Control": cache_control}
+        if current is not None:
+            headers["ETag"] = version_etag(request, current)
+            if etag_matches(request, headers["ETag"]):
+                raise HTTPException(304, headers=headers)
+        response.headers.update(headers)
+        return headers
+
+    return dependency
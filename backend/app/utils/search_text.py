@@ -0,0 +1,57 @@
+"""Search text normalization shared by the index (products.name_normalized) and queries.
+
+normalize_search_text() lowercases and folds ё -> е and Kazakh letters to their Russian counterparts,
+transliterates Cyrillic to Latin, then strips common Russian (and English plural) endings. So
+"Масляные фильтры", "масляный фильтр" and "maslyanyy filtry" all reduce to "maslyan filtr", without
+an LLM round-trip.
+"""
+import re
+
+_WORD = re.compile(r"[^\W_]+")
+
+_KAZAKH_FOLD = str.maketrans({"ә": "а", "ғ": "г", "қ": "к", "ң": "н", "ө": "о", "ұ": "у", "ү": "у", "һ": "х", "і": "и", "ё": "е"})
+
+_CYRILLIC_TO_LATIN = str.maketrans({
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ж": "zh", "з": "z", "и": "i", "й": "i",
+    "к": "k", "л": "l", "м": "m", "н": "n", "о": "o", "п": "p", "р": "r", "с": "s", "т": "t", "у": "u",
+    "ф": "f", "х": "h", "ц": "c", "ч": "ch", "ш": "sh", "щ": "sch", "ъ": "", "ы": "y", "ь": "", "э": "e",
+    "ю": "yu", "я": "ya",
+})
+
+# Latin spellings that the transliteration above writes differently ("kh" for х, "ts" for ц, ...)
+_LATIN_VARIANTS = (("shch", "sch"), ("kh", "h"), ("ts", "c"), ("iy", "i"), ("yy", "i"), ("yi", "i"), ("ja", "ya"), ("ju", "yu"), ("w", "v"), ("x", "ks"))
+
+# Russian (and English plural) endings as spelled after transliteration, longest first. Stemming runs on
+# the Latin form so Cyrillic and transliterated queries lose the same endings.
+_ENDINGS = (
+    "yami", "yaya",
+    "ami", "ogo", "ego", "omu", "emu", "ymi", "imi", "iei", "aya", "yah", "yam",
+    "oe", "ee", "ye", "ie", "ii", "oi", "om", "em", "ah", "ov", "ev", "ei", "am", "ya", "yu",
+    "y", "i", "a", "o", "e", "u", "s",
+)
+MIN_STEM = 4
+
+
+def _to_latin(word: str) -> str:
+    word = word.translate(_CYRILLIC_TO_LATIN)
+    for src, dst in _LATIN_VARIANTS:
+        word = word.replace(src, dst)
+    return word
+
+
+def _stem(word: str) -> str:
+    if not word.isalpha():
+        return word  # part codes, sizes ("re504836", "15v")
+    for ending in _ENDINGS:
+        if word.endswith(ending) and len(word) - len(ending) >= MIN_STEM:
+            return word[: -len(ending)]
+    return word
+
+
+def search_words(text: str | None) -> list[str]:
+    """Normalized words of text: folded, transliterated and stemmed (see module docstring)."""
+    return [_stem(_to_latin(w)) for w in _WORD.findall((text or "").lower().translate(_KAZAKH_FOLD))]
+
+
+def normalize_search_text(text: str | None) -> str:
+    return " ".join(search_words(text))
@@ -0,0 +1,20 @@
+"""Recompute product_rating_stats / vendor_rating_stats from product_reviews. Safe to re-run."""
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.database import async_session_maker
+from app.services.rating_stats import rebuild_rating_stats
+
+
+async def backfill() -> None:
+    async with async_session_maker() as db:
+        products, vendors = await rebuild_rating_stats(db)
+        await db.commit()
+    print(f"Rating stats rebuilt: {products} products, {vendors} vendors.")
+
+
+if __name__ == "__main__":
+    asyncio.run(backfill())
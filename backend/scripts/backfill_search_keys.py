@@ -0,0 +1,44 @@
+"""Recompute products.article_key and products.name_normalized (run after changing app.utils.search_text). Safe to re-run."""
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import select, update
+
+from app.database import async_session_maker
+from app.models.product import Product
+from app.utils import normalize_article_number
+from app.utils.search_text import normalize_search_text
+
+BATCH = 1000
+
+
+async def backfill() -> None:
+    changed = 0
+    last_id = 0
+    async with async_session_maker() as db:
+        while True:
+            rows = (
+                await db.execute(
+                    select(Product.id, Product.name, Product.article_number, Product.article_key, Product.name_normalized)
+                    .where(Product.id > last_id)
+                    .order_by(Product.id)
+                    .limit(BATCH)
+                )
+            ).all()
+            if not rows:
+                break
+            for pid, name, article_number, article_key, name_normalized in rows:
+                key, normalized = normalize_article_number(article_number), normalize_search_text(name)
+                if (key, normalized) != (article_key, name_normalized):
+                    await db.execute(update(Product).where(Product.id == pid).values(article_key=key, name_normalized=normalized))
+                    changed += 1
+            last_id = rows[-1][0]
+            await db.commit()
+    print(f"Search keys updated for {changed} products.")
+
+
+if __name__ == "__main__":
+    asyncio.run(backfill())
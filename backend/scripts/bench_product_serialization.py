@@ -0,0 +1,75 @@
+"""Compare catalog page serialization: pydantic ProductListOut vs the product_out_json fast path.
+
+Usage: python scripts/bench_product_serialization.py [items_per_page] [rounds]
+"""
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import orjson
+
+from app.models.product import Product, ProductStatus
+from app.schemas.product import ProductListOut, ProductOut, product_list_json, product_out_json
+
+
+def make_products(n: int) -> list[Product]:
+    return [
+        Product(
+            id=i,
+            vendor_id=i % 17 + 1,
+            category_id=i % 40 + 1,
+            name=f"Фильтр масляный {i}",
+            article_number=f"AB-{i:06d}",
+            price=Decimal(f"{1000 + i}.50"),
+            stock_quantity=i % 9,
+            description="Оригинальная запчасть для сельхозтехники. " * 3,
+            characteristics={"Вес": f"{i % 5} кг", "Производитель": "John Deere"},
+            composition=None,
+            images=[f"/uploads/{i}_1.jpg", f"/uploads/{i}_2.jpg"],
+            status=ProductStatus.in_stock,
+        )
+        for i in range(1, n + 1)
+    ]
+
+
+def pydantic_page(products: list[Product]) -> bytes:
+    # Previous path: validate, dump, re-validate each item, then validate and dump the page
+    items = []
+    for p in products:
+        data = ProductOut.model_validate(p).model_dump()
+        data.update(category_slug="filters", average_rating=4.5, reviews_count=3)
+        items.append(ProductOut(**data))
+    out = ProductListOut(items=items, total=len(products), next_cursor="abc")
+    return orjson.dumps(out.model_dump(mode="json"))
+
+
+def fast_page(products: list[Product]) -> bytes:
+    items = [product_out_json(p, "filters", 4.5, 3) for p in products]
+    return orjson.dumps(product_list_json(items, total=len(products), next_cursor="abc"))
+
+
+def bench(fn, products: list[Product], rounds: int) -> float:
+    fn(products)  # warm up
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn(products)
+    return (time.perf_counter() - start) / rounds * 1000
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    products = make_products(n)
+    assert pydantic_page(products) == fast_page(products), "fast path output differs from ProductListOut"
+    slow = bench(pydantic_page, products, rounds)
+    fast = bench(fast_page, products, rounds)
+    print(f"{n} items/page, {rounds} rounds")
+    print(f"  pydantic:  {slow:.2f} ms/page")
+    print(f"  fast path: {fast:.2f} ms/page ({slow / fast:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,7 +13,7 @@ import jwt
 
 from app.config import settings
 from app.main import app
-from app.database import get_db, async_session_maker
+from app.database import engine, get_db, async_session_maker
 from app.models.user import UserRole
 
 
@@ -48,12 +48,15 @@ async def client():
 async def db_session():
     """Session that rolls back after test; use for integration tests so no data persists.
     Requires PostgreSQL and Redis (e.g. docker compose -f docker/docker-compose.yml up -d).
+    Routes that commit (before invalidating caches) only release a savepoint of the outer transaction.
     """
-    async with async_session_maker() as session:
-        try:
-            yield session
-        finally:
-            await session.rollback()
+    async with engine.connect() as conn:
+        outer = await conn.begin()
+        async with async_session_maker(bind=conn, join_transaction_mode="create_savepoint") as session:
+            try:
+                yield session
+            finally:
+                await outer.rollback()
 
 
 @pytest.fixture
@@ -0,0 +1,119 @@
+"""Autocomplete prefix index: matching, ranking and incremental updates."""
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+from app.services import autocomplete as ac
+from app.services.autocomplete import KIND_CATEGORY, KIND_MACHINE, KIND_PRODUCT, PrefixIndex, _put_machine, _put_product
+
+
+def _index() -> PrefixIndex:
+    index = PrefixIndex()
+    index.put(KIND_CATEGORY, 1, "Фильтры")
+    _put_machine(index, 1, "John Deere", "8R 410")
+    _put_product(index, 10, "Фильтр масляный", "AB-1234")
+    _put_product(index, 11, "Масляный фильтр двигателя", "RE-509672")
+    _put_product(index, 12, "Ремень приводной", "XY 77")
+    return index
+
+
+def _hits(index: PrefixIndex, q: str) -> list[tuple[str, int]]:
+    return [(i.kind, i.id) for i in index.search(q)]
+
+
+@pytest.mark.unit
+def test_prefix_matches_any_word_and_ranks_phrase_prefix_first():
+    index = _index()
+    assert _hits(index, "фил") == [(KIND_CATEGORY, 1), (KIND_PRODUCT, 10), (KIND_PRODUCT, 11)]
+    assert _hits(index, "масл") == [(KIND_PRODUCT, 11), (KIND_PRODUCT, 10)]
+    assert _hits(index, "масляный фил") == [(KIND_PRODUCT, 11), (KIND_PRODUCT, 10)]
+    assert _hits(index, "Ёж") == []
+
+
+@pytest.mark.unit
+def test_article_numbers_match_with_or_without_separators():
+    index = _index()
+    assert _hits(index, "ab12") == [(KIND_PRODUCT, 10)]
+    assert _hits(index, "AB-12") == [(KIND_PRODUCT, 10)]
+    assert _hits(index, "re 5096") == [(KIND_PRODUCT, 11)]
+    assert _hits(index, "deere 8r") == [(KIND_MACHINE, 1)]
+
+
+@pytest.mark.unit
+def test_put_replaces_and_remove_drops_words():
+    index = _index()
+    _put_product(index, 12, "Ремень вентилятора", "XY 77")
+    assert _hits(index, "привод") == []
+    assert _hits(index, "вентил") == [(KIND_PRODUCT, 12)]
+    index.remove(KIND_PRODUCT, 12)
+    assert _hits(index, "рем") == []
+    assert "ремень" not in index._vocab
+    assert len(index) == 4
+
+
+@pytest.mark.unit
+def test_invalidation_marks_products_dirty_or_requests_rebuild(monkeypatch):
+    monkeypatch.setattr(ac, "_dirty_products", set())
+    monkeypatch.setattr(ac, "_rebuild_requested", False)
+    ac._on_invalidation(["cachetag:product:42", "cachetag:vendor:3", "catalog:g1:q=x"])
+    assert ac._dirty_products == {42}
+    assert ac._rebuild_requested is False
+    ac._on_invalidation(["catalog_generation"])
+    assert ac._rebuild_requested is True
+
+
+@pytest.mark.unit
+def test_fuzzy_search_tolerates_typos_and_prefers_items_matching_every_word():
+    index = _index()
+    hits = [item.id for item, _ in index.fuzzy_search("фильр масляный", limit=5)]
+    assert hits[:2] == [10, 11]
+    assert [item.id for item, _ in index.fuzzy_search("ремнь")] == [12]
+    assert index.fuzzy_search("абвгд") == []
+
+
+@pytest.mark.unit
+def test_fuzzy_search_only_returns_requested_kind_and_follows_updates():
+    index = _index()
+    assert all(item.kind == KIND_PRODUCT for item, _ in index.fuzzy_search("фильтры"))
+    _put_product(index, 13, "Подшипник ступицы", "ZZ-1")
+    assert [item.id for item, _ in index.fuzzy_search("подшибник")] == [13]
+    index.remove(KIND_PRODUCT, 13)
+    assert index.fuzzy_search("подшибник") == []
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_boot_builds_index_once_after_listener_connects(monkeypatch):
+    builds = []
+
+    @asynccontextmanager
+    async def fake_session(user_id=None):
+        yield None
+
+    async def fake_build(session):
+        builds.append(session)
+        return _index()
+
+    monkeypatch.setattr(ac, "background_session", fake_session)
+    monkeypatch.setattr(ac, "build_autocomplete_index", fake_build)
+    monkeypatch.setattr(ac, "_index", None)
+    monkeypatch.setattr(ac, "_rebuild_requested", False)
+    monkeypatch.setattr(ac, "_rebuild_requested_at", 0.0)
+    monkeypatch.setattr(ac, "_built_at", 0.0)
+    monkeypatch.setattr(ac, "_wakeup", asyncio.Event())
+    task = asyncio.create_task(ac._maintain_index())
+    try:
+        ac._on_invalidation(["*"])  # the listener has subscribed
+        await ac.get_autocomplete_index()  # a request races the background pass and builds first
+        for _ in range(5):
+            await asyncio.sleep(0)
+        assert len(builds) == 1  # the background pass sees a build newer than the "*" and skips it
+        ac._on_invalidation(["*"])  # a later reconnect still rebuilds
+        for _ in range(5):
+            await asyncio.sleep(0)
+        assert len(builds) == 2
+    finally:
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
@@ -0,0 +1,61 @@
+"""Cache tags: which product changes count as listing membership changes, and listing tags per filter set."""
+import pytest
+from fastapi import HTTPException
+
+from app.models.product import Product, ProductStatus
+from app.routers.products import _listing_tags, _parse_id_list
+from app.services import cache_tags
+from app.services.cache_tags import ALL_TAG, PRICE_TAG, listing_state
+
+
+def _product(**kw):
+    data = dict(id=1, vendor_id=7, category_id=3, name="Фильтр", article_number="RE1", stock_quantity=5, status=ProductStatus.in_stock)
+    data.update(kw)
+    return Product(**data)
+
+
+@pytest.mark.unit
+def test_listing_state_ignores_price_and_quantity_within_stock():
+    base = listing_state(_product())
+    assert listing_state(_product(price=999, description="x", stock_quantity=1)) == base
+    assert listing_state(_product(stock_quantity=0)) != base
+    assert listing_state(_product(status=ProductStatus.on_order)) != base
+    assert listing_state(_product(category_id=4)) != base
+
+
+@pytest.mark.unit
+def test_listing_tags():
+    assert _listing_tags(None, [], None) == [ALL_TAG]
+    assert sorted(_listing_tags(3, [7, 8], 2)) == ["category:3", "machine:2", "vendor:7", "vendor:8"]
+    assert _listing_tags(None, [], None, by_price=True) == [ALL_TAG, PRICE_TAG]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_cache_get_tagged_many_drops_stale_entries(monkeypatch):
+    async def fake_get_many(keys):
+        return {
+            "a": {"tags": {"product:1": 1}, "v": "A"},
+            "b": {"tags": {"product:2": 1}, "v": "B"},
+            "c": "not a tagged entry",
+        }
+
+    async def fake_versions(tags):
+        return {"product:1": 1, "product:2": 2}
+
+    monkeypatch.setattr(cache_tags, "cache_get_many", fake_get_many)
+    monkeypatch.setattr(cache_tags, "tag_versions", fake_versions)
+    assert await cache_tags.cache_get_tagged_many(["a", "b", "c", "d"]) == {"a": "A"}
+
+
+@pytest.mark.unit
+def test_parse_id_list():
+    assert _parse_id_list(" 3,1,,3 ", 10) == [3, 1]
+    with pytest.raises(HTTPException):
+        _parse_id_list("1,-2", 10)
+    with pytest.raises(HTTPException):
+        _parse_id_list("1,2,3", 2)
+    for bad in ("²", "١", "+1", str(2**31), "9" * 5000):
+        with pytest.raises(HTTPException):
+            _parse_id_list(bad, 10)
+    assert _parse_id_list(str(2**31 - 1), 10) == [2**31 - 1]
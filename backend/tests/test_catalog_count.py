@@ -0,0 +1,85 @@
+"""Catalog count strategy: exact below the limit, planner estimate above it."""
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.models.product import Product
+from app.services import catalog_count
+
+
+class _Result:
+    def __init__(self, value):
+        self._value = value
+
+    def scalar(self):
+        return self._value
+
+
+class _Savepoint:
+    def __init__(self, session):
+        self.session = session
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.session.aborted = False  # ROLLBACK TO SAVEPOINT
+        return False
+
+
+class FakeSession:
+    """Returns queued scalar results in order and records executed statements.
+
+    A queued exception is raised and, like Postgres, aborts the transaction until a savepoint rolls back.
+    """
+
+    def __init__(self, *values):
+        self._values = list(values)
+        self.statements = []
+        self.aborted = False
+
+    def begin_nested(self):
+        return _Savepoint(self)
+
+    async def execute(self, stmt):
+        if self.aborted:
+            raise RuntimeError("current transaction is aborted")
+        self.statements.append(stmt)
+        value = self._values.pop(0)
+        if isinstance(value, Exception):
+            self.aborted = True
+            raise value
+        return _Result(value)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_count_rows_exact_below_limit():
+    db = FakeSession(42)
+    assert await catalog_count.count_rows(db, select(Product.id), exact_limit=100) == (42, False)
+    assert len(db.statements) == 1
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_count_rows_uses_planner_estimate_above_limit():
+    db = FakeSession(101, [{"Plan": {"Plan Rows": 250000}}])
+    assert await catalog_count.count_rows(db, select(Product.id), exact_limit=100) == (250000, True)
+    sql = str(db.statements[1].compile(dialect=postgresql.dialect()))
+    assert sql.startswith("EXPLAIN (FORMAT JSON) SELECT")
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_count_rows_falls_back_to_exact_count_when_estimate_fails():
+    db = FakeSession(101, "not a plan", 5000)
+    assert await catalog_count.count_rows(db, select(Product.id), exact_limit=100) == (5000, False)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_count_rows_failed_explain_does_not_abort_exact_count():
+    db = FakeSession(101, RuntimeError("canceling statement due to statement timeout"), 5000)
+    assert await catalog_count.count_rows(db, select(Product.id), exact_limit=100) == (5000, False)
+    assert len(db.statements) == 3
@@ -0,0 +1,30 @@
+"""Catalog facets: one GROUPING SETS query and category roll-up through the category index."""
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.models.product import Product
+from app.services.catalog_facets import facets_query, roll_up_categories
+from app.services.category_index import CategoryNode, build_category_index
+
+
+@pytest.mark.unit
+def test_facets_query_uses_grouping_sets():
+    sql = str(facets_query(select(Product).where(Product.vendor_id == 1)).compile(dialect=postgresql.dialect()))
+    assert "GROUPING SETS" in sql
+    assert "grouping(" in sql
+    assert sql.count("FROM products") == 1
+
+
+@pytest.mark.unit
+def test_roll_up_categories_counts_subcategories_in_parents():
+    index = build_category_index(
+        [
+            CategoryNode(1, None, "Запчасти", "parts"),
+            CategoryNode(2, 1, "Фильтры", "filters"),
+            CategoryNode(3, 2, "Масляные", "oil-filters"),
+            CategoryNode(4, None, "Шины", "tires"),
+        ],
+        version="1",
+    )
+    assert roll_up_categories({3: 2, 2: 1, 4: 5}, index) == {3: 2, 2: 3, 1: 3, 4: 5}
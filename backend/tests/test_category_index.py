@@ -0,0 +1,42 @@
+"""In-process category index: descendants, ancestors, slug lookup and prebuilt tree."""
+import pytest
+
+from app.services.category_index import CategoryNode, build_category_index
+
+
+def _index():
+    return build_category_index(
+        [
+            CategoryNode(3, 1, "Фильтры", "filters"),
+            CategoryNode(1, None, "Запчасти", "parts"),
+            CategoryNode(4, 3, "Масляные", "filters-oil"),
+            CategoryNode(2, None, "Удобрения", "fertilizers"),
+            CategoryNode(5, 99, "Сирота", "orphan"),
+        ]
+    )
+
+
+@pytest.mark.unit
+def test_descendants_and_ancestors():
+    index = _index()
+    assert index.descendant_ids(1) == {1, 3, 4}
+    assert index.descendant_ids(4) == {4}
+    assert index.descendant_ids(404) == {404}
+    assert index.ancestor_ids(4) == (1, 3)
+    assert index.id_by_slug["filters-oil"] == 4
+    assert index.slug_of(3) == "filters"
+    assert index.slug_of(None) is None
+
+
+@pytest.mark.unit
+def test_tree_and_walk_are_slug_ordered():
+    index = _index()
+    assert [n["slug"] for n in index.tree] == ["fertilizers", "orphan", "parts"]
+    parts = index.tree[2]
+    assert parts["children"][0]["children"][0]["id"] == 4
+    assert [(n.slug, d) for n, d in index.walk(max_depth=2)] == [
+        ("fertilizers", 0),
+        ("orphan", 0),
+        ("parts", 0),
+        ("filters", 1),
+    ]
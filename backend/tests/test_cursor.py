@@ -0,0 +1,61 @@
+"""Keyset cursors: round trip, tamper rejection and WHERE clause shape."""
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.models.product import Product
+from app.services.product_search import catalog_sort_keys
+from app.utils.cursor import InvalidCursorError, decode_cursor, encode_cursor, keyset_after
+
+
+@pytest.mark.unit
+def test_cursor_round_trip():
+    values = [0.42, True, "Фильтр масляный", 17]
+    token = encode_cursor(values)
+    assert "=" not in token
+    assert decode_cursor(token, types=(float, bool, str, int)) == values
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("token", ["", "not-base64!!", encode_cursor({"a": 1}), "x" * 2000])
+def test_decode_cursor_rejects_garbage(token):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(token)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("values", [[True, "a", 1], [0.5, True, 7, 1]])
+def test_decode_cursor_rejects_cursor_from_other_sort(values):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(encode_cursor(values), types=(float, bool, str, int))
+
+
+@pytest.mark.unit
+def test_keyset_after_expands_mixed_directions():
+    cond = keyset_after(catalog_sort_keys(), [True, "Ремень", 5])
+    sql = str(select(Product.id).where(cond).compile(dialect=postgresql.dialect()))
+    # status DESC -> "<", name/id ASC -> ">"
+    assert sql.count(" OR ") == 2
+    assert "products.name >" in sql
+    assert "products.id >" in sql
+    assert ") < " in sql
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "sort, values, expected",
+    [
+        ("price_asc", [Decimal("12.10"), 5], "(products.price, products.id) > ("),
+        ("price_desc", [Decimal("12.10"), 5], "(products.price, products.id) < ("),
+        ("name_asc", ["Ремень", 5], "(products.name, products.id) > ("),
+        ("name_desc", ["Ремень", 5], "(products.name, products.id) < ("),
+        ("newest", [5], "products.id < "),
+    ],
+)
+def test_keyset_after_uses_row_comparison_for_single_direction_sorts(sort, values, expected):
+    cond = keyset_after(catalog_sort_keys(sort=sort), values)
+    sql = str(select(Product.id).where(cond).compile(dialect=postgresql.dialect()))
+    assert "WHERE " + expected in sql
+    assert " OR " not in sql
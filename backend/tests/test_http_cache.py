@@ -0,0 +1,67 @@
+"""Pre-encoded JSON responses: ETag and If-None-Match handling."""
+import pytest
+from starlette.requests import Request
+
+from app.routers import machines
+from app.services.redis_client import local_cache
+from app.utils.http_cache import body_etag, json_bytes_response
+
+
+def _request(if_none_match: str | None = None) -> Request:
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/products", "headers": headers})
+
+
+@pytest.mark.unit
+def test_json_bytes_response_sends_body_with_etag():
+    body = b'{"items":[],"total":0}'
+    response = json_bytes_response(_request(), body)
+    assert response.status_code == 200
+    assert response.body == body
+    assert response.headers["content-type"] == "application/json"
+    assert response.headers["etag"] == body_etag(body)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("header", ['"x", {etag}', "W/{etag}", "*"])
+def test_json_bytes_response_not_modified(header):
+    body = b'{"items":[]}'
+    etag = body_etag(body)
+    response = json_bytes_response(_request(header.format(etag=etag)), body, etag)
+    assert response.status_code == 304
+    assert response.body == b""
+    assert response.headers["etag"] == etag
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_regions_revalidate_with_304(client):
+    """conditional_get: Cache-Control and a version ETag on 200, then 304 without body for a matching If-None-Match."""
+    response = await client.get("/regions")
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "public, max-age=86400"
+    etag = response.headers["etag"]
+
+    response = await client.get("/regions", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert response.headers["cache-control"] == "public, max-age=86400"
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_machine_list_etag_version_changes_with_data_epoch(monkeypatch):
+    """A counter that restarts after a Redis flush must not repeat an old ETag version."""
+    epochs = iter(["epoch-a", "epoch-b"])
+
+    async def fake_epoch():
+        return next(epochs)
+
+    monkeypatch.setattr(machines, "data_epoch", fake_epoch)
+    local_cache.set(machines.MACHINE_LIST_VERSION_KEY, "3")
+    try:
+        assert await machines._machine_list_version() == "epoch-a-3"
+        assert await machines._machine_list_version() == "epoch-b-3"
+    finally:
+        local_cache.delete(machines.MACHINE_LIST_VERSION_KEY)
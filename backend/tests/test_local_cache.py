@@ -0,0 +1,93 @@
+"""L1 cache (LRU + TTL), single-flight loader coalescing and cross-worker coalesce()."""
+import asyncio
+
+import pytest
+
+from app.services.local_cache import LocalCache, SingleFlight
+from app.services.redis_client import coalesce
+
+
+@pytest.mark.unit
+def test_local_cache_evicts_least_recently_used_and_expired(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("app.services.local_cache.time.monotonic", lambda: now[0])
+    cache = LocalCache(max_entries=2, ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    cache.set("short", 4, ttl=1)
+    now[0] += 2
+    assert cache.get("short") is None
+    assert cache.get("a") == 1
+    now[0] += 10
+    assert cache.get("a") is None
+
+
+@pytest.mark.unit
+def test_local_cache_byte_budget_evicts_and_skips_oversized_bodies():
+    cache = LocalCache(max_entries=100, ttl=10, max_bytes=10)
+    cache.set("a", b"x" * 4)
+    cache.set("b", b"y" * 4)
+    cache.set("n", 123)  # non-bytes values do not count against the budget
+    assert cache.size_bytes == 8
+    cache.set("c", b"z" * 4)
+    assert cache.get("a") is None
+    assert cache.get("b") == b"y" * 4
+    assert cache.size_bytes == 8
+    cache.set("b", b"big" * 10)  # larger than the whole budget: not kept, old copy dropped
+    assert cache.get("b") is None
+    assert cache.size_bytes == 4
+    cache.delete("c")
+    assert cache.size_bytes == 0
+    assert cache.get("n") == 123
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_single_flight_runs_one_loader_per_key():
+    flight = SingleFlight()
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "value"
+
+    results = await asyncio.gather(*(flight.run("k", loader) for _ in range(10)))
+    assert results == ["value"] * 10
+    assert calls == 1
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("db down")
+
+    outcomes = await asyncio.gather(*(flight.run("k", failing) for _ in range(3)), return_exceptions=True)
+    assert all(isinstance(o, RuntimeError) for o in outcomes)
+    assert await flight.run("k", loader) == "value"
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_coalesce_computes_once_and_serves_result_to_waiters():
+    store: dict[str, str] = {}
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        store["k"] = "page"
+        return "page"
+
+    async def lookup():
+        return store.get("k")
+
+    results = await asyncio.gather(*(coalesce("test:coalesce", compute, lookup) for _ in range(5)))
+    assert results == ["page"] * 5
+    assert calls == 1
+    assert await coalesce("test:coalesce", compute, lookup) == "page"
+    assert calls == 1
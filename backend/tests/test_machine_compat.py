@@ -0,0 +1,41 @@
+"""Machine filter: cached compatible-id arrays and the ANY(array) condition (no DB required)."""
+from array import array
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.models.product import Product
+from app.routers import products
+from app.services import machine_compat
+
+
+@pytest.mark.unit
+def test_product_id_in_binds_one_array_parameter():
+    sql = str(select(Product.id).where(machine_compat.product_id_in([3, 1, 2])).compile(dialect=postgresql.dialect()))
+    assert "products.id = ANY (%(param_1)s::INTEGER[])" in sql
+    assert "compatibility_matrix" not in sql
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_cached_ids_are_served_without_db(monkeypatch):
+    ids = array("i", [4, 8, 15])
+
+    async def fake_lookup(key):
+        assert key == "machine_products:7"
+        return {"tags": {"machine:7": 0}}, ids.tobytes(), True
+
+    monkeypatch.setattr(machine_compat, "cache_lookup_tagged_body", fake_lookup)
+    assert list(await machine_compat.get_machine_product_ids(None, 7)) == [4, 8, 15]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_machine_without_compatible_products_skips_the_query(monkeypatch):
+    async def no_ids(db, machine_id):
+        return array("i")
+
+    monkeypatch.setattr(products, "get_machine_product_ids", no_ids)
+    page = await products._query_products(None, machine_id=7)
+    assert page.products == [] and page.total == 0 and page.next_cursor is None
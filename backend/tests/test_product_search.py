@@ -0,0 +1,96 @@
+"""Product search engine: term normalization and SQL shape (no DB required)."""
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.models.product import Product
+from app.services.product_search import apply_product_search, article_search_key, catalog_cursor_values, catalog_order_by, catalog_sort_types, catalog_sort_values, normalize_search_terms
+from app.utils import looks_like_article_number, normalize_article_number
+
+
+def _sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+@pytest.mark.unit
+def test_normalize_search_terms_dedups_and_prefers_expanded_terms():
+    assert normalize_search_terms("  фильтр ", None) == ["фильтр"]
+    assert normalize_search_terms("filter", ["Filter", "filter", " seal ", ""]) == ["Filter", "seal"]
+    assert normalize_search_terms(None, None) == []
+
+
+@pytest.mark.unit
+def test_apply_product_search_uses_fulltext_and_trigram_with_ranking():
+    stmt, rank = apply_product_search(select(Product.id), ["масло"])
+    sql = _sql(stmt.order_by(*catalog_order_by(rank)))
+    assert "search_vector @@ plainto_tsquery" in sql
+    assert "products.name ILIKE" in sql
+    assert "word_similarity" in sql
+    assert "ORDER BY greatest(" in sql
+
+
+@pytest.mark.unit
+def test_apply_product_search_without_terms_keeps_stock_then_name_order():
+    stmt, rank = apply_product_search(select(Product.id), [])
+    assert rank is None
+    assert "WHERE" not in _sql(stmt)
+    assert len(catalog_order_by(rank)) == 3
+
+
+@pytest.mark.unit
+def test_search_condition_escapes_like_wildcards():
+    stmt, _ = apply_product_search(select(Product.id), ["50%_off"])
+    params = stmt.compile(dialect=postgresql.dialect()).params
+    assert "%50\\%\\_off%" in params.values()
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("query", ["RE 504836", "RE-504836", "re504836", " re.504 836 "])
+def test_article_number_variants_share_one_key(query):
+    assert looks_like_article_number(query)
+    assert normalize_article_number(query) == "RE504836"
+    assert article_search_key([query]) == "RE504836"
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("query", ["фильтр масляный", "Масло 15W-40", "Plus-50", "ab"])
+def test_words_are_not_article_numbers(query):
+    assert not looks_like_article_number(query)
+    assert article_search_key([query]) is None
+
+
+@pytest.mark.unit
+def test_article_key_matches_part_numbers_with_other_separators():
+    stmt, _ = apply_product_search(select(Product.id), ["re-504836"])
+    compiled = stmt.compile(dialect=postgresql.dialect())
+    assert "products.article_key = " in str(compiled)
+    assert "RE504836" in compiled.params.values()
+    assert article_search_key(["RE504836", "filter"]) is None
+
+
+@pytest.mark.unit
+def test_search_matches_normalized_name_words():
+    stmt, rank = apply_product_search(select(Product.id), ["Масляные фильтры"])
+    compiled = stmt.order_by(*catalog_order_by(rank)).compile(dialect=postgresql.dialect())
+    assert "products.name_normalized LIKE" in str(compiled)
+    assert {"%maslyan%", "%filtr%"} <= set(compiled.params.values())
+
+
+@pytest.mark.unit
+def test_explicit_sorts_order_by_column_then_id_in_one_direction():
+    assert _sql(select(Product.id).order_by(*catalog_order_by(sort="price_desc"))).endswith("ORDER BY products.price DESC, products.id DESC")
+    assert _sql(select(Product.id).order_by(*catalog_order_by(sort="name_asc"))).endswith("ORDER BY products.name, products.id")
+    assert _sql(select(Product.id).order_by(*catalog_order_by(sort="newest"))).endswith("ORDER BY products.id DESC")
+
+
+@pytest.mark.unit
+def test_price_sort_cursor_keeps_exact_decimal():
+    product = Product(id=7, name="Фильтр", price=Decimal("12.10"))
+    values = catalog_sort_values(product, sort="price_asc")
+    assert values == ["12.10", 7]
+    assert all(isinstance(v, t) for v, t in zip(values, catalog_sort_types(sort="price_asc")))
+    assert catalog_cursor_values(values, "price_asc") == [Decimal("12.10"), 7]
+    with pytest.raises(ValueError):
+        catalog_cursor_values(["NaN", 7], "price_asc")
@@ -0,0 +1,60 @@
+"""Fast product list serializer must produce exactly what ProductOut / ProductListOut would."""
+from decimal import Decimal
+from types import SimpleNamespace
+
+import orjson
+import pytest
+
+from app.models.product import PRODUCT_CARD_COLUMNS, Product, ProductStatus
+from app.schemas.product import ProductListOut, ProductOut, product_list_json, product_out_json
+
+
+def _product(**overrides) -> Product:
+    fields = dict(
+        id=7,
+        vendor_id=3,
+        category_id=2,
+        name="Фильтр масляный",
+        article_number="AB-123",
+        price=Decimal("1250.50"),
+        stock_quantity=4,
+        description=None,
+        characteristics={"Вес": "1 кг"},
+        composition=None,
+        images=["/uploads/a.jpg", "/uploads/b.jpg"],
+        status=ProductStatus.in_stock,
+    )
+    fields.update(overrides)
+    return Product(**fields)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "overrides",
+    [{}, {"price": Decimal("100"), "images": None, "category_id": None}, {"price": 99.9, "status": ProductStatus.on_order}],
+)
+def test_product_out_json_matches_pydantic(overrides):
+    product = _product(**overrides)
+    expected = ProductOut.model_validate(product).model_copy(
+        update={"category_slug": "filters", "average_rating": 4.5, "reviews_count": 2}
+    )
+    fast = product_out_json(product, "filters", 4.5, 2)
+    assert fast == expected.model_dump(mode="json")
+    assert orjson.dumps(fast) == orjson.dumps(expected.model_dump(mode="json"))
+
+
+@pytest.mark.unit
+def test_product_list_json_matches_pydantic():
+    product = _product()
+    out = ProductListOut(items=[ProductOut.model_validate(product)], total=1, next_cursor="abc")
+    assert product_list_json([product_out_json(product)], total=1, next_cursor="abc") == out.model_dump(mode="json")
+
+
+@pytest.mark.unit
+def test_product_out_json_card_row_renders_details_as_null():
+    product = _product()
+    row = SimpleNamespace(**{c.key: getattr(product, c.key) for c in PRODUCT_CARD_COLUMNS})
+    data = product_out_json(row)
+    assert data["description"] is None and data["characteristics"] is None and data["composition"] is None
+    assert data["images"] == product.images
+    assert list(data) == list(ProductOut.model_fields)
@@ -4,6 +4,19 @@ from sqlalchemy import select
 
 from app.models.user import User, UserRole
 from app.models.product import Product, ProductStatus
+from app.services import redis_client
+from app.services.cache_tags import ALL_TAG, invalidate_tags
+
+
+@pytest.fixture(autouse=True)
+async def fresh_catalog_cache(request):
+    """Integration tests insert products directly through db_session, bypassing invalidate_products: start
+    each one from an empty catalog cache so pages cached by an earlier run (with its ids) are not served."""
+    if request.node.get_closest_marker("integration") is not None:
+        await redis_client.invalidate_product_cache()
+        await invalidate_tags([ALL_TAG])
+        redis_client.local_cache.clear()
+    yield
 
 
 @pytest.mark.integration
@@ -52,3 +65,191 @@ async def test_products_get_by_id_not_found(client_with_db):
     """GET /products/{id} with non-existent id returns 404."""
     response = await client_with_db.get("/products/999999")
     assert response.status_code == 404
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_review_write_updates_rating_stats(client_with_db, db_session, make_token):
+    """Creating and then changing a review keeps product and vendor aggregates in sync."""
+    vendor = User(role=UserRole.vendor, phone="+77001160011", name="Vendor")
+    buyer = User(role=UserRole.user, phone="+77001160012", name="Buyer")
+    db_session.add_all([vendor, buyer])
+    await db_session.flush()
+    product = Product(
+        vendor_id=vendor.id,
+        category_id=None,
+        name="Rated Product",
+        article_number="ART-P-RATED",
+        price=100.0,
+        stock_quantity=5,
+        status=ProductStatus.in_stock,
+    )
+    db_session.add(product)
+    await db_session.flush()
+    headers = {"Authorization": f"Bearer {make_token(buyer.id, UserRole.user, buyer.phone)}"}
+
+    response = await client_with_db.post(f"/products/{product.id}/reviews", json={"rating": 4}, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["average_rating"] == 4.0
+    response = await client_with_db.post(f"/products/{product.id}/reviews", json={"rating": 2}, headers=headers)
+    assert response.json()["total_count"] == 1
+    assert response.json()["average_rating"] == 2.0
+
+    response = await client_with_db.get(f"/vendors/{vendor.id}/rating")
+    assert response.json() == {"average_rating": 2.0, "total_reviews": 1}
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_catalog_list_omits_detail_fields(client_with_db, db_session):
+    """The public catalog returns card fields only; the product page still has the details."""
+    vendor = User(role=UserRole.vendor, phone="+77001160021", name="Vendor")
+    db_session.add(vendor)
+    await db_session.flush()
+    product = Product(
+        vendor_id=vendor.id,
+        category_id=None,
+        name="Card Product",
+        article_number="ART-P-CARD",
+        price=100.0,
+        stock_quantity=5,
+        description="Long description",
+        characteristics={"Вес": "1 кг"},
+        images=["/uploads/card.jpg"],
+        status=ProductStatus.in_stock,
+    )
+    db_session.add(product)
+    await db_session.flush()
+
+    response = await client_with_db.get("/products", params={"q": "ART-P-CARD"})
+    assert response.status_code == 200
+    item = next(i for i in response.json()["items"] if i["id"] == product.id)
+    assert item["images"] == ["/uploads/card.jpg"]
+    assert item["description"] is None and item["characteristics"] is None
+
+    response = await client_with_db.get(f"/products/{product.id}")
+    assert response.json()["description"] == "Long description"
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_catalog_finds_part_number_written_differently(client_with_db, db_session):
+    """Pasted part numbers match regardless of case and separators (article_key fast path)."""
+    vendor = User(role=UserRole.vendor, phone="+77001160031", name="Vendor")
+    db_session.add(vendor)
+    await db_session.flush()
+    product = Product(
+        vendor_id=vendor.id,
+        name="Фильтр масляный",
+        article_number="RE504836-T",
+        price=100.0,
+        stock_quantity=5,
+        status=ProductStatus.in_stock,
+    )
+    db_session.add(product)
+    await db_session.flush()
+    assert product.article_key == "RE504836T"
+
+    response = await client_with_db.get("/products", params={"q": "re 504836 t", "expand": "true"})
+    assert response.status_code == 200
+    assert [i["id"] for i in response.json()["items"]] == [product.id]
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_products_batch_keeps_request_order(client_with_db, db_session):
+    """GET /products/batch returns the requested products in request order and skips unknown ids."""
+    vendor = User(role=UserRole.vendor, phone="+77001160041", name="Vendor")
+    db_session.add(vendor)
+    await db_session.flush()
+    products = [
+        Product(vendor_id=vendor.id, category_id=None, name=f"Batch {i}", article_number=f"ART-BATCH-{i}", price=10.0 + i, stock_quantity=1, status=ProductStatus.in_stock)
+        for i in range(3)
+    ]
+    db_session.add_all(products)
+    await db_session.flush()
+    ids = [products[2].id, 999999, products[0].id, products[2].id]
+
+    response = await client_with_db.get("/products/batch", params={"ids": ",".join(map(str, ids))})
+    assert response.status_code == 200
+    assert [p["id"] for p in response.json()] == [products[2].id, products[0].id]
+    assert (await client_with_db.get("/products/batch", params={"ids": "1,x"})).status_code == 400
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_product_page_cache_evicted_by_review(client_with_db, db_session, make_token):
+    """The cached product page and first review page reflect a new review immediately."""
+    vendor = User(role=UserRole.vendor, phone="+77001160051", name="Vendor")
+    buyer = User(role=UserRole.user, phone="+77001160052", name="Buyer")
+    db_session.add_all([vendor, buyer])
+    await db_session.flush()
+    product = Product(vendor_id=vendor.id, category_id=None, name="Cached Product", article_number="ART-P-CACHED", price=100.0, stock_quantity=5, status=ProductStatus.in_stock)
+    db_session.add(product)
+    await db_session.flush()
+
+    assert (await client_with_db.get(f"/products/{product.id}")).json()["reviews_count"] == 0
+    assert (await client_with_db.get(f"/products/{product.id}/reviews")).json()["items"] == []
+    headers = {"Authorization": f"Bearer {make_token(buyer.id, UserRole.user, buyer.phone)}"}
+    await client_with_db.post(f"/products/{product.id}/reviews", json={"rating": 5, "text": "ok"}, headers=headers)
+
+    assert (await client_with_db.get(f"/products/{product.id}")).json()["reviews_count"] == 1
+    reviews = (await client_with_db.get(f"/products/{product.id}/reviews", params={"limit": 5})).json()
+    assert [r["text"] for r in reviews["items"]] == ["ok"]
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_catalog_price_sort_and_range_with_cursor(client_with_db, db_session):
+    """sort=price_desc with a price range pages through matching products by keyset cursor."""
+    vendor = User(role=UserRole.vendor, phone="+77001160061", name="Vendor")
+    db_session.add(vendor)
+    await db_session.flush()
+    prices = [5.0, 15.0, 25.0, 35.0, 45.0]
+    db_session.add_all(
+        Product(vendor_id=vendor.id, category_id=None, name=f"Sorted {p}", article_number=f"ART-SORT-{int(p)}", price=p, stock_quantity=1, status=ProductStatus.in_stock)
+        for p in prices
+    )
+    await db_session.flush()
+    params = {"q": "Sorted", "sort": "price_desc", "price_min": "10", "price_max": "40", "limit": 2}
+
+    first = (await client_with_db.get("/products", params=params)).json()
+    assert [i["price"] for i in first["items"]] == ["35.00", "25.00"]
+    assert first["total"] == 3
+    second = (await client_with_db.get("/products", params={**params, "cursor": first["next_cursor"]})).json()
+    assert [i["price"] for i in second["items"]] == ["15.00"]
+    assert (await client_with_db.get("/products", params={"price_min": "5", "price_max": "1"})).status_code == 400
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_fuzzy_total_is_estimate_when_candidates_are_cut_off(monkeypatch):
+    from types import SimpleNamespace
+
+    from app.routers import products as products_router
+
+    class _Rows:
+        def __init__(self, rows):
+            self._rows = rows
+
+        def all(self):
+            return self._rows
+
+    class FakeSession:
+        def __init__(self, ids):
+            self.ids = ids
+
+        async def execute(self, stmt):
+            return _Rows([SimpleNamespace(id=pid) for pid in self.ids])
+
+    async def fake_ids(q, limit):
+        return list(range(1, min(limit, n) + 1))
+
+    monkeypatch.setattr(products_router, "fuzzy_product_ids", fake_ids)
+    stmt = select(Product.id)
+    n = 30  # fewer matches than the 5 * (skip + limit) candidates: exact
+    page = await products_router._query_products_fuzzy(FakeSession(range(1, 31)), stmt, "x", 0, 20, True, True)
+    assert (page.total, page.total_is_estimate) == (30, False)
+    n = 1000  # candidate list full: only a lower bound
+    page = await products_router._query_products_fuzzy(FakeSession(range(1, 101)), stmt, "x", 0, 20, True, True)
+    assert (page.total, page.total_is_estimate) == (100, True)
@@ -0,0 +1,85 @@
+"""Offline synonym dictionary: seed lookups need neither Redis nor the LLM."""
+import json
+
+import pytest
+
+from app.constants.search_synonyms import SYNONYM_GROUPS
+from app.services import search_suggest
+from app.services.search_synonyms import build_seed_dictionary, normalize_query, seed_synonyms, worth_learning
+
+
+@pytest.mark.unit
+def test_seed_lookup_is_case_and_language_insensitive():
+    suggestions, expanded = seed_synonyms("  Фильтр ")
+    assert suggestions[0] == "Фильтр"
+    assert "filter" in expanded and "сүзгі" in expanded
+    assert seed_synonyms("FILTER")[1][0] == "FILTER"
+    assert seed_synonyms("щётка") is not None  # ё == е
+    assert seed_synonyms("неизвестная деталь") is None
+
+
+@pytest.mark.unit
+def test_seed_expansion_is_capped_and_deduplicated():
+    for group in SYNONYM_GROUPS:
+        suggestions, expanded = seed_synonyms(group[0])
+        assert len(expanded) <= 6 and len(suggestions) <= 10
+        assert len({normalize_query(t) for t in expanded}) == len(expanded)
+
+
+@pytest.mark.unit
+def test_build_seed_dictionary_keeps_first_group_for_shared_terms():
+    seed = build_seed_dictionary([("a", "shared"), ("b", "Shared")])
+    assert seed["shared"] == ("a", "shared")
+
+
+@pytest.mark.unit
+def test_worth_learning_rejects_echoes_and_oversized_queries():
+    assert worth_learning("сальник", ["сальник", "seal"], ["сальник"])
+    assert not worth_learning("сальник", ["Сальник"], ["сальник "])  # answer only repeats the query
+    assert not worth_learning("сальник", [], [])
+    assert not worth_learning("x", ["xx"], [])
+    assert not worth_learning("a" * 65, ["b"], [])
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_known_query_does_not_call_llm(monkeypatch):
+    def fail():
+        raise AssertionError("LLM must not be called for a dictionary term")
+
+    monkeypatch.setattr(search_suggest, "get_openai_client", fail)
+    out = await search_suggest.get_search_suggestions("масло")
+    assert out.expanded_terms[0] == "масло"
+    assert "oil" in out.expanded_terms
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_rejected_llm_answer_is_cached_briefly(monkeypatch):
+    store: dict = {}
+    calls = []
+
+    async def fake_cache_get(key):
+        return store.get(key)
+
+    async def fake_cache_set(key, value, ttl=None):
+        store[key] = value
+
+    async def no_synonyms(original):
+        return None
+
+    async def fake_completion(client, call_type, **kwargs):
+        calls.append(kwargs)
+        raise json.JSONDecodeError("bad", "", 0)
+
+    monkeypatch.setattr(search_suggest, "get_openai_client", lambda: object())
+    monkeypatch.setattr(search_suggest, "lookup_synonyms", no_synonyms)
+    monkeypatch.setattr(search_suggest, "create_completion_logged", fake_completion)
+    monkeypatch.setattr(search_suggest, "cache_get", fake_cache_get)
+    monkeypatch.setattr(search_suggest, "cache_set", fake_cache_set)
+    first = await search_suggest.get_search_suggestions("Zq")
+    second = await search_suggest.get_search_suggestions("  zq ")
+    assert len(calls) == 1
+    assert list(store) == ["suggest:zq"]
+    assert first.expanded_terms == second.expanded_terms == ["Zq"]
+    assert second.original_query == "zq"
@@ -0,0 +1,26 @@
+"""Search text normalization: word forms, ё/е, Kazakh letters and transliteration reduce to one key."""
+import pytest
+
+from app.utils.search_text import normalize_search_text, search_words
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "text",
+    ["Масляные фильтры", "масляный фильтр", "МАСЛЯНОГО ФИЛЬТРА", "maslyanyy filtry", "maslyanyi filtr"],
+)
+def test_word_forms_and_transliteration_share_one_key(text):
+    assert normalize_search_text(text) == "maslyan filtr"
+
+
+@pytest.mark.unit
+def test_folds_yo_and_kazakh_letters():
+    assert normalize_search_text("щётка") == normalize_search_text("щетка") == normalize_search_text("shchetka")
+    assert normalize_search_text("Сүзгі") == normalize_search_text("сузги")
+    assert normalize_search_text("қайыс") == normalize_search_text("кайыс")
+
+
+@pytest.mark.unit
+def test_codes_and_short_words_are_kept():
+    assert search_words("John Deere RE504836 15W-40") == ["john", "deer", "re504836", "15v", "40"]
+    assert search_words("") == []
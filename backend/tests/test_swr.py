@@ -0,0 +1,54 @@
+"""Stale-while-revalidate envelopes and background refreshes."""
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+
+from app.database import RLS_DEFAULT_USER_ID, _with_rls_default, async_session_maker
+from app.services import swr
+from app.services.swr import SWR_STALE_TTL, swr_envelope, swr_hard_ttl, swr_refresh_in_background, swr_unwrap
+
+
+@pytest.mark.unit
+def test_swr_envelope_freshness(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.services.swr.time.time", lambda: now[0])
+    entry = swr_envelope({"items": []}, soft_ttl=300)
+    assert swr_unwrap(entry) == ({"items": []}, True)
+    now[0] += 301
+    assert swr_unwrap(entry) == ({"items": []}, False)
+    assert swr_unwrap({"items": []}) == (None, False)
+    assert swr_unwrap(None) == (None, False)
+    assert swr_hard_ttl(300) == 300 + SWR_STALE_TTL
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_swr_refresh_runs_with_requesters_rls_context(monkeypatch):
+    sessions = []
+
+    @asynccontextmanager
+    async def fake_background_session(user_id=None):
+        sessions.append(user_id)
+        yield object()
+
+    async def refresh(session):
+        return None
+
+    monkeypatch.setattr(swr, "background_session", fake_background_session)
+    swr_refresh_in_background("test:swr:admin", refresh, user_id=7)
+    await swr._refreshing["test:swr:admin"]
+    swr_refresh_in_background("test:swr:public", refresh)
+    await swr._refreshing["test:swr:public"]
+    assert sessions == [7, None]
+
+
+@pytest.mark.unit
+def test_rls_listener_sets_given_user():
+    executed = []
+    connection = SimpleNamespace(exec_driver_sql=executed.append)
+    for user_id in (None, 42):
+        session = async_session_maker()
+        _with_rls_default(session, user_id)
+        session.sync_session.dispatch.after_begin(session.sync_session, None, connection)
+    assert executed == [f"SET LOCAL app.current_user_id = {RLS_DEFAULT_USER_ID}", "SET LOCAL app.current_user_id = 42"]
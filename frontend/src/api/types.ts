@@ -94,8 +94,11 @@ export interface Notification {
 
 export interface ProductList {
   items: Product[];
-  total: number;
+  /** null when the total was not requested (cursor pages default to with_total=false) */
+  total: number | null;
+  total_is_estimate?: boolean;
   suggested_terms?: string[] | null;
+  next_cursor?: string | null;
 }
 
 export interface Machine {
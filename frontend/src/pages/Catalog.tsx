@@ -236,7 +236,9 @@ export function Catalog() {
         return "Каталог";
       })()
     : "Каталог";
-  const totalCount = data?.total ?? 0;
+  // total is null for pages fetched without a count; estimates (large result sets) are shown as approximate
+  const totalLabel =
+    data == null ? "0" : data.total == null ? String(data.items.length) : `${data.total_is_estimate ? "≈" : ""}${data.total}`;
 
   return (
     <div className="min-h-screen bg-gray-50">
@@ -250,7 +252,7 @@ export function Catalog() {
           >
             <h1 className="text-3xl sm:text-4xl font-bold mb-2">{categoryName}</h1>
             <p className="text-sm sm:text-lg md:text-xl opacity-90">
-              {loading ? "Загрузка..." : data != null ? `Найдено ${totalCount} товаров` : "Запчасти и техника, семена, удобрения, СЗР"}
+              {loading ? "Загрузка..." : data != null ? `Найдено ${totalLabel} товаров` : "Запчасти и техника, семена, удобрения, СЗР"}
             </p>
           </motion.div>
         </div>
@@ -499,7 +501,7 @@ export function Catalog() {
           )}
           <div className="flex flex-wrap items-center justify-between gap-4 mb-6">
             <p className="text-gray-600 font-medium">
-              Показано <span className="font-semibold text-gray-900">{data.total}</span> товаров
+              Показано <span className="font-semibold text-gray-900">{totalLabel}</span> товаров
             </p>
             {/* Десктопная сортировка, на мобильных используется нижний лист */}
             <label className="hidden lg:flex items-center gap-2 text-sm font-medium text-gray-700">